@@ -1,11 +1,16 @@
 from django.conf import settings
-from django.core.cache import caches
 
+from systems.cache.tiered import TieredCache
+from systems.cache.warmer import queue_warm
 from systems.commands.index import Command
 
 
 class Clear(Command('cache.clear')):
 
     def exec(self):
-        caches[settings.CACHE_MIDDLEWARE_ALIAS].clear()
-        caches[settings.CACHE_MIDDLEWARE_ALIAS].close()
+        cache = TieredCache.get_cache(settings.CACHE_MIDDLEWARE_ALIAS)
+        cache.clear()
+        cache.close()
+
+        if settings.CACHE_WARM_ON_CLEAR and queue_warm():
+            self.success("Queued page cache warming")
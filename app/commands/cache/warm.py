@@ -0,0 +1,26 @@
+from systems.cache.warmer import CacheWarmer
+from systems.commands.index import Command
+
+
+class Warm(Command('cache.warm')):
+
+    def exec(self):
+        warmer = CacheWarmer(
+            limit = self.warm_limit,
+            rate = self.warm_rate,
+            disable_parallel = self.no_parallel
+        )
+        results = warmer.warm()
+
+        data = [[ 'URL', 'Accept', 'Status', 'Cache' ]]
+        for thread in results.data:
+            for result in thread.result:
+                data.append([ result['url'], result['accept'], result['status'], result['cache'] ])
+
+        if len(data) > 1:
+            self.table(data, 'results')
+
+        for thread in results.errors:
+            self.warning("Cache warm failed for {}: {}".format(thread.name, thread.error))
+
+        self.success("Warmed {} cached URLs".format(len(results.data)))
@@ -1,11 +1,23 @@
 from systems.commands.index import Command
 
+import time
+
 
 class Pull(Command('db.pull')):
 
+    def preprocess(self, options):
+        if self.db_since is None and self.db_delta:
+            options['db_since'] = self.get_db_watermark('pull')
+
     def exec(self):
-        self.silent_data('db', self.db.save(self.db_packages, encrypted = False))
+        # Captured before the export so concurrent changes are included in the next sync
+        watermark = time.time()
+        self.silent_data('db', self.db.save(self.db_packages, encrypted = False, since = self.db_since))
+        self.silent_data('db_watermark', watermark)
 
     def postprocess(self, result):
         self.db.load(result.get_named_data('db'), encrypted = False)
+        if self.db_delta:
+            self.set_db_watermark('pull', float(result.get_named_data('db_watermark')))
+
         self.success("Database packages {} successfully pulled".format(",".join(self.db_packages)))
@@ -1,11 +1,22 @@
 from systems.commands.index import Command
 
+import time
+
 
 class Push(Command('db.push')):
 
     def preprocess(self, options):
-        options['db'] = self.db.save(self.db_packages, encrypted = False)
+        since = self.db_since
+        if since is None and self.db_delta:
+            since = self.get_db_watermark('push')
+
+        self._db_watermark = time.time()
+        options['db'] = self.db.save(self.db_packages, encrypted = False, since = since)
 
     def exec(self):
         self.db.load(self.options.get('db'), encrypted = False)
         self.success("Database packages {} successfully pushed".format(",".join(self.db_packages)))
+
+    def postprocess(self, result):
+        if self.db_delta:
+            self.set_db_watermark('push', self._db_watermark)
@@ -9,3 +9,14 @@ class DatabaseMixin(CommandMixin('db')):
         if not getattr(self, '_cached_db_manager', None):
             self._cached_db_manager = manager.DatabaseManager()
         return self._cached_db_manager
+
+
+    def _get_db_watermark_name(self, direction):
+        return "db-{}-{}".format(direction, "-".join(sorted(self.db_packages)))
+
+    def get_db_watermark(self, direction):
+        watermark = self.get_state(self._get_db_watermark_name(direction))
+        return float(watermark) if watermark is not None else None
+
+    def set_db_watermark(self, direction, watermark):
+        self.set_state(self._get_db_watermark_name(direction), watermark)
@@ -1,5 +1,6 @@
 from django.conf import settings
 
+from systems.api.auth import TokenCache
 from systems.commands.index import Command
 
 
@@ -14,6 +15,7 @@ class Rotate(Command('user.rotate')):
 
         user.set_password(token)
         user.save()
+        TokenCache.clear(user)
 
         self.silent_data('name', user.name)
         self.data("User {} token:".format(user.name), token, 'token')
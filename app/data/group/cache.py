@@ -1,3 +1,9 @@
+from django.db.models.signals import post_save, post_delete, m2m_changed
+from django.dispatch import receiver
+
+from systems.cache.version import get_model_versions
+
+import threading
 
 class Cache(object):
 
@@ -37,3 +43,63 @@ class Cache(object):
 
     def clear(self, facade):
         self.data.pop(facade.name, None)
+
+
+class MembershipCache(object):
+
+    _instance = None
+
+    def __new__(cls, *args, **kwargs):
+        if not cls._instance:
+            cls._instance = object.__new__(cls)
+        return cls._instance
+
+    def __init__(self):
+        if not getattr(self, '_initialized', False):
+            self.lock = threading.Lock()
+            self.data = {}
+            self.generation = 0
+            self._initialized = True
+
+
+    def get_version(self, user):
+        # Shared model versions catch changes made by other processes
+        versions = get_model_versions(
+            user._meta.db_table,
+            user.groups.model._meta.db_table
+        )
+        return (self.generation, tuple(sorted(versions.items())))
+
+    def get(self, user, environment):
+        key = (user.pk, environment)
+        version = self.get_version(user)
+
+        with self.lock:
+            entry = self.data.get(key, None)
+            if entry and entry[0] == version:
+                return entry[1]
+
+        groups = frozenset(user.groups.filter(environment_id = environment).values_list('name', flat = True))
+        with self.lock:
+            self.data[key] = (version, groups)
+        return groups
+
+    def clear(self):
+        with self.lock:
+            self.data = {}
+            self.generation += 1
+
+
+def check_membership_model(model):
+    return getattr(model._meta, 'data_name', None) in ('user', 'group')
+
+@receiver(post_save)
+@receiver(post_delete)
+def update_membership(sender, **kwargs):
+    if check_membership_model(sender):
+        MembershipCache().clear()
+
+@receiver(m2m_changed)
+def update_membership_relation(sender, instance, action, **kwargs):
+    if action in ('post_add', 'post_remove', 'post_clear') and check_membership_model(instance):
+        MembershipCache().clear()
@@ -82,4 +82,4 @@ class ScheduledTask(
     ),
     Model('scheduled_task')
 ):
-    objects = celery_beat_managers.PeriodicTaskManager()
+    objects = celery_beat_managers.PeriodicTaskManager.from_queryset(base.BaseQuerySet)()
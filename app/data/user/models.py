@@ -1,9 +1,12 @@
 from django.conf import settings
 from django.contrib.auth.base_user import AbstractBaseUser, BaseUserManager
 
+from data.group.cache import MembershipCache
 from settings.roles import Roles
+from systems.models.base import BaseQuerySet
 from systems.models.index import Model, ModelFacade
 from utility.runtime import Runtime
+from utility.data import ensure_list
 
 
 class UserFacade(ModelFacade('user')):
@@ -44,7 +47,7 @@ class UserFacade(ModelFacade('user')):
         Runtime.active_user(user)
 
 
-class UserManager(BaseUserManager):
+class UserManager(BaseUserManager.from_queryset(BaseQuerySet)):
     use_in_migrations = True
 
 
@@ -65,4 +68,11 @@ class User(
     @property
     def env_groups(self, **filters):
         filters['environment_id'] = Model('environment').facade.get_env()
-        return self.groups.filter(**filters)
\ No newline at end of file
+        return self.groups.filter(**filters)
+
+    @property
+    def env_group_names(self):
+        return MembershipCache().get(self, Model('environment').facade.get_env())
+
+    def check_env_groups(self, groups):
+        return not self.env_group_names.isdisjoint(ensure_list(groups))
@@ -2,7 +2,6 @@ from systems.plugins.index import BaseProvider
 from utility.data import get_dict_combinations, normalize_index
 
 import re
-import copy
 
 
 class Provider(BaseProvider('parser', 'reference')):
@@ -37,7 +36,7 @@ class Provider(BaseProvider('parser', 'reference')):
             operations = ''
 
         facade = ref_match.group(2)
-        facade = copy.deepcopy(self.command.manager.index.get_facade_index()[facade])
+        facade = self.command.manager.index.get_facade_index()[facade].view()
 
         scopes = ref_match.group(3)
         scope_filters = {}
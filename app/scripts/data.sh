@@ -9,6 +9,7 @@ export ZIMAGI_DATA_PORT="${ZIMAGI_DATA_PORT:-5323}"
 export ZIMAGI_API_INIT=True
 export ZIMAGI_NO_MIGRATE=True
 export ZIMAGI_INIT_TIMEOUT="${ZIMAGI_INIT_TIMEOUT:-600}"
+export ZIMAGI_CACHE_WARM_ON_DEPLOY="${ZIMAGI_CACHE_WARM_ON_DEPLOY:-True}"
 #-------------------------------------------------------------------------------
 
 if [ ! -z "$ZIMAGI_POSTGRES_HOST" -a ! -z "$ZIMAGI_POSTGRES_PORT" ]
@@ -27,6 +28,12 @@ zimagi module init --verbosity=3 --timeout="$ZIMAGI_INIT_TIMEOUT"
 echo "> Fetching data environment information"
 zimagi env get
 
+if [ "$ZIMAGI_CACHE_WARM_ON_DEPLOY" == "True" ]
+then
+  echo "> Queueing page cache warming"
+  zimagi cache warm --queue || echo "> Page cache warming could not be queued"
+fi
+
 echo "> Starting API"
 export ZIMAGI_API_EXEC=True
 
@@ -9,6 +9,8 @@ from systems.api.schema import generators, renderers
 
 urlpatterns = [
     url(r'^status/?$', views.Status.as_view()),
+    url(r'^health/live/?$', views.Liveness.as_view()),
+    url(r'^health/ready/?$', views.Readiness.as_view()),
     url(r'^', include(routers.DataAPIRouter().urls)),
     url('^$', get_schema_view(
         title = 'Zimagi Data API',
@@ -7,4 +7,9 @@ class AppInit(AppConfig):
 
 
     def ready(self):
-        settings.MANAGER.index.generate()
\ No newline at end of file
+        settings.MANAGER.index.generate()
+
+        from systems.cache import version # Connect model version signals
+        from systems.db import search # Connect search index signals
+        from systems.db import rollup # Connect rollup signals
+        from systems.db import tombstone # Connect tombstone table signals
@@ -13,6 +13,7 @@ import os
 import sys
 import pathlib
 import threading
+import contextlib
 import importlib
 import colorful
 
@@ -117,8 +118,11 @@ DATABASE_ROUTERS = ['systems.db.router.DatabaseRouter']
 BASE_DATA_PATH = os.path.join(DATA_DIR, Config.string('ZIMAGI_DATA_FILE_NAME', 'zimagi'))
 DATABASE_PROVIDER = 'sqlite'
 
-DB_MAX_CONNECTIONS = 1
+DB_MAX_CONNECTIONS = Config.integer('ZIMAGI_DB_MAX_CONNECTIONS', 10)
 DB_PACKAGE_ALL_NAME = Config.string('ZIMAGI_DB_PACKAGE_ALL_NAME', 'all')
+DB_PACKAGE_CHUNK_SIZE = Config.integer('ZIMAGI_DB_PACKAGE_CHUNK_SIZE', 1000)
+DB_PACKAGE_COMPRESS_LEVEL = Config.integer('ZIMAGI_DB_PACKAGE_COMPRESS_LEVEL', 6)
+DB_SYNC_TOMBSTONE_DAYS = Config.integer('ZIMAGI_DB_SYNC_TOMBSTONE_DAYS', 30) # 0 disables deletion tracking for delta syncs
 
 DATABASES = {
     'default': {
@@ -129,6 +133,13 @@ DATABASES = {
     }
 }
 
+DB_SQLITE_BUSY_TIMEOUT = Config.integer('ZIMAGI_DB_SQLITE_BUSY_TIMEOUT', 60000) # Milliseconds
+DB_SQLITE_SYNCHRONOUS = Config.string('ZIMAGI_DB_SQLITE_SYNCHRONOUS', 'NORMAL')
+DB_SQLITE_MMAP_SIZE = Config.integer('ZIMAGI_DB_SQLITE_MMAP_SIZE', 268435456) # 256 MB
+DB_SQLITE_CACHE_SIZE = Config.integer('ZIMAGI_DB_SQLITE_CACHE_SIZE', 65536) # KB
+DB_SQLITE_WAL_CHECKPOINT = Config.integer('ZIMAGI_DB_SQLITE_WAL_CHECKPOINT', 1000) # Pages
+DB_SQLITE_WAL_SIZE_LIMIT = Config.integer('ZIMAGI_DB_SQLITE_WAL_SIZE_LIMIT', 67108864) # 64 MB
+
 mysql_host = Config.value('ZIMAGI_MYSQL_HOST', None)
 mysql_port = Config.value('ZIMAGI_MYSQL_PORT', None)
 
@@ -201,7 +212,57 @@ else:
         DATABASE_PROVIDER = 'postgres'
         DB_MAX_CONNECTIONS = Config.integer('ZIMAGI_DB_MAX_CONNECTIONS', 10)
 
-DB_LOCK = threading.Semaphore(DB_MAX_CONNECTIONS)
+DB_REPLICAS = Config.list('ZIMAGI_DB_REPLICAS', []) # host:port entries
+DB_REPLICA_MAX_LAG = Config.decimal('ZIMAGI_DB_REPLICA_MAX_LAG', 5) # Seconds
+DB_REPLICA_CHECK_INTERVAL = Config.integer('ZIMAGI_DB_REPLICA_CHECK_INTERVAL', 10)
+DB_REPLICA_ALIASES = []
+
+if DATABASE_PROVIDER != 'sqlite':
+    for index, replica in enumerate(DB_REPLICAS):
+        replica_host, _, replica_port = replica.partition(':')
+        replica_alias = "replica_{}".format(index)
+
+        DATABASES[replica_alias] = {
+            **DATABASES['default'],
+            'HOST': replica_host,
+            'PORT': replica_port or DATABASES['default']['PORT']
+        }
+        DB_REPLICA_ALIASES.append(replica_alias)
+
+DB_POOL_ENABLED = Config.boolean('ZIMAGI_DB_POOL_ENABLED', True)
+DB_POOL_MAX_SIZE = Config.integer('ZIMAGI_DB_POOL_MAX_SIZE', DB_MAX_CONNECTIONS) # Idle connections kept per alias
+DB_POOL_MAX_OVERFLOW = Config.integer('ZIMAGI_DB_POOL_MAX_OVERFLOW', DB_POOL_MAX_SIZE) # Connections opened beyond the pool size and closed on return (-1 for unlimited)
+DB_POOL_MAX_IDLE = Config.integer('ZIMAGI_DB_POOL_MAX_IDLE', 300) # Seconds
+DB_POOL_TIMEOUT = Config.integer('ZIMAGI_DB_POOL_TIMEOUT', 30) # Seconds
+DB_POOL_CHECK_INTERVAL = Config.integer('ZIMAGI_DB_POOL_CHECK_INTERVAL', 30) # Seconds idle before health check
+
+if DATABASE_PROVIDER == 'sqlite':
+    # WAL allows concurrent readers but only a single writer
+    DB_LOCK = threading.Semaphore(1)
+    DB_READ_LOCK = threading.Semaphore(DB_MAX_CONNECTIONS)
+else:
+    DB_LOCK = contextlib.nullcontext()
+    DB_READ_LOCK = contextlib.nullcontext()
+
+    if DB_POOL_ENABLED:
+        # Connections are returned to the pool when Django closes them
+        for database in DATABASES.values():
+            database['CONN_MAX_AGE'] = 0
+
+DB_APPROXIMATE_COUNT = Config.boolean('ZIMAGI_DB_APPROXIMATE_COUNT', True)
+DB_APPROXIMATE_COUNT_THRESHOLD = Config.integer('ZIMAGI_DB_APPROXIMATE_COUNT_THRESHOLD', 100000)
+DB_APPROXIMATE_COUNT_MAX_FILTERS = Config.integer('ZIMAGI_DB_APPROXIMATE_COUNT_MAX_FILTERS', 2)
+DB_COUNT_CACHE_SECONDS = Config.integer('ZIMAGI_DB_COUNT_CACHE_SECONDS', 600)
+
+DB_SEARCH_INDEX = Config.boolean('ZIMAGI_DB_SEARCH_INDEX', False) # Opt in: indexed ?q= searches match word prefixes instead of substrings
+DB_SEARCH_CONFIG = Config.string('ZIMAGI_DB_SEARCH_CONFIG', 'simple')
+
+DB_ROLLUP_INTERVAL = Config.integer('ZIMAGI_DB_ROLLUP_INTERVAL', 300) # Seconds (0 disables scheduled refresh)
+DB_ROLLUP_DELAY = Config.integer('ZIMAGI_DB_ROLLUP_DELAY', 30) # Seconds after writes (0 disables write triggered refresh)
+
+DB_IDENTITY_MAP_ENTRIES = Config.integer('ZIMAGI_DB_IDENTITY_MAP_ENTRIES', 10000) # Per command execution (0 disables)
+
+DB_CLEAR_BATCH_SIZE = Config.integer('ZIMAGI_DB_CLEAR_BATCH_SIZE', 500)
 
 #
 # Redis configurations
@@ -284,6 +345,18 @@ CACHE_MIDDLEWARE_ALIAS = 'page'
 CACHE_MIDDLEWARE_KEY_PREFIX = ''
 CACHE_MIDDLEWARE_SECONDS = Config.integer('ZIMAGI_PAGE_CACHE_SECONDS', 31536000) # 1 Year
 
+CACHE_LOCAL_ENTRIES = Config.integer('ZIMAGI_PAGE_CACHE_LOCAL_ENTRIES', 500) # 0 disables local tier
+CACHE_LOCAL_BYTES = Config.integer('ZIMAGI_PAGE_CACHE_LOCAL_BYTES', 33554432) # 32 MB
+CACHE_LOCAL_SECONDS = Config.integer('ZIMAGI_PAGE_CACHE_LOCAL_SECONDS', 300)
+CACHE_COMPRESS_LEVEL = Config.integer('ZIMAGI_PAGE_CACHE_COMPRESS_LEVEL', 6)
+
+CACHE_WARM_LIMIT = Config.integer('ZIMAGI_CACHE_WARM_LIMIT', 100)
+CACHE_WARM_RATE = Config.decimal('ZIMAGI_CACHE_WARM_RATE', 10) # Requests per second (0 for unlimited)
+CACHE_WARM_ACCEPT = Config.list('ZIMAGI_CACHE_WARM_ACCEPT', [ '*/*' ])
+CACHE_WARM_INTERVAL = Config.integer('ZIMAGI_CACHE_WARM_INTERVAL', 0) # Seconds (0 disables periodic warming)
+CACHE_WARM_DELAY = Config.integer('ZIMAGI_CACHE_WARM_DELAY', 300) # Seconds after data changes (0 disables change triggered warming)
+CACHE_WARM_ON_CLEAR = Config.boolean('ZIMAGI_CACHE_WARM_ON_CLEAR', True)
+
 #
 # Logging configuration
 #
@@ -347,14 +420,26 @@ WSGI_APPLICATION = 'services.wsgi.application'
 COMMAND_PORT = Config.integer('ZIMAGI_COMMAND_PORT', 5123)
 DATA_PORT = Config.integer('ZIMAGI_DATA_PORT', 5323)
 
+COMMAND_STREAM_BINARY = Config.boolean('ZIMAGI_COMMAND_STREAM_BINARY', True)
+COMMAND_STREAM_COMPRESS_SIZE = Config.integer('ZIMAGI_COMMAND_STREAM_COMPRESS_SIZE', 1024)
+COMMAND_STREAM_COMPRESS_LEVEL = Config.integer('ZIMAGI_COMMAND_STREAM_COMPRESS_LEVEL', 6)
+
 ALLOWED_HOSTS = Config.list('ZIMAGI_ALLOWED_HOSTS', ['*'])
 
 REST_PAGE_COUNT = Config.integer('ZIMAGI_REST_PAGE_COUNT', 50)
 REST_API_TEST = Config.boolean('ZIMAGI_REST_API_TEST', False)
+FILTERSET_CACHE_ENTRIES = Config.integer('ZIMAGI_FILTERSET_CACHE_ENTRIES', 256)
+REST_COMPLEX_FILTER_COMPOSE = Config.boolean('ZIMAGI_REST_COMPLEX_FILTER_COMPOSE', True)
 
 ADMIN_USER = Config.string('ZIMAGI_ADMIN_USER', 'admin')
 DEFAULT_ADMIN_TOKEN = Config.string('ZIMAGI_DEFAULT_ADMIN_TOKEN', 'a11223344556677889900z')
 
+HEALTH_CHECK_INTERVAL = Config.integer('ZIMAGI_HEALTH_CHECK_INTERVAL', 30)
+
+API_TOKEN_CACHE_SECONDS = Config.integer('ZIMAGI_API_TOKEN_CACHE_SECONDS', 300) # 0 disables verified token caching
+API_TOKEN_CACHE_ENTRIES = Config.integer('ZIMAGI_API_TOKEN_CACHE_ENTRIES', 10000)
+API_LAST_LOGIN_INTERVAL = Config.integer('ZIMAGI_API_LAST_LOGIN_INTERVAL', 60)
+
 #
 # Database mutex locking
 #
@@ -393,6 +478,16 @@ CELERY_BEAT_SCHEDULE = {
         'schedule': crontab(hour='*/2', minute='0')
     }
 }
+if DB_ROLLUP_INTERVAL > 0:
+    CELERY_BEAT_SCHEDULE['refresh_rollups'] = {
+        'task': 'zimagi.rollup.refresh',
+        'schedule': DB_ROLLUP_INTERVAL
+    }
+if CACHE_WARM_INTERVAL > 0:
+    CELERY_BEAT_SCHEDULE['warm_page_cache'] = {
+        'task': 'zimagi.cache.warm',
+        'schedule': CACHE_WARM_INTERVAL
+    }
 
 #-------------------------------------------------------------------------------
 # Service specific settings
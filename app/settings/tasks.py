@@ -23,6 +23,15 @@ def clean_datetime_schedule(self):
     self.clean_datetime_schedule()
 
 
+@shared_task(bind = True, name = 'zimagi.rollup.refresh')
+def refresh_rollups(self):
+    self.refresh_rollups()
+
+@shared_task(bind = True, name = 'zimagi.cache.warm')
+def warm_cache(self):
+    self.warm_cache()
+
+
 @shared_task(bind = True,
     name = 'zimagi.notification.send',
     retry_kwargs = {'max_retries': 100},
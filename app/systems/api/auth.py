@@ -10,6 +10,10 @@ from systems.models.index import Model
 from utility.encryption import Cipher
 from utility.data import ensure_list
 
+import threading
+import hashlib
+import hmac
+import time
 import logging
 
 
@@ -31,7 +35,7 @@ class CommandPermission(permissions.BasePermission):
             if groups is False:
                 return True
 
-            return request.user.env_groups.filter(name__in = groups).exists()
+            return request.user.check_env_groups(groups)
         else:
             return True
 
@@ -49,7 +53,7 @@ class DataPermission(permissions.BasePermission):
         model_name = view.queryset.model._meta.data_name
         roles = settings.MANAGER.get_spec('data.{}.roles'.format(model_name))
 
-        groups = roles.get('edit', [])
+        groups = list(ensure_list(roles.get('edit', [])))
         if roles.get('view', None):
             groups.extend(ensure_list(roles['view']))
 
@@ -61,7 +65,7 @@ class DataPermission(permissions.BasePermission):
         if not request.user:
             raise exceptions.AuthenticationFailed('Authentication credentials were not provided')
 
-        return request.user.env_groups.filter(name__in = groups).exists()
+        return request.user.check_env_groups(groups)
 
 
 class CommandClientTokenAuthentication(auth.TokenAuthentication):
@@ -79,6 +83,62 @@ class CommandClientTokenAuthentication(auth.TokenAuthentication):
         return request
 
 
+class TokenCache(object):
+
+    lock = threading.Lock()
+    tokens = {}
+
+
+    @classmethod
+    def get_key(cls, user, token):
+        # The stored password hash is part of the key so a rotated token is
+        # never matched again, even by processes that missed the invalidation
+        return hmac.new(
+            settings.SECRET_KEY.encode(),
+            "{}++{}++{}".format(user.name, user.password, token).encode(),
+            hashlib.sha256
+        ).hexdigest()
+
+    @classmethod
+    def check(cls, user, token):
+        if settings.API_TOKEN_CACHE_SECONDS <= 0:
+            return False
+
+        key = cls.get_key(user, token)
+        with cls.lock:
+            entry = cls.tokens.get(key, None)
+            if entry and entry[1] > time.time():
+                return True
+            cls.tokens.pop(key, None)
+        return False
+
+    @classmethod
+    def add(cls, user, token):
+        if settings.API_TOKEN_CACHE_SECONDS <= 0:
+            return
+
+        key = cls.get_key(user, token)
+        current_time = time.time()
+        with cls.lock:
+            if len(cls.tokens) >= settings.API_TOKEN_CACHE_ENTRIES:
+                for cache_key, entry in list(cls.tokens.items()):
+                    if entry[1] <= current_time:
+                        cls.tokens.pop(cache_key)
+                if len(cls.tokens) >= settings.API_TOKEN_CACHE_ENTRIES:
+                    cls.tokens.clear()
+
+            cls.tokens[key] = (user.name, current_time + settings.API_TOKEN_CACHE_SECONDS)
+
+    @classmethod
+    def clear(cls, user = None):
+        with cls.lock:
+            if user is None:
+                cls.tokens.clear()
+            else:
+                for key, entry in list(cls.tokens.items()):
+                    if entry[0] == user.name:
+                        cls.tokens.pop(key)
+
 
 class APITokenAuthentication(authentication.TokenAuthentication):
 
@@ -118,15 +178,25 @@ class APITokenAuthentication(authentication.TokenAuthentication):
         if not user.is_active:
             raise exceptions.AuthenticationFailed('User account is inactive. Contact administrator')
 
-        if not user.check_password(token):
-            raise exceptions.AuthenticationFailed('Invalid token: User credentials are invalid')
+        if not TokenCache.check(user, token):
+            if not user.check_password(token):
+                raise exceptions.AuthenticationFailed('Invalid token: User credentials are invalid')
+            TokenCache.add(user, token)
 
-        user.last_login = now()
-        user.save()
+        self.update_last_login(user)
 
         self.user_class.facade.set_active_user(user)
         return (user, token)
 
+    def update_last_login(self, user):
+        login_time = now()
+        if user.last_login and (login_time - user.last_login).total_seconds() < settings.API_LAST_LOGIN_INTERVAL:
+            return
+
+        user.last_login = login_time
+        # Login times are not served data, so they skip the version rotation of model updates
+        type(user)._base_manager.filter(pk = user.pk).update(last_login = login_time)
+
 
 class CommandAPITokenAuthentication(APITokenAuthentication):
 
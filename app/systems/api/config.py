@@ -0,0 +1,7 @@
+from rest_framework.settings import APISettings, DEFAULTS, IMPORT_STRINGS
+
+from services.data.settings import REST_FRAMEWORK
+
+
+# Data views are also served in process by other services, such as the cache warmer
+data_api_settings = APISettings(REST_FRAMEWORK, DEFAULTS, IMPORT_STRINGS)
@@ -1,8 +1,19 @@
+from collections import OrderedDict
+
+from django.conf import settings
 from django.db.models.query import QuerySet
 
 from rest_framework_filters.filterset import FilterSet, FilterSetMetaclass
 from rest_framework_filters.filters import BooleanFilter, NumberFilter, CharFilter, DateFilter, DateTimeFilter, RelatedFilter, BaseInFilter, BaseRangeFilter
 from rest_framework_filters.backends import ComplexFilterBackend
+from rest_framework_filters.complex_ops import decode_complex_ops, combine_complex_queryset
+from rest_framework.exceptions import ValidationError
+from rest_framework.filters import SearchFilter
+
+from systems.api.config import data_api_settings
+from systems.db import search
+
+import threading
 
 
 class CharInFilter(BaseInFilter, CharFilter):
@@ -24,6 +35,75 @@ class BaseComplexFilterBackend(ComplexFilterBackend):
         '|': QuerySet.union,
         '-': QuerySet.difference,
     }
+    compose_operators = {
+        QuerySet.intersection: lambda left, right: left & right,
+        QuerySet.union: lambda left, right: left | right,
+        QuerySet.difference: lambda left, right: left.exclude(pk__in = right.values('pk'))
+    }
+
+
+    def filter_queryset(self, request, queryset, view):
+        if not settings.REST_COMPLEX_FILTER_COMPOSE or self.complex_filter_param not in request.query_params:
+            return super().filter_queryset(request, queryset, view)
+
+        try:
+            complex_ops = decode_complex_ops(
+                request.query_params[self.complex_filter_param],
+                self.operators,
+                self.negation
+            )
+            querysets = self.get_filtered_querysets(
+                [ op.querystring for op in complex_ops ],
+                request, queryset, view
+            )
+        except ValidationError as e:
+            raise ValidationError({ self.complex_filter_param: e.detail })
+
+        if not all(self.check_composable(sub_queryset) for sub_queryset in querysets):
+            return combine_complex_queryset(querysets, complex_ops)
+
+        return self.compose_queryset(queryset, querysets, complex_ops)
+
+    def check_composable(self, queryset):
+        query = queryset.query
+        if query.combinator or not query.can_filter() or query.distinct_fields:
+            return False
+
+        for annotation in query.annotations.values():
+            if getattr(annotation, 'contains_aggregate', False):
+                return False
+        return True
+
+    def compose_queryset(self, queryset, querysets, complex_ops):
+        # Sub filters are merged into a single WHERE tree instead of compound SELECTs
+        composed = None
+
+        for index, sub_queryset in enumerate(querysets):
+            if complex_ops[index].negate:
+                sub_queryset = queryset.exclude(pk__in = sub_queryset.values('pk'))
+
+            if composed is None:
+                composed = sub_queryset
+            else:
+                composed = self.compose_operators[complex_ops[index - 1].op](composed, sub_queryset)
+
+        return composed
+
+
+class DataSearchFilter(SearchFilter):
+    search_param = data_api_settings.SEARCH_PARAM
+
+    def filter_queryset(self, request, queryset, view):
+        search_fields = self.get_search_fields(view, request)
+        search_terms = self.get_search_terms(request)
+
+        if search_fields and search_terms:
+            # Indexed searches match word prefixes, not arbitrary substrings
+            search_queryset = search.filter_queryset(queryset, search_fields, search_terms)
+            if search_queryset is not None:
+                return search_queryset
+
+        return super().filter_queryset(request, queryset, view)
 
 
 class MetaFilterSet(FilterSetMetaclass):
@@ -102,30 +182,66 @@ class DataRelatedFilter(RelatedFilter):
         return self.filterset._meta.model.objects.all()
 
 
-def DataFilterSet(facade, aggregate_fields = None):
-    class_name = "{}DataFilterSet".format(facade.name.title())
+class FilterSetCache(object):
+
+    lock = threading.Lock()
+    filtersets = OrderedDict()
+
+
+    @classmethod
+    def get(cls, key):
+        with cls.lock:
+            filterset = cls.filtersets.get(key, None)
+            if filterset is not None:
+                cls.filtersets.move_to_end(key)
+            return filterset
+
+    @classmethod
+    def set(cls, key, filterset):
+        with cls.lock:
+            cls.filtersets[key] = filterset
+            cls.filtersets.move_to_end(key)
+
+            while len(cls.filtersets) > settings.FILTERSET_CACHE_ENTRIES:
+                cls.filtersets.popitem(last = False)
 
-    if not aggregate_fields and class_name in globals():
-        return globals()[class_name]
 
-    if aggregate_fields is None:
-        aggregate_fields = []
+def DataFilterSet(facade, aggregate_fields = None):
+    class_name = "{}DataFilterSet".format(facade.name.title())
 
-    field_map = {
-        '_boolean_fields': facade.boolean_fields,
-        '_text_fields': facade.text_fields,
-        '_number_fields': facade.number_fields + list(aggregate_fields),
-        '_time_fields': facade.time_fields,
-        'Meta': type('Meta', (object,), {
-            'model': facade.model,
-            'fields': []
+    if class_name in globals():
+        filterset = globals()[class_name]
+    else:
+        field_map = {
+            '_boolean_fields': facade.boolean_fields,
+            '_text_fields': facade.text_fields,
+            '_number_fields': facade.number_fields,
+            '_time_fields': facade.time_fields,
+            'Meta': type('Meta', (object,), {
+                'model': facade.model,
+                'fields': []
+            })
+        }
+        for field_name, info in facade.get_all_relations().items():
+            if getattr(info['model'], 'facade', None):
+                relation_facade = info['model'].facade
+                field_map[field_name] = DataRelatedFilter("systems.api.filters.{}DataFilterSet".format(relation_facade.name.title()))
+
+        filterset = type(class_name, (BaseFilterSet,), field_map)
+        globals()[class_name] = filterset
+
+    if not aggregate_fields:
+        return filterset
+
+    # Aggregate variants only declare their own number filters on top of the base class
+    cache_key = (facade.name, frozenset(aggregate_fields))
+    aggregate_filterset = FilterSetCache.get(cache_key)
+
+    if aggregate_filterset is None:
+        aggregate_filterset = type("{}Aggregate".format(class_name), (filterset,), {
+            '_number_fields': sorted(cache_key[1]),
+            'Meta': filterset.Meta
         })
-    }
-    for field_name, info in facade.get_all_relations().items():
-        if getattr(info['model'], 'facade', None):
-            relation_facade = info['model'].facade
-            field_map[field_name] = DataRelatedFilter("systems.api.filters.{}DataFilterSet".format(relation_facade.name.title()))
-
-    filterset = type(class_name, (BaseFilterSet,), field_map)
-    globals()[class_name] = filterset
-    return filterset
\ No newline at end of file
+        FilterSetCache.set(cache_key, aggregate_filterset)
+
+    return aggregate_filterset
@@ -1,18 +1,125 @@
 from collections import OrderedDict
 
 from django.conf import settings
+from django.core.paginator import Paginator as DjangoPaginator, Page as DjangoPage, InvalidPage, EmptyPage
+from django.utils.functional import cached_property
+from django.db.models import F, Q
+from django.utils.dateparse import parse_date, parse_datetime, parse_time
 
+from rest_framework.exceptions import NotFound
 from rest_framework.response import Response
-from rest_framework.pagination import PageNumberPagination
+from rest_framework.pagination import PageNumberPagination, BasePagination as RestBasePagination, _positive_int
+from rest_framework.utils.urls import replace_query_param, remove_query_param
+
+from systems.db.count import get_count, get_exact_count
+
+import datetime
+import decimal
+import uuid
+import base64
+import json
+import binascii
+
+
+CURSOR_TYPES = (
+    ('datetime', datetime.datetime, lambda value: value.isoformat(), parse_datetime),
+    ('date', datetime.date, lambda value: value.isoformat(), parse_date),
+    ('time', datetime.time, lambda value: value.isoformat(), parse_time),
+    ('decimal', decimal.Decimal, str, decimal.Decimal),
+    ('uuid', uuid.UUID, str, uuid.UUID)
+)
+
+
+def check_exact_count(request):
+    return request.query_params.get('exact', 'false').lower() in ('1', 'true', 'yes')
+
+
+class CountPage(DjangoPage):
+
+    def __init__(self, object_list, number, paginator, next_page):
+        super().__init__(object_list, number, paginator)
+        self.next_page = next_page
+
+    def has_next(self):
+        return self.next_page
+
+    def start_index(self):
+        if not self.object_list:
+            return 0
+        return (self.number - 1) * self.paginator.per_page + 1
+
+    def end_index(self):
+        return self.start_index() + len(self.object_list) - 1 if self.object_list else 0
+
+
+class CountPaginator(DjangoPaginator):
+
+    def __init__(self, object_list, per_page, exact = False, **kwargs):
+        super().__init__(object_list, per_page, **kwargs)
+        self.exact = exact
+
+    @cached_property
+    def count(self):
+        return get_exact_count(self.object_list)
+
+    @cached_property
+    def total(self):
+        # Reported only, page bounds never depend on an estimate
+        return get_count(self.object_list, exact = self.exact)
+
+
+    def validate_number(self, number):
+        try:
+            if isinstance(number, float) and not number.is_integer():
+                raise ValueError
+            number = int(number)
+        except (TypeError, ValueError):
+            raise InvalidPage('That page number is not an integer')
+        if number < 1:
+            raise EmptyPage('That page number is less than 1')
+        return number
+
+    def page(self, number):
+        number = self.validate_number(number)
+        bottom = (number - 1) * self.per_page
+        object_list = list(self.object_list[bottom:bottom + self.per_page + 1])
+
+        if not object_list and (number > 1 or not self.allow_empty_first_page):
+            raise EmptyPage('That page contains no results')
+
+        return CountPage(object_list[:self.per_page], number, self, len(object_list) > self.per_page)
 
 
 class BasePagination(PageNumberPagination):
     page_query_param = 'page'
     page_size_query_param = 'count'
 
+    def paginate_queryset(self, queryset, request, view = None):
+        page_size = self.get_page_size(request)
+        if not page_size:
+            return None
+
+        paginator = CountPaginator(queryset, page_size, exact = check_exact_count(request))
+        page_number = request.query_params.get(self.page_query_param, 1)
+        if page_number in self.last_page_strings:
+            page_number = paginator.num_pages
+
+        try:
+            self.page = paginator.page(page_number)
+        except InvalidPage as exc:
+            raise NotFound(self.invalid_page_message.format(
+                page_number = page_number, message = str(exc)
+            ))
+
+        if self.page.has_other_pages() and self.template is not None:
+            self.display_page_controls = True
+
+        self.request = request
+        return list(self.page)
+
     def get_paginated_response(self, data):
         return Response(OrderedDict([
-            ('count', self.page.paginator.count),
+            ('count', self.page.paginator.total),
             ('next', self.get_next_link()),
             ('previous', self.get_previous_link()),
             ('results', data)
@@ -32,10 +139,200 @@ class ResultNoPagination(BasePagination):
 
     def get_paginated_response(self, data):
         return Response(OrderedDict([
-            ('count', self.queryset.count()),
+            ('count', len(data)),
             ('results', data)
         ]))
 
 class TestResultSetPagination(BasePagination):
     page_size = 5
-    max_page_size = 10
\ No newline at end of file
+    max_page_size = 10
+
+
+class ResultCursorPagination(RestBasePagination):
+    cursor_query_param = 'cursor'
+    page_size_query_param = 'count'
+    total_query_param = 'total'
+    page_size = settings.REST_PAGE_COUNT
+    max_page_size = 1000
+
+    field_prefix = 'zimagi_cursor_'
+    invalid_cursor_message = 'Invalid cursor'
+
+
+    def paginate_queryset(self, queryset, request, view = None):
+        self.request = request
+        self.base_url = remove_query_param(request.build_absolute_uri(), 'page')
+        self.page_size = self.get_page_size(request)
+        self.ordering = self.get_ordering(queryset)
+        self.total = get_count(queryset, exact = check_exact_count(request)) if self.include_total(request) else None
+
+        cursor = self.decode_cursor(request)
+        reverse = cursor['reverse'] if cursor else False
+
+        queryset = queryset.annotate(**{
+            self._field_name(index): F(field.lstrip('-')) for index, field in enumerate(self.ordering)
+        }).order_by(*self._get_order(reverse))
+
+        if cursor:
+            queryset = queryset.filter(self._get_filter(cursor['values'], reverse))
+
+        results = list(queryset[:self.page_size + 1])
+        has_more = len(results) > self.page_size
+        results = results[:self.page_size]
+        if reverse:
+            results.reverse()
+
+        if reverse:
+            self.has_next = True
+            self.has_previous = has_more
+        else:
+            self.has_next = has_more
+            self.has_previous = cursor is not None
+
+        self.first_values = self._get_values(results[0]) if results else None
+        self.last_values = self._get_values(results[-1]) if results else None
+        return results
+
+    def get_paginated_response(self, data):
+        return Response(OrderedDict([
+            ('count', self.total),
+            ('next', self.get_next_link()),
+            ('previous', self.get_previous_link()),
+            ('results', data)
+        ]))
+
+
+    def get_page_size(self, request):
+        try:
+            return _positive_int(
+                request.query_params[self.page_size_query_param],
+                strict = True,
+                cutoff = self.max_page_size
+            )
+        except (KeyError, ValueError):
+            return self.page_size
+
+    def include_total(self, request):
+        return request.query_params.get(self.total_query_param, 'true').lower() not in ('0', 'false', 'no')
+
+    def get_ordering(self, queryset):
+        ordering = queryset.query.order_by or queryset.query.get_meta().ordering or []
+        pk_name = queryset.model._meta.pk.name
+        fields = []
+
+        for field in ordering:
+            if isinstance(field, str) and field != '?' and field.lstrip('-') not in ('pk', pk_name):
+                if field.lstrip('-') not in [ existing.lstrip('-') for existing in fields ]:
+                    fields.append(field)
+
+        fields.append(pk_name)
+        return fields
+
+
+    def get_next_link(self):
+        if not self.has_next or self.last_values is None:
+            return None
+        return replace_query_param(self.base_url, self.cursor_query_param, self.encode_cursor(self.last_values, False))
+
+    def get_previous_link(self):
+        if not self.has_previous or self.first_values is None:
+            return None
+        return replace_query_param(self.base_url, self.cursor_query_param, self.encode_cursor(self.first_values, True))
+
+
+    def encode_cursor(self, values, reverse):
+        values = [ self._encode_value(value) for value in values ]
+        data = json.dumps([ self.ordering, values, reverse ], separators = (',', ':'))
+        return base64.urlsafe_b64encode(data.encode()).decode().rstrip('=')
+
+    def decode_cursor(self, request):
+        encoded = request.query_params.get(self.cursor_query_param, None)
+        if not encoded:
+            return None
+        try:
+            data = base64.urlsafe_b64decode(encoded + ('=' * (-len(encoded) % 4)))
+            ordering, values, reverse = json.loads(data.decode())
+
+            if ordering != self.ordering or not isinstance(values, list) or len(values) != len(self.ordering):
+                raise ValueError(self.invalid_cursor_message)
+
+            values = [ self._decode_value(value) for value in values ]
+
+        except (TypeError, ValueError, decimal.InvalidOperation, binascii.Error):
+            raise NotFound(self.invalid_cursor_message)
+
+        return { 'values': values, 'reverse': bool(reverse) }
+
+
+    def _encode_value(self, value):
+        # Typed values keep full precision so keyset filters match the boundary row exactly
+        for name, value_type, encode, decode in CURSOR_TYPES:
+            if isinstance(value, value_type):
+                return { name: encode(value) }
+        return value
+
+    def _decode_value(self, value):
+        if isinstance(value, dict):
+            for name, value_type, encode, decode in CURSOR_TYPES:
+                if list(value.keys()) == [ name ]:
+                    value = decode(value[name])
+                    if value is None:
+                        raise ValueError(self.invalid_cursor_message)
+                    return value
+            raise ValueError(self.invalid_cursor_message)
+        return value
+
+
+    def _field_name(self, index):
+        return "{}{}".format(self.field_prefix, index)
+
+    def _get_values(self, instance):
+        values = []
+        for index in range(len(self.ordering)):
+            name = self._field_name(index)
+            values.append(instance[name] if isinstance(instance, dict) else getattr(instance, name))
+        return values
+
+    def _get_order(self, reverse):
+        # Nulls are pinned to the end so keyset comparisons stay well defined
+        order = []
+        for index, field in enumerate(self.ordering):
+            descending = field.startswith('-') != reverse
+            expression = F(self._field_name(index))
+
+            if reverse:
+                order.append(expression.desc(nulls_first = True) if descending else expression.asc(nulls_first = True))
+            else:
+                order.append(expression.desc(nulls_last = True) if descending else expression.asc(nulls_last = True))
+        return order
+
+    def _get_filter(self, values, reverse):
+        query = None
+        for index, field in enumerate(self.ordering):
+            name = self._field_name(index)
+            value = values[index]
+            descending = field.startswith('-') != reverse
+
+            if value is None:
+                if not reverse:
+                    continue
+                after = Q(**{ "{}__isnull".format(name): False })
+            else:
+                after = Q(**{ "{}__{}".format(name, 'lt' if descending else 'gt'): value })
+                if not reverse:
+                    after |= Q(**{ "{}__isnull".format(name): True })
+
+            for prev_index in range(index):
+                prev_name = self._field_name(prev_index)
+                prev_value = values[prev_index]
+
+                if prev_value is None:
+                    after &= Q(**{ "{}__isnull".format(prev_name): True })
+                else:
+                    after &= Q(**{ prev_name: prev_value })
+
+            query = after if query is None else (query | after)
+
+        if query is None:
+            return Q(pk__in = [])
+        return query
@@ -2,7 +2,9 @@ from datetime import datetime
 
 from rest_framework import fields
 from rest_framework.relations import HyperlinkedIdentityField
-from rest_framework.serializers import Serializer, HyperlinkedModelSerializer, PrimaryKeyRelatedField, SerializerMethodField
+from rest_framework.serializers import BaseSerializer as RestBaseSerializer, Serializer, HyperlinkedModelSerializer, PrimaryKeyRelatedField, SerializerMethodField
+
+from systems.api.config import data_api_settings
 
 import re
 
@@ -12,6 +14,12 @@ class BaseSerializer(Serializer):
 
 class BaseItemSerializer(HyperlinkedModelSerializer):
 
+    def build_standard_field(self, field_name, model_field):
+        field_class, field_kwargs = super().build_standard_field(field_name, model_field)
+        if issubclass(field_class, fields.DecimalField):
+            field_kwargs['coerce_to_string'] = data_api_settings.COERCE_DECIMAL_TO_STRING
+        return field_class, field_kwargs
+
     @property
     def view(self):
         return self._context.get('view', None)
@@ -76,6 +84,24 @@ def get_related_field_map(facade, fields = None, api_url = True, dynamic = True)
 
     return field_map
 
+def get_related_lookups(facade, serializer_class):
+    relations = facade.get_all_relations()
+    select_fields = []
+    prefetch_fields = []
+
+    for field_name, field in getattr(serializer_class, '_declared_fields', {}).items():
+        if field_name in relations and isinstance(field, RestBaseSerializer):
+            relation_field = relations[field_name]['field']
+
+            if relation_field.concrete and not relation_field.many_to_many:
+                select_fields.append(field_name)
+            elif relation_field.concrete:
+                prefetch_fields.append(field_name)
+            else:
+                prefetch_fields.append(relation_field.get_accessor_name())
+
+    return select_fields, prefetch_fields
+
 
 def LinkSerializer(facade):
     class_name = "{}LinkSerializer".format(facade.name.title())
@@ -13,7 +13,10 @@ from coreapi.transports.http import (
     _coerce_to_error
 )
 
+from django.conf import settings
 from django.core.management.base import CommandError
+
+from systems.commands import messages
 from utility.terminal import TerminalMixin
 from utility.encryption import Cipher
 
@@ -59,15 +62,12 @@ class CommandHTTPSTransport(TerminalMixin, BaseTransport):
 
 
     def _encrypt_params(self, params):
-        cipher = Cipher.get('params')
-        enc_params = {}
-
+        values = []
         for key, value in params.items():
-            key = cipher.encrypt(key)
-            value = cipher.encrypt(value)
-            enc_params[key] = value
+            values.extend([ key, value ])
 
-        return enc_params
+        values = Cipher.get('params').encrypt_many(values, framed = False)
+        return dict(zip(values[0::2], values[1::2]))
 
 
     def _build_get_request(self, session, url, headers, params):
@@ -145,13 +145,15 @@ class CommandHTTPSTransport(TerminalMixin, BaseTransport):
 
     def request_stream(self, url, headers, params, decoders):
         session = self.init_session(True) # POST
+        if settings.COMMAND_STREAM_BINARY:
+            headers = { **headers, 'Accept': "{}, {}".format(messages.STREAM_CONTENT_TYPE, headers.get('Accept', 'application/json')) }
         request = self._build_post_request(session, url, headers, params)
-        settings = session.merge_environment_settings(
+        request_settings = session.merge_environment_settings(
             request.url, None, True, False, None
         )
         logger.debug("Request headers: {}".format(request.headers))
 
-        response = session.send(request, **settings)
+        response = session.send(request, **request_settings)
         result = []
 
         if response.status_code >= 400:
@@ -164,9 +166,12 @@ class CommandHTTPSTransport(TerminalMixin, BaseTransport):
             raise CommandError()
 
         try:
-            for line in response.iter_lines():
-                data = self._decode_message(response, line, decoders)
+            if response.headers.get('content-type', '').startswith(messages.STREAM_CONTENT_TYPE):
+                stream = messages.unpack_messages(response.iter_content(chunk_size = None))
+            else:
+                stream = ( self._decode_message(response, line, decoders) for line in response.iter_lines() )
 
+            for data in stream:
                 if self._message_callback and callable(self._message_callback):
                     self._message_callback(data)
 
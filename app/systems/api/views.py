@@ -3,18 +3,22 @@ from datetime import datetime, date
 from urllib.parse import quote
 
 from django.conf import settings
-from django.core.management import call_command
 from django.http import HttpResponse, StreamingHttpResponse, HttpResponseNotFound, JsonResponse
 
 from rest_framework import status
 from rest_framework.response import Response
-from rest_framework.filters import SearchFilter, OrderingFilter
+from rest_framework.filters import OrderingFilter
 from rest_framework.views import APIView
 from rest_framework.viewsets import ModelViewSet
 
 from rest_framework_filters.backends import RestFrameworkFilterBackend
 
 from systems.api import filters, pagination, serializers
+from systems.api.config import data_api_settings
+from systems.commands import messages
+from systems.db import rollup as rollups
+from systems.db.count import get_count
+from systems.health.monitor import HealthMonitor
 from utility.encryption import Cipher
 from utility.runtime import check_api_test
 
@@ -26,21 +30,41 @@ import logging
 logger = logging.getLogger(__name__)
 
 
-class Status(APIView):
+class HealthView(APIView):
+    authentication_classes = []
+    permission_classes = []
+
+    @property
+    def monitor(self):
+        return HealthMonitor()
+
+
+class Status(HealthView):
 
     def get(self, request, format = None):
-        try:
-            call_command('check')
+        if self.monitor.ready:
             return Response(
                 'System check successful',
                 status.HTTP_200_OK
             )
-        except Exception as e:
-            logger.error("Status check error: {}".format(e))
-            return Response(
-                'System check failed',
-                status.HTTP_500_INTERNAL_SERVER_ERROR
-            )
+        return Response(
+            'System check failed',
+            status.HTTP_500_INTERNAL_SERVER_ERROR
+        )
+
+class Liveness(HealthView):
+
+    def get(self, request, format = None):
+        return Response(self.monitor.live, status.HTTP_200_OK)
+
+class Readiness(HealthView):
+
+    def get(self, request, format = None):
+        ready = self.monitor.ready
+        return Response(
+            { 'ready': ready, **self.monitor.get_report() },
+            status.HTTP_200_OK if ready else status.HTTP_503_SERVICE_UNAVAILABLE
+        )
 
 
 class Command(APIView):
@@ -65,10 +89,16 @@ class Command(APIView):
         options = self._format_options(request.POST)
         command = self._get_command(options)
 
-        response = StreamingHttpResponse(
-            streaming_content = command.handle_api(options),
-            content_type = 'application/json'
-        )
+        if messages.check_stream_accept(request.META.get('HTTP_ACCEPT', '')):
+            response = StreamingHttpResponse(
+                streaming_content = command.handle_api(options, messages.pack_messages),
+                content_type = messages.STREAM_CONTENT_TYPE
+            )
+        else:
+            response = StreamingHttpResponse(
+                streaming_content = command.handle_api(options),
+                content_type = 'application/json'
+            )
         response['Cache-Control'] = 'no-cache'
         return response
 
@@ -97,12 +127,16 @@ class BaseDataViewSet(ModelViewSet):
 
     facade = None
 
+    authentication_classes = data_api_settings.DEFAULT_AUTHENTICATION_CLASSES
+    permission_classes = data_api_settings.DEFAULT_PERMISSION_CLASSES
+    renderer_classes = data_api_settings.DEFAULT_RENDERER_CLASSES
+
     lookup_value_regex = '[^/]+'
     action_filters = {
         'list': (
             filters.BaseComplexFilterBackend,
             RestFrameworkFilterBackend,
-            SearchFilter,
+            filters.DataSearchFilter,
             OrderingFilter
         ),
         'values': 'list',
@@ -123,9 +157,22 @@ class BaseDataViewSet(ModelViewSet):
             if annotations is None:
                 annotations = get_aggregate_fields(queryset.model.facade, request_fields)
             queryset = queryset.annotate(**annotations).values(*request_fields)
+        else:
+            queryset = self.get_related_queryset(queryset)
 
         return queryset
 
+    def get_related_queryset(self, queryset):
+        select_fields, prefetch_fields = serializers.get_related_lookups(
+            self.facade,
+            self.get_serializer_class()
+        )
+        if select_fields:
+            queryset = queryset.select_related(*select_fields)
+        if prefetch_fields:
+            queryset = queryset.prefetch_related(*prefetch_fields)
+        return queryset
+
     def limit_queryset(self, queryset, count = None):
         if count:
             queryset = queryset[:int(count)]
@@ -143,11 +190,16 @@ class BaseDataViewSet(ModelViewSet):
         self.search_fields = request_fields
         self.ordering_fields = request_fields
 
+        queryset = self.filter_queryset(self.get_queryset(request_fields, annotations), annotations.keys())
+
+        rollup = rollups.find_rollup(facade, request_fields)
+        if rollup:
+            records = rollup.read(queryset, request_fields)
+            if records is not None:
+                queryset = records
+
         return {
-            'queryset': self.limit_queryset(
-                self.filter_queryset(self.get_queryset(request_fields, annotations), annotations.keys()),
-                count
-            ),
+            'queryset': self.limit_queryset(queryset, count),
             'fields': request_fields,
             'count': count
         }
@@ -222,7 +274,10 @@ class BaseDataViewSet(ModelViewSet):
         queryset = self.filter_queryset(self.get_queryset().order_by(field_lookup))
 
         serializer = self.get_serializer({
-            'count': queryset.values_list(field_lookup, flat = True).count()
+            'count': get_count(
+                queryset.values_list(field_lookup, flat = True),
+                exact = pagination.check_exact_count(request)
+            )
         }, many = False)
         return Response(serializer.data)
 
@@ -254,6 +309,8 @@ class BaseDataViewSet(ModelViewSet):
                 self._paginator = pagination.TestResultSetPagination()
             elif not self._allow_pagination(self.request):
                 self._paginator = pagination.ResultNoPagination()
+            elif 'cursor' in self.request.query_params:
+                self._paginator = pagination.ResultCursorPagination()
             else:
                 self._paginator = self.pagination_class()
 
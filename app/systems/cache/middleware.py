@@ -1,13 +1,61 @@
 from django.conf import settings
-from django.core.cache import caches
+from django.http import HttpResponseNotModified
+from django.urls import resolve, Resolver404
 from django.utils.cache import (
     get_cache_key, get_max_age, has_vary_header, learn_cache_key,
     patch_response_headers,
 )
 from django.utils.deprecation import MiddlewareMixin
+from django.utils.http import parse_etags
 
+from systems.cache.tiered import TieredCache
+from systems.cache.version import get_cache_version
+from systems.health.monitor import check_health_path
 from systems.models.index import Model
 
+import hashlib
+import json
+import re
+
+
+ETAG_ACTIONS = ('list', 'retrieve', 'values', 'count')
+
+
+def get_request_facade(request):
+    try:
+        match = resolve(request.path_info, getattr(request, 'urlconf', None))
+    except Resolver404:
+        return (None, None)
+
+    facade = getattr(getattr(match.func, 'cls', None), 'facade', None)
+    action = getattr(match.func, 'actions', {}).get('get', None)
+    return (facade, action)
+
+def get_data_etag(request, facade, action, version):
+    if not facade or not version or action not in ETAG_ACTIONS:
+        return None
+
+    query = [
+        [ key, sorted(request.GET.getlist(key)) ]
+        for key in sorted(request.GET.keys()) if key != 'refresh'
+    ]
+    return '"{}"'.format(hashlib.sha256(json.dumps([
+        facade.name,
+        action,
+        request.path,
+        query,
+        version,
+        request.META.get('HTTP_AUTHORIZATION', '')
+    ]).encode()).hexdigest())
+
+def check_etag_match(request, etag):
+    if_none_match = request.META.get('HTTP_IF_NONE_MATCH', None)
+    if not etag or not if_none_match:
+        return False
+
+    etags = [ re.sub(r'^W/', '', value) for value in parse_etags(if_none_match) ]
+    return etag in etags or '*' in etags
+
 
 class UpdateCacheMiddleware(MiddlewareMixin):
 
@@ -17,15 +65,19 @@ class UpdateCacheMiddleware(MiddlewareMixin):
         self.cache_timeout = settings.CACHE_MIDDLEWARE_SECONDS
         self.key_prefix = settings.CACHE_MIDDLEWARE_KEY_PREFIX
         self.cache_alias = settings.CACHE_MIDDLEWARE_ALIAS
-        self.cache = caches[self.cache_alias]
+        self.cache = TieredCache.get_cache(self.cache_alias)
 
 
     def process_response(self, request, response):
-        if request.path != '/status':
+        if not check_health_path(request.path) and response.status_code != 304 and not getattr(request, '_cache_warm', False):
             cache_entry = Model('cache').facade.get_or_create(request.build_absolute_uri())
             cache_entry.requests += 1
             cache_entry.save()
 
+        etag = getattr(request, '_cache_etag', None)
+        if etag and response.status_code == 200 and not response.has_header('ETag'):
+            response['ETag'] = etag
+
         if not (hasattr(request, '_cache_update_cache') and request._cache_update_cache):
             return response
 
@@ -49,7 +101,8 @@ class UpdateCacheMiddleware(MiddlewareMixin):
         patch_response_headers(response, timeout)
 
         if timeout and response.status_code == 200:
-            cache_key = learn_cache_key(request, response, timeout, self.key_prefix, cache = self.cache)
+            key_prefix = getattr(request, '_cache_key_prefix', self.key_prefix)
+            cache_key = learn_cache_key(request, response, timeout, key_prefix, cache = self.cache)
             if hasattr(response, 'render') and callable(response.render):
                 response.add_post_render_callback(
                     lambda r: self.cache.set(cache_key, r, timeout)
@@ -67,26 +120,38 @@ class FetchCacheMiddleware(MiddlewareMixin):
 
         self.key_prefix = settings.CACHE_MIDDLEWARE_KEY_PREFIX
         self.cache_alias = settings.CACHE_MIDDLEWARE_ALIAS
-        self.cache = caches[self.cache_alias]
+        self.cache = TieredCache.get_cache(self.cache_alias)
 
 
     def process_request(self, request):
-        if request.method not in ('GET', 'HEAD') or request.path == '/status':
+        if request.method not in ('GET', 'HEAD') or check_health_path(request.path):
             request._cache_update_cache = False
             return None
 
+        facade, action = get_request_facade(request)
+        version = get_cache_version(facade)
+
+        request._cache_key_prefix = "{}{}.".format(self.key_prefix, version) if version else self.key_prefix
+        request._cache_etag = get_data_etag(request, facade, action, version)
+
+        if check_etag_match(request, request._cache_etag):
+            request._cache_update_cache = False
+            response = HttpResponseNotModified()
+            response['ETag'] = request._cache_etag
+            return response
+
         if request.GET.get('refresh', False):
             request._cache_update_cache = True
             return None
 
-        cache_key = get_cache_key(request, self.key_prefix, 'GET', cache = self.cache)
+        cache_key = get_cache_key(request, request._cache_key_prefix, 'GET', cache = self.cache)
         if cache_key is None:
             request._cache_update_cache = True
             return None
 
         response = self.cache.get(cache_key)
         if response is None and request.method == 'HEAD':
-            cache_key = get_cache_key(request, self.key_prefix, 'HEAD', cache = self.cache)
+            cache_key = get_cache_key(request, request._cache_key_prefix, 'HEAD', cache = self.cache)
             response = self.cache.get(cache_key)
 
         if response is None:
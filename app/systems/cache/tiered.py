@@ -0,0 +1,156 @@
+from collections import OrderedDict
+
+from django.conf import settings
+from django.core.cache import caches
+from django.http import HttpResponse
+
+import threading
+import pickle
+import time
+import zlib
+
+
+class CachedResponse(object):
+
+    def __init__(self, response):
+        self.status = response.status_code
+        self.headers = list(response.items())
+        self.content = zlib.compress(response.content, settings.CACHE_COMPRESS_LEVEL)
+
+    @property
+    def size(self):
+        return len(self.content) + sum(len(name) + len(value) for name, value in self.headers)
+
+    def render(self):
+        response = HttpResponse(zlib.decompress(self.content), status = self.status)
+        for name, value in self.headers:
+            response[name] = value
+        return response
+
+
+class LocalCache(object):
+
+    def __init__(self, max_entries, max_bytes, timeout):
+        self.lock = threading.Lock()
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.timeout = timeout
+        self.data = OrderedDict()
+        self.bytes = 0
+
+
+    def get(self, key):
+        with self.lock:
+            entry = self.data.get(key, None)
+            if entry is None:
+                return None
+
+            value, size, expires = entry
+            if expires <= time.time():
+                self._remove(key)
+                return None
+
+            self.data.move_to_end(key)
+            return value
+
+    def set(self, key, value, size, timeout = None):
+        if timeout is None or timeout > self.timeout:
+            timeout = self.timeout
+
+        if timeout <= 0 or size > self.max_bytes:
+            return
+
+        with self.lock:
+            if key in self.data:
+                self._remove(key)
+
+            self.data[key] = (value, size, time.time() + timeout)
+            self.bytes += size
+
+            while self.data and (len(self.data) > self.max_entries or self.bytes > self.max_bytes):
+                self._remove(next(iter(self.data)))
+
+    def delete(self, key):
+        with self.lock:
+            if key in self.data:
+                self._remove(key)
+
+    def clear(self):
+        with self.lock:
+            self.data.clear()
+            self.bytes = 0
+
+
+    def _remove(self, key):
+        value, size, expires = self.data.pop(key)
+        self.bytes -= size
+
+
+class TieredCache(object):
+
+    instances = {}
+    instance_lock = threading.Lock()
+
+    @classmethod
+    def get_cache(cls, alias):
+        with cls.instance_lock:
+            if alias not in cls.instances:
+                local = None
+                if settings.CACHE_LOCAL_ENTRIES > 0:
+                    local = LocalCache(
+                        settings.CACHE_LOCAL_ENTRIES,
+                        settings.CACHE_LOCAL_BYTES,
+                        settings.CACHE_LOCAL_SECONDS
+                    )
+                cls.instances[alias] = cls(caches[alias], local)
+            return cls.instances[alias]
+
+
+    def __init__(self, cache, local = None):
+        self.cache = cache
+        self.local = local
+
+
+    def get(self, key, default = None):
+        value = None
+
+        if self.local:
+            value = self.local.get(key)
+
+        if value is None:
+            value = self.cache.get(key, None)
+            if value is not None and self.local:
+                self.local.set(key, value, self._get_size(value))
+
+        if value is None:
+            return default
+        if isinstance(value, CachedResponse):
+            return value.render()
+        return value
+
+    def set(self, key, value, timeout = None):
+        if isinstance(value, HttpResponse):
+            value = CachedResponse(value)
+
+        self.cache.set(key, value, timeout)
+        if self.local:
+            self.local.set(key, value, self._get_size(value), timeout)
+
+    def delete(self, key):
+        self.cache.delete(key)
+        if self.local:
+            self.local.delete(key)
+
+    def clear(self):
+        self.cache.clear()
+        if self.local:
+            self.local.clear()
+
+    def close(self):
+        self.cache.close()
+
+
+    def _get_size(self, value):
+        if isinstance(value, CachedResponse):
+            return value.size
+        return len(pickle.dumps(value))
@@ -0,0 +1,89 @@
+from django.conf import settings
+from django.core.cache import caches
+from django.db.models.signals import m2m_changed
+from django.dispatch import receiver, Signal
+
+import hashlib
+import uuid
+
+
+GLOBAL_VERSION = '__global__'
+
+
+model_version_updated = Signal()
+
+
+def get_cache():
+    if settings.CACHE_MIDDLEWARE_ALIAS not in settings.CACHES:
+        return None
+    return caches[settings.CACHE_MIDDLEWARE_ALIAS]
+
+
+def get_version_key(name):
+    return "{}model-version:{}".format(settings.CACHE_MIDDLEWARE_KEY_PREFIX, name)
+
+def get_model_versions(*names):
+    cache = get_cache()
+    if cache is None:
+        return {}
+
+    keys = { get_version_key(name): name for name in names }
+    versions = cache.get_many(list(keys.keys()))
+
+    for key in set(keys.keys()) - set(versions.keys()):
+        cache.add(key, uuid.uuid4().hex, None)
+        versions[key] = cache.get(key)
+
+    return { keys[key]: value for key, value in versions.items() }
+
+def update_model_version(*names):
+    cache = get_cache()
+    if cache is not None and names:
+        cache.set_many({
+            get_version_key(name): uuid.uuid4().hex for name in names
+        }, None)
+        schedule_warm(cache)
+        model_version_updated.send(sender = None, names = names)
+
+def schedule_warm(cache):
+    # Changes within the delay window share a single warming pass
+    if settings.CACHE_WARM_DELAY > 0 and cache.add(get_warm_key(), 1, settings.CACHE_WARM_DELAY):
+        from systems.cache.warmer import queue_warm
+        queue_warm(settings.CACHE_WARM_DELAY)
+
+def get_warm_key():
+    return "{}cache-warm-scheduled".format(settings.CACHE_MIDDLEWARE_KEY_PREFIX)
+
+
+def check_versioned(model):
+    # Statistics models are written on every request and never invalidate cached data
+    return not getattr(model._meta, 'statistics', False)
+
+def get_version_names(*models):
+    return [ model._meta.db_table for model in models if check_versioned(model) ]
+
+
+def get_facade_version_names(facade):
+    models = [ facade.model ]
+    for field_name, info in facade.get_all_relations().items():
+        models.append(info['model'])
+    return sorted(set(get_version_names(*models)))
+
+def get_cache_version(facade = None):
+    # The global version rotates whenever the page cache is flushed
+    names = [ GLOBAL_VERSION ]
+    if facade:
+        names.extend(get_facade_version_names(facade))
+
+    versions = get_model_versions(*names)
+    if not versions:
+        return None
+    return hashlib.sha256("-".join([
+        "{}:{}".format(name, versions[name]) for name in sorted(versions.keys())
+    ]).encode()).hexdigest()
+
+
+@receiver(m2m_changed)
+def update_relation_version(sender, instance, action, model, **kwargs):
+    if action in ('post_add', 'post_remove', 'post_clear'):
+        update_model_version(*get_version_names(instance.__class__, model))
@@ -0,0 +1,123 @@
+from urllib.parse import urlparse
+
+from django.conf import settings
+from django.urls import set_urlconf
+
+from rest_framework.test import APIClient, ForceAuthClientHandler, force_authenticate
+
+from systems.models.index import Model
+from utility.parallel import Parallel
+
+import threading
+import time
+import logging
+
+
+logger = logging.getLogger(__name__)
+
+
+DATA_URLCONF = 'services.data.urls'
+
+
+def queue_warm(delay = 0):
+    from settings.tasks import warm_cache
+    try:
+        warm_cache.apply_async(countdown = delay)
+        return True
+
+    except Exception as e:
+        logger.warning("Cache warm could not be queued: {}".format(e))
+        return False
+
+
+class DataClientHandler(ForceAuthClientHandler):
+
+    def get_response(self, request):
+        # The hosting service ROOT_URLCONF may be missing or route to the command API
+        force_authenticate(request, self._force_user, self._force_token)
+        request.urlconf = DATA_URLCONF
+        request._cache_warm = True
+
+        set_urlconf(DATA_URLCONF)
+        response = self._middleware_chain(request)
+        response._resource_closers.append(request.close)
+        return response
+
+
+class DataClient(APIClient):
+
+    def __init__(self, enforce_csrf_checks = False, **defaults):
+        super().__init__(enforce_csrf_checks, **defaults)
+        self.handler = DataClientHandler(enforce_csrf_checks)
+
+
+class RateLimiter(object):
+
+    def __init__(self, rate):
+        self.lock = threading.Lock()
+        self.interval = (1.0 / rate) if rate and rate > 0 else 0
+        self.next_time = time.time()
+
+    def wait(self):
+        if self.interval:
+            with self.lock:
+                now = time.time()
+                wait_time = self.next_time - now
+                self.next_time = max(now, self.next_time) + self.interval
+
+            if wait_time > 0:
+                time.sleep(wait_time)
+
+
+class CacheWarmer(object):
+
+    def __init__(self, limit = None, rate = None, accept = None, disable_parallel = None):
+        self.limit = settings.CACHE_WARM_LIMIT if limit is None else limit
+        self.rate = settings.CACHE_WARM_RATE if rate is None else rate
+        self.accept = settings.CACHE_WARM_ACCEPT if accept is None else accept
+        self.disable_parallel = disable_parallel
+
+        self.limiter = RateLimiter(self.rate)
+        self.user = Model('user').facade.retrieve(settings.ADMIN_USER)
+
+
+    def get_urls(self):
+        facade = Model('cache').facade
+        return list(facade.all().order_by('-requests').values_list('name', flat = True)[:self.limit])
+
+
+    def fetch(self, url):
+        components = urlparse(url)
+        path = components.path
+        if components.query:
+            path = "{}?{}".format(path, components.query)
+
+        client = DataClient()
+        client.force_authenticate(user = self.user)
+
+        results = []
+        for accept in self.accept:
+            self.limiter.wait()
+            response = client.get(path,
+                secure = components.scheme == 'https',
+                SERVER_NAME = components.hostname or 'localhost',
+                SERVER_PORT = str(components.port or (443 if components.scheme == 'https' else 80)),
+                HTTP_ACCEPT = accept
+            )
+            results.append({
+                'url': url,
+                'accept': accept,
+                'status': response.status_code,
+                'cache': response.get('Object-Cache', 'NONE')
+            })
+            logger.debug("Cache warm {} ({}): {} {}".format(url, accept, results[-1]['status'], results[-1]['cache']))
+        return results
+
+
+    def warm(self):
+        results = Parallel.list(self.get_urls(), self.fetch,
+            disable_parallel = self.disable_parallel
+        )
+        for error in results.errors:
+            logger.warning("Cache warm failed for {}: {}".format(error.name, error.error))
+        return results
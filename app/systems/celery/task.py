@@ -3,9 +3,13 @@ from django.conf import settings
 from django.core.mail import send_mail
 from celery import Task
 from celery.exceptions import TaskError
+from celery.signals import task_prerun
 from celery.utils.log import get_task_logger
 
 from systems.commands.action import ActionCommand
+from systems.cache.warmer import CacheWarmer
+from systems.db import rollup
+from systems.db.router import DatabaseRouter
 from utility.data import ensure_list
 
 import sys
@@ -16,6 +20,12 @@ import json
 logger = get_task_logger(__name__)
 
 
+@task_prerun.connect
+def reset_database_router(**kwargs):
+    # Worker processes run many tasks, so reads are only pinned within a task
+    DatabaseRouter.reset()
+
+
 class CommandTask(Task):
 
     def __init__(self):
@@ -73,6 +83,22 @@ class CommandTask(Task):
         )
 
 
+    def refresh_rollups(self):
+        self.command.run_exclusive('zimagi-task-rollup-refresh', rollup.refresh_rollups,
+            error_on_locked = True
+        )
+
+
+    def warm_cache(self):
+        def run():
+            results = CacheWarmer().warm()
+            logger.info("Warmed {} cached URLs ({} failed)".format(len(results.data), len(results.errors)))
+
+        self.command.run_exclusive('zimagi-task-cache-warm', run,
+            error_on_locked = True
+        )
+
+
     def send_notification(self, recipient, subject, body):
         if settings.EMAIL_HOST and settings.EMAIL_HOST_USER:
             try:
@@ -6,6 +6,7 @@ from systems.commands.index import CommandMixin
 from systems.commands.mixins import exec
 from systems.commands import base, args, messages
 from systems.api import client
+from systems.db.router import DatabaseRouter
 from utility.runtime import Runtime
 from utility import display
 
@@ -204,6 +205,7 @@ class ActionCommand(
         pass
 
     def _exec_wrapper(self):
+        DatabaseRouter.reset()
         try:
             success = True
 
@@ -349,6 +351,9 @@ class ActionCommand(
         env = self.get_env()
         success = True
 
+        if primary:
+            DatabaseRouter.reset()
+
         self.log_init(self.options.export(), task)
         try:
             if not self.local and env and env.host and self.server_enabled() and self.remote_exec():
@@ -405,7 +410,10 @@ class ActionCommand(
             self.error("")
 
 
-    def handle_api(self, options):
+    def handle_api(self, options, encoder = None):
+        if encoder is None:
+            encoder = lambda batch: "".join([ msg.to_package() for msg in batch ])
+
         env = self.get_env()
         success = True
 
@@ -422,6 +430,7 @@ class ActionCommand(
                 time.sleep(0.25)
                 logger.debug("Checking messages")
 
+                batch = []
                 for data in iter(self.messages.get, None):
                     logger.debug("Receiving data: {}".format(data))
 
@@ -429,8 +438,10 @@ class ActionCommand(
                     if isinstance(msg, messages.ErrorMessage):
                         success = False
 
-                    package = msg.to_package()
-                    yield package
+                    batch.append(msg)
+
+                if batch:
+                    yield encoder(batch)
 
                 if not action.is_alive():
                     logger.debug("Command thread is no longer active")
@@ -18,6 +18,9 @@ from data.user.models import User
 from systems.commands.index import CommandMixin
 from systems.commands.mixins import renderer
 from systems.commands import args, messages, help, options
+from systems.db.pool import release_connections
+from systems.db.router import DatabaseRouter
+from systems.models.identity import IdentityMap
 from systems.api.schema import command
 from utility.terminal import TerminalMixin
 from utility.runtime import Runtime
@@ -306,7 +309,7 @@ class BaseCommand(
                 user_groups.append(group)
 
         if len(user_groups):
-            if not self.active_user.env_groups.filter(name__in = user_groups).exists():
+            if not self.active_user.check_env_groups(user_groups):
                 self.warning("Operation {} {} {} access requires at least one of the following roles in environment: {}".format(
                     self.get_full_name(),
                     instance.facade.name,
@@ -524,7 +527,24 @@ class BaseCommand(
 
 
     def run_list(self, items, callback):
-        results = Parallel.list(items, callback, disable_parallel = self.no_parallel)
+        identity_map = IdentityMap.active()
+        pinned = [ DatabaseRouter.pinned() ]
+
+        def run_item(item):
+            # Read your writes routing carries across the worker threads of a command
+            if pinned[0]:
+                DatabaseRouter.pin()
+            try:
+                with IdentityMap.scope(identity_map):
+                    return callback(item)
+            finally:
+                if DatabaseRouter.pinned():
+                    pinned[0] = True
+
+        release_connections()
+        results = Parallel.list(items, run_item, disable_parallel = self.no_parallel)
+        if pinned[0]:
+            DatabaseRouter.pin()
 
         if results.aborted:
             for thread in results.errors:
@@ -535,8 +555,12 @@ class BaseCommand(
         return results
 
     def run_exclusive(self, lock_id, callback, error_on_locked = False, wait = True, timeout = 600, interval = 2):
+        def run_callback():
+            with IdentityMap.scope(fresh = True):
+                callback()
+
         if not lock_id:
-            callback()
+            run_callback()
         else:
             start_time = time.time()
             current_time = start_time
@@ -544,7 +568,7 @@ class BaseCommand(
             while (current_time - start_time) <= timeout:
                 try:
                     with db_mutex(lock_id):
-                        callback()
+                        run_callback()
                         break
 
                 except DBMutexError:
@@ -0,0 +1,175 @@
+from django.conf import settings
+
+from utility.data import ensure_list
+
+
+class BulkClear(object):
+
+    excluded_children = ('module', 'group', 'state', 'config', 'log', 'user')
+
+
+    def __init__(self, command, force = False):
+        self.command = command
+        self.force = force
+        self.graph = command.manager.index.get_dependency_graph()
+        self.facade_index = command.manager.index.get_facade_index()
+        self.batch_size = settings.DB_CLEAR_BATCH_SIZE
+        self.visited = {}
+        self.bulk = {}
+        self.steps = []
+
+
+    def get_facade(self, name):
+        facade = self.facade_index[name].view()
+        facade.set_scope({})
+        return facade
+
+    def get_batches(self, ids):
+        ids = list(ids)
+        for index in range(0, len(ids), self.batch_size):
+            yield ids[index:index + self.batch_size]
+
+
+    def clear(self, facade, instances):
+        ids = [ getattr(instance, facade.pk) for instance in instances ]
+        if not ids:
+            return {}
+
+        # Every restriction is checked before anything is finalized or deleted
+        self.resolve(facade.name, ids)
+
+        counts = {}
+        for operation, facade, ids, child in self.steps:
+            if operation == 'clear':
+                self.clear_children(facade, child, ids)
+            elif operation == 'finalize':
+                self.finalize(facade, ids)
+            else:
+                self.delete(facade, ids)
+                counts[facade.name] = counts.get(facade.name, 0) + len(ids)
+        return counts
+
+
+    def resolve(self, name, ids):
+        facade = self.get_facade(name)
+        visited = self.visited.setdefault(name, set())
+        ids = [ id for id in ids if id not in visited ]
+        if not ids:
+            return
+
+        visited.update(ids)
+        self.check_restricted(facade, ids)
+
+        # Resources without providers are removed without a child cascade
+        if getattr(facade, 'provider_name', None):
+            for child, field in self.graph.get_child_relations(name, 'pre'):
+                if child not in self.excluded_children and self.get_command_base(child):
+                    self.resolve_child(facade, child, field, ids)
+
+            self.steps.append(('finalize', facade, ids, None))
+
+            for child, field in self.graph.get_child_relations(name, 'post'):
+                if self.get_command_base(child):
+                    self.resolve_child(facade, child, field, ids)
+
+        self.steps.append(('delete', facade, ids, None))
+
+    def resolve_child(self, facade, child, field, ids):
+        if self.check_bulk(child):
+            self.resolve(child, self.get_child_ids(child, field, ids))
+        else:
+            self.steps.append(('clear', facade, ids, child))
+
+    def get_command_base(self, name):
+        command_base = getattr(self.facade_index[name].meta, 'command_base', None)
+        if command_base is None:
+            command_base = name.replace('_', ' ')
+        return command_base
+
+    def get_clear_command(self, name):
+        from systems.commands.router import RouterCommand
+
+        command = self.command.manager.index.command_tree
+        for component in "{} clear".format(self.get_command_base(name)).split():
+            if not isinstance(command, RouterCommand):
+                return None
+            command = command.get(component)
+        return command
+
+    def check_bulk(self, name):
+        from plugins.data import BasePlugin as DataPlugin
+
+        if name not in self.bulk:
+            # Provider delete locks and remove command hooks only run on the per instance path
+            bulk = getattr(self.get_clear_command(name), 'bulk_clear', True)
+            provider_name = getattr(self.facade_index[name], 'provider_name', None)
+
+            if bulk and provider_name:
+                for provider_class in self.command.manager.index.get_plugin_providers(provider_name, True).values():
+                    if provider_class.delete_lock_id is not DataPlugin.delete_lock_id:
+                        bulk = False
+            self.bulk[name] = bulk
+        return self.bulk[name]
+
+    def check_restricted(self, facade, ids):
+        restricted = []
+        for batch in self.get_batches(ids):
+            for key in facade.model.objects.filter(pk__in = batch).values_list(facade.key(), flat = True):
+                if key in ensure_list(facade.keep(key)):
+                    restricted.append(str(key))
+
+        if restricted:
+            self.command.error("Removal of {} {} is restricted (has dependencies)".format(facade.name, ", ".join(restricted)))
+
+    def get_child_ids(self, name, field, ids):
+        model = self.facade_index[name].model
+        child_ids = []
+        for batch in self.get_batches(ids):
+            child_ids.extend(model.objects.filter(**{ "{}__in".format(field): batch }).values_list('pk', flat = True))
+        return child_ids
+
+
+    def get_finalize_types(self, facade):
+        from plugins.data import BasePlugin as DataPlugin
+
+        provider_name = getattr(facade, 'provider_name', None)
+        if not provider_name:
+            return []
+
+        providers = self.command.manager.index.get_plugin_providers(provider_name, True)
+        return [
+            name for name, provider_class in providers.items()
+            if provider_class.finalize_instance is not DataPlugin.finalize_instance
+        ]
+
+    def finalize(self, facade, ids):
+        provider_types = self.get_finalize_types(facade)
+        if not provider_types:
+            return
+
+        def finalize_instance(instance):
+            try:
+                if instance.initialize(self.command):
+                    instance.provider.finalize_instance(instance)
+            except Exception as e:
+                if not self.force:
+                    raise e
+                self.command.warning("Finalization of {} {} failed: {}".format(facade.name, getattr(instance, facade.key()), e))
+
+        for batch in self.get_batches(ids):
+            self.command.run_list(
+                facade.model.objects.filter(pk__in = batch, provider_type__in = provider_types),
+                finalize_instance
+            )
+
+    def clear_children(self, facade, child, ids):
+        for batch in self.get_batches(ids):
+            for instance in facade.model.objects.filter(pk__in = batch):
+                options = self.command.get_scope_filters(instance)
+                options['force'] = self.force
+                options["{}_name".format(facade.name)] = getattr(instance, facade.key())
+                self.command.exec_local("{} clear".format(self.get_command_base(child)), options)
+
+    def delete(self, facade, ids):
+        for batch in self.get_batches(ids):
+            facade.clear(**{ "{}__in".format(facade.pk): batch })
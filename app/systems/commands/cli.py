@@ -20,7 +20,8 @@ django_allowed_commands = [
     'inspectdb',
     'showmigrations',
     'makemigrations',
-    'migrate'
+    'migrate',
+    'test'
 ]
 
 
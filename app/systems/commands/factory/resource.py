@@ -1,5 +1,6 @@
 from collections import OrderedDict
 
+from systems.commands.clear import BulkClear
 from utility.data import ensure_list
 from .helpers import *
 
@@ -373,6 +374,7 @@ def RemoveCommand(parents, base_name, facade_name,
 def ClearCommand(parents, base_name, facade_name,
     edit_roles = None,
     name_field = None,
+    bulk = True,
     pre_methods = {},
     post_methods = {}
 ):
@@ -404,6 +406,15 @@ def ClearCommand(parents, base_name, facade_name,
         exec_methods(self, pre_methods)
         instances = self.search_instances(facade, self.search_queries, self.search_join)
 
+        bulk_clear = BulkClear(self, self.force)
+        if bulk and bulk_clear.check_bulk(facade.name):
+            counts = bulk_clear.clear(facade, instances)
+            for name, count in counts.items():
+                self.success("Successfully deleted {} {} instances".format(count, name))
+
+            exec_methods(self, post_methods)
+            return
+
         def remove(instance):
             options = self.get_scope_filters(instance)
             options['force'] = self.force
@@ -433,6 +444,7 @@ def ClearCommand(parents, base_name, facade_name,
     if edit_roles:
         methods['groups_allowed'] = __groups_allowed
 
+    methods['bulk_clear'] = bulk
     return type('ClearCommand', tuple(_parents), methods)
 
 
@@ -510,6 +522,7 @@ def ResourceCommandSet(command, parents, base_name, facade_name,
                 parents, base_name, facade_name,
                 edit_roles = edit_roles,
                 name_field = name_field,
+                bulk = not (remove_pre_methods or remove_post_methods),
                 pre_methods = clear_pre_methods,
                 post_methods = clear_post_methods
             )
@@ -1,3 +1,4 @@
+from django.conf import settings
 from django.utils.module_loading import import_string
 
 from utility.runtime import Runtime
@@ -7,19 +8,65 @@ from utility.display import format_data
 
 import sys
 import json
+import struct
+import zlib
+import msgpack
 import logging
 
 
 logger = logging.getLogger(__name__)
 
 
+STREAM_CONTENT_TYPE = 'application/vnd.zimagi.stream+msgpack'
+STREAM_COMPRESSED = 1
+
+
+def check_stream_accept(accept):
+    return STREAM_CONTENT_TYPE in [ media.split(';')[0].strip() for media in accept.split(',') ]
+
+def pack_messages(messages):
+    data = msgpack.packb([ message.render() for message in messages ], use_bin_type = True)
+    flags = 0
+
+    if len(data) >= settings.COMMAND_STREAM_COMPRESS_SIZE:
+        data = zlib.compress(data, settings.COMMAND_STREAM_COMPRESS_LEVEL)
+        flags |= STREAM_COMPRESSED
+
+    frame = bytes([ flags ]) + AppMessage.cipher.encrypt_frame(data)
+    return struct.pack('>I', len(frame)) + frame
+
+def unpack_messages(chunks):
+    buffer = bytearray()
+
+    for chunk in chunks:
+        buffer.extend(chunk)
+
+        while len(buffer) >= 4:
+            size = struct.unpack('>I', buffer[:4])[0]
+            if len(buffer) < (size + 4):
+                break
+
+            frame = bytes(buffer[4:size + 4])
+            del buffer[:size + 4]
+
+            data = AppMessage.cipher.decrypt_frame(frame[1:], False)
+            if frame[0] & STREAM_COMPRESSED:
+                data = zlib.decompress(data)
+
+            yield from msgpack.unpackb(data, raw = False)
+
+    if buffer:
+        raise ValueError("Command stream ended with a partial frame")
+
+
 class AppMessage(TerminalMixin):
 
     cipher = Cipher.get('message')
 
     @classmethod
     def get(cls, data, decrypt = True):
-        if decrypt:
+        # Binary stream frames are decrypted per batch before messages are loaded
+        if decrypt and 'package' in data:
             message = cls.cipher.decrypt(data['package'], False)
             data = json.loads(message)
 
@@ -68,7 +115,7 @@ class AppMessage(TerminalMixin):
 
     def to_package(self):
         json_text = self.to_json()
-        cipher_text = self.__class__.cipher.encrypt(json_text).decode('utf-8')
+        cipher_text = self.__class__.cipher.encrypt(json_text, framed = False).decode('utf-8')
         package = json.dumps({ 'package': cipher_text }) + "\n"
         return package
 
@@ -5,7 +5,6 @@ from utility import text, data
 from .meta import MetaBaseMixin
 
 import re
-import copy
 import json
 
 
@@ -440,7 +439,7 @@ class BaseMixin(object, metaclass = MetaBaseMixin):
             facade = self.manager.index.get_facade_index()[name]
 
         if not self._facade_cache.get(name, None):
-            self._facade_cache[name] = copy.deepcopy(facade)
+            self._facade_cache[name] = facade.view()
 
         return self._facade_cache[name]
 
@@ -1,8 +1,10 @@
 from django.db import DEFAULT_DB_ALIAS
 from django.db.backends.mysql import base as mysql
 
+from systems.db.pool import PooledDatabaseMixin
 
-class DatabaseWrapper(mysql.DatabaseWrapper):
+
+class DatabaseWrapper(PooledDatabaseMixin, mysql.DatabaseWrapper):
 
     def __init__(self, settings_dict, alias = DEFAULT_DB_ALIAS):
         super().__init__(settings_dict, alias)
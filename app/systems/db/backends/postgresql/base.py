@@ -1,8 +1,10 @@
 from django.db import DEFAULT_DB_ALIAS
 from django.db.backends.postgresql import base as postgresql
 
+from systems.db.pool import PooledDatabaseMixin
 
-class DatabaseWrapper(postgresql.DatabaseWrapper):
+
+class DatabaseWrapper(PooledDatabaseMixin, postgresql.DatabaseWrapper):
 
     def __init__(self, settings_dict, alias = DEFAULT_DB_ALIAS):
         super().__init__(settings_dict, alias)
@@ -1,8 +1,14 @@
+from django.conf import settings
 from django.db import DEFAULT_DB_ALIAS
 from django.db.backends.sqlite3 import base as sqlite3
 
 from utility.runtime import Runtime
 
+import logging
+
+
+logger = logging.getLogger(__name__)
+
 
 class DatabaseWrapper(sqlite3.DatabaseWrapper):
 
@@ -10,3 +16,27 @@ class DatabaseWrapper(sqlite3.DatabaseWrapper):
         settings_dict['NAME'] = Runtime.get_db_path()
         settings_dict['ATOMIC_REQUESTS'] = True
         super().__init__(settings_dict, alias)
+
+
+    def get_new_connection(self, conn_params):
+        connection = super().get_new_connection(conn_params)
+        for pragma in (
+            "journal_mode = WAL",
+            "busy_timeout = {}".format(int(settings.DB_SQLITE_BUSY_TIMEOUT)),
+            "synchronous = {}".format(settings.DB_SQLITE_SYNCHRONOUS),
+            "mmap_size = {}".format(int(settings.DB_SQLITE_MMAP_SIZE)),
+            "cache_size = -{}".format(int(settings.DB_SQLITE_CACHE_SIZE)),
+            "wal_autocheckpoint = {}".format(int(settings.DB_SQLITE_WAL_CHECKPOINT)),
+            "journal_size_limit = {}".format(int(settings.DB_SQLITE_WAL_SIZE_LIMIT))
+        ):
+            connection.execute("PRAGMA {}".format(pragma))
+        return connection
+
+    def _close(self):
+        if self.connection is not None and not self.in_atomic_block:
+            try:
+                # Passive checkpoints never block readers or writers
+                self.connection.execute("PRAGMA wal_checkpoint(PASSIVE)")
+            except Exception as e:
+                logger.debug("SQLite checkpoint failed: {}".format(e))
+        return super()._close()
@@ -0,0 +1,127 @@
+from django.conf import settings
+from django.db import connections
+from django.db.models.sql.where import WhereNode
+
+from systems.cache.version import get_cache, get_cache_version
+
+import hashlib
+import json
+import logging
+
+
+logger = logging.getLogger(__name__)
+
+
+def get_count(queryset, exact = False):
+    if not exact and settings.DB_APPROXIMATE_COUNT:
+        estimate = get_estimated_count(queryset)
+        # Small results are cheap to count and expected to be accurate
+        if estimate is not None and estimate >= settings.DB_APPROXIMATE_COUNT_THRESHOLD:
+            return estimate
+
+    return get_exact_count(queryset)
+
+
+def get_exact_count(queryset):
+    cache = get_cache()
+    cache_key = get_count_cache_key(queryset) if cache is not None else None
+
+    if cache_key:
+        count = cache.get(cache_key, None)
+        if count is not None:
+            return count
+
+    count = queryset.count()
+
+    if cache_key:
+        cache.set(cache_key, count, settings.DB_COUNT_CACHE_SECONDS)
+    return count
+
+def get_count_cache_key(queryset):
+    version = get_cache_version(getattr(queryset.model, 'facade', None))
+    if not version:
+        return None
+    try:
+        sql, params = queryset.query.sql_with_params()
+    except Exception:
+        return None
+
+    return "{}count:{}".format(
+        settings.CACHE_MIDDLEWARE_KEY_PREFIX,
+        hashlib.sha256(json.dumps([ queryset.db, version, sql, [ str(param) for param in params ] ]).encode()).hexdigest()
+    )
+
+
+def get_filter_count(where):
+    count = 0
+    for child in where.children:
+        if isinstance(child, WhereNode):
+            count += get_filter_count(child)
+        else:
+            count += 1
+    return count
+
+def check_table_rows(query):
+    # Table statistics only describe plain row counts of a single table
+    return (
+        not query.where
+        and not query.distinct
+        and not query.values_select
+        and not query.group_by
+        and not query.annotations
+        and query.low_mark == 0
+        and query.high_mark is None
+        and len([ alias for alias, count in query.alias_refcount.items() if count ]) <= 1
+    )
+
+def check_estimate(query):
+    return get_filter_count(query.where) <= settings.DB_APPROXIMATE_COUNT_MAX_FILTERS
+
+
+def get_estimated_count(queryset):
+    connection = connections[queryset.db]
+    query = queryset.query
+    try:
+        if connection.vendor == 'postgresql':
+            if check_table_rows(query):
+                return get_postgres_table_estimate(connection, queryset.model._meta.db_table)
+            elif check_estimate(query):
+                return get_postgres_query_estimate(connection, queryset)
+
+        elif connection.vendor == 'mysql':
+            if check_table_rows(query):
+                return get_mysql_table_estimate(connection, queryset.model._meta.db_table)
+
+    except Exception as e:
+        logger.warning("Count estimate failed for {}: {}".format(queryset.model._meta.db_table, e))
+    return None
+
+
+def get_postgres_table_estimate(connection, table):
+    with connection.cursor() as cursor:
+        cursor.execute("SELECT reltuples::bigint FROM pg_class WHERE oid = %s::regclass", [ table ])
+        row = cursor.fetchone()
+
+    # Tables that have never been analyzed report no usable estimate
+    if not row or row[0] is None or row[0] < 0:
+        return None
+    return int(row[0])
+
+def get_postgres_query_estimate(connection, queryset):
+    sql, params = queryset.query.sql_with_params()
+    with connection.cursor() as cursor:
+        cursor.execute("EXPLAIN (FORMAT JSON) {}".format(sql), params)
+        plan = cursor.fetchone()[0]
+
+    if isinstance(plan, str):
+        plan = json.loads(plan)
+    return int(plan[0]['Plan']['Plan Rows'])
+
+def get_mysql_table_estimate(connection, table):
+    with connection.cursor() as cursor:
+        cursor.execute("SELECT TABLE_ROWS FROM information_schema.TABLES WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = %s", [ table ])
+        row = cursor.fetchone()
+
+    if not row or row[0] is None:
+        return None
+    return int(row[0])
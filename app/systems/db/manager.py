@@ -1,41 +1,107 @@
-from collections import OrderedDict
 from io import StringIO
 
+from django.apps import apps
 from django.conf import settings
 from django.core import serializers
+from django.core.serializers.json import DjangoJSONEncoder
 from django.db import DEFAULT_DB_ALIAS, router, connections, transaction
 from django.core.management.color import no_style
-from django.apps import apps
 
+from systems.cache.version import update_model_version, get_version_names
+from systems.models.identity import IdentityMap
+from systems.db.tombstone import get_tombstones, prune_tombstones, get_retention_time
 from utility.data import ensure_list
 from utility.encryption import Cipher
 
 import os
+import datetime
+import base64
+import json
+import zlib
 import logging
 
 
 logger = logging.getLogger(__name__)
 
 
-def get_apps():
-    return OrderedDict.fromkeys(
-        app_config for app_config in apps.get_app_configs()
-        if app_config.models_module is not None
-    )
+PACKAGE_HEADER = 'zimagi-db:2'
+
+
+def get_models(alias, packages):
+    graph = settings.MANAGER.index.get_dependency_graph()
+
+    for model in graph.get_package_models(ensure_list(packages)):
+        if router.allow_migrate_model(alias, model):
+            yield model
+
+def get_delete_chunks(alias, packages, since):
+    chunk_size = settings.DB_PACKAGE_CHUNK_SIZE
+
+    # Dependent models are removed before the models they reference
+    for model in reversed(list(get_models(alias, packages))):
+        deleted = get_tombstones(alias, model, since)
+        for index in range(0, len(deleted), chunk_size):
+            yield model, [], deleted[index:index + chunk_size]
+
+def get_object_chunks(alias, packages, since = None):
+    chunk_size = settings.DB_PACKAGE_CHUNK_SIZE
 
+    for model in get_models(alias, packages):
+        queryset = model._base_manager.using(alias).order_by(model._meta.pk.name)
+        if since is not None:
+            queryset = queryset.filter(updated__gte = datetime.datetime.fromtimestamp(since, datetime.timezone.utc))
+        objects = []
 
-def get_objects(alias, packages):
-    packages = ensure_list(packages)
+        for obj in queryset.iterator(chunk_size = chunk_size):
+            objects.append(obj)
+            if len(objects) == chunk_size:
+                yield model, objects
+                objects = []
+        if objects:
+            yield model, objects
 
-    for model in serializers.sort_dependencies(get_apps().items()):
-        if getattr(model, 'facade', None):
-            facade_packages = model.facade.get_packages()
-            if not list(set(packages) & set(facade_packages)):
-                continue
 
-            if router.allow_migrate_model(alias, model):
-                queryset = model._base_manager.using(alias).order_by(model._meta.pk.name)
-                yield from queryset.iterator()
+def encode_chunk(model, objects, encrypted = True, deleted = None):
+    data = json.dumps({
+            'model': model._meta.label_lower,
+            'objects': [
+                { 'pk': obj['pk'], 'fields': obj['fields'] }
+                for obj in serializers.serialize('python', objects,
+                    use_natural_foreign_keys = False,
+                    use_natural_primary_keys = False
+                )
+            ],
+            'deleted': deleted or []
+        },
+        cls = DjangoJSONEncoder,
+        separators = (',', ':')
+    ).encode()
+    data = zlib.compress(data, settings.DB_PACKAGE_COMPRESS_LEVEL)
+
+    if encrypted:
+        return Cipher.get('db').encrypt(data, framed = True).decode()
+    return base64.b64encode(data).decode()
+
+def decode_chunk(line, encrypted = True):
+    if encrypted:
+        data = Cipher.get('db').decrypt(line)
+    else:
+        data = base64.b64decode(line)
+
+    return json.loads(zlib.decompress(data).decode())
+
+
+def get_package_lines(str_data):
+    position = 0
+    while position < len(str_data):
+        end = str_data.find('\n', position)
+        if end < 0:
+            end = len(str_data)
+
+        line = str_data[position:end].strip()
+        if line:
+            yield line
+        position = end + 1
 
 
 def parse_objects(alias, json_data):
@@ -58,6 +124,50 @@ def parse_objects(alias, json_data):
 
     return models
 
+def parse_chunk(alias, chunk):
+    label = chunk['model']
+    objects = chunk['objects']
+    model = apps.get_model(label)
+    if not router.allow_migrate_model(alias, model):
+        return None
+
+    deleted = chunk.get('deleted', None)
+    if deleted:
+        model._base_manager.using(alias).filter(pk__in = deleted).delete()
+
+    deserialized = list(serializers.deserialize('python',
+        [ { 'model': label, **obj } for obj in objects ],
+        using = alias,
+        ignorenonexistent = True
+    ))
+    manager = model._base_manager.using(alias)
+    pks = [ obj.object.pk for obj in deserialized ]
+    existing = set(manager.filter(pk__in = pks).values_list('pk', flat = True))
+
+    created = [ obj.object for obj in deserialized if obj.object.pk not in existing ]
+    updated = [ obj.object for obj in deserialized if obj.object.pk in existing ]
+    if created:
+        manager.bulk_create(created)
+    if updated:
+        manager.bulk_update(updated, [
+            field.name for field in model._meta.concrete_fields if not field.primary_key
+        ])
+
+    for field_name in set(name for obj in deserialized for name in obj.m2m_data.keys()):
+        field = model._meta.get_field(field_name)
+        through = field.remote_field.through
+        source = "{}_id".format(field.m2m_field_name())
+        target = "{}_id".format(field.m2m_reverse_field_name())
+        through_manager = through._base_manager.using(alias)
+
+        through_manager.filter(**{ "{}__in".format(source): pks }).delete()
+        through_manager.bulk_create([
+            through(**{ source: obj.object.pk, target: value })
+            for obj in deserialized
+            for value in obj.m2m_data.get(field_name, [])
+        ])
+    return model
+
 
 class DatabaseManager(object):
 
@@ -66,17 +176,11 @@ class DatabaseManager(object):
         self.connection = connections[self.alias]
 
 
-    def _load(self, str_data, encrypted = True):
-        logger.debug("Loaded: %s", str_data)
+    def _import(self, callback):
         try:
-            if encrypted:
-                str_data = Cipher.get('db').decrypt(str_data)
-
-            logger.debug("Importing: %s", str_data)
-
             with transaction.atomic(using = self.alias):
                 with self.connection.constraint_checks_disabled():
-                    models = parse_objects(self.alias, str_data)
+                    models = callback()
 
                 table_names = [model._meta.db_table for model in models]
                 self.connection.check_constraints(table_names = table_names)
@@ -87,54 +191,78 @@ class DatabaseManager(object):
                         for line in sequence_sql:
                             cursor.execute(line)
 
+            # Bulk inserts bypass model saves so cached versions and instances are updated here
+            IdentityMap.discard_models(*models)
+            update_model_version(*get_version_names(*models))
+
         except Exception as e:
             e.args = ("Problem installing data: {}".format(e),)
             logger.exception("Exception: %s", e)
             raise e
 
+    def _load(self, str_data, encrypted = True):
+        logger.debug("Loaded: %s", str_data)
+
+        if encrypted:
+            str_data = Cipher.get('db').decrypt(str_data)
+
+        logger.debug("Importing: %s", str_data)
+        self._import(lambda: parse_objects(self.alias, str_data))
+
+    def _load_chunks(self, lines, encrypted = True):
+        def load():
+            models = set()
+            for line in lines:
+                model = parse_chunk(self.alias, decode_chunk(line, encrypted))
+                if model:
+                    models.add(model)
+            return models
+
+        self._import(load)
+
     def load(self, str_data, encrypted = True):
-        self._load(str_data, encrypted)
+        lines = get_package_lines(str_data) if isinstance(str_data, str) else iter([])
+        if next(lines, None) == PACKAGE_HEADER:
+            self._load_chunks(lines, encrypted)
+        else:
+            self._load(str_data, encrypted)
 
     def load_file(self, file_path, encrypted = True):
         if os.path.isfile(file_path):
-            file_type = 'rb' if encrypted else 'r'
-            with open(file_path, file_type) as file:
-                self._load(file.read(), encrypted)
+            with open(file_path, 'r') as file:
+                if file.readline().strip() == PACKAGE_HEADER:
+                    self._load_chunks(( line.strip() for line in file if line.strip() ), encrypted)
+                else:
+                    file.seek(0)
+                    self._load(file.read(), encrypted)
 
 
-    def _save(self, packages, encrypted = True):
-        str_conn = StringIO()
+    def _save(self, packages, encrypted = True, since = None):
         try:
-            serializers.serialize('json',
-                get_objects(self.alias, packages),
-                indent = 2,
-                use_natural_foreign_keys = False,
-                use_natural_primary_keys = False,
-                stream = str_conn
-            )
-            str_data = str_conn.getvalue()
-            logger.debug("Updated: %s", str_data)
-
-            if encrypted:
-                str_data = Cipher.get('db').encrypt(str_data)
+            yield PACKAGE_HEADER
+            if since is not None:
+                if since < get_retention_time():
+                    # Deletions older than the tombstone window can not be replayed
+                    since = None
+                else:
+                    prune_tombstones(self.alias)
+                    for model, objects, deleted in get_delete_chunks(self.alias, packages, since):
+                        yield encode_chunk(model, objects, encrypted, deleted)
+
+            for model, objects in get_object_chunks(self.alias, packages, since):
+                logger.debug("Saving %s %s objects", len(objects), model._meta.label_lower)
+                yield encode_chunk(model, objects, encrypted)
 
         except Exception as e:
             e.args = ("Problem saving data: {}".format(e),)
             logger.exception("Exception: %s", e)
             raise
 
-        finally:
-            str_conn.close()
-
-        return str_data
-
-    def save(self, packages = settings.DB_PACKAGE_ALL_NAME, encrypted = True):
-        return self._save(packages, encrypted)
+    def save(self, packages = settings.DB_PACKAGE_ALL_NAME, encrypted = True, since = None):
+        return "\n".join(self._save(packages, encrypted, since))
 
-    def save_file(self, file_path, packages = settings.DB_PACKAGE_ALL_NAME, encrypted = True):
-        str_data = self._save(packages, encrypted)
-        if str_data:
-            file_type = 'wb' if encrypted else 'w'
-            with open(file_path, file_type) as file:
-                logger.debug("Writing: %s", str_data)
-                file.write(str_data)
+    def save_file(self, file_path, packages = settings.DB_PACKAGE_ALL_NAME, encrypted = True, since = None):
+        with open(file_path, 'w') as file:
+            for line in self._save(packages, encrypted, since):
+                file.write(line)
+                file.write("\n")
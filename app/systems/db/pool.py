@@ -0,0 +1,208 @@
+from collections import deque
+
+from django.conf import settings
+from django.db import connections
+
+import threading
+import time
+import logging
+
+
+logger = logging.getLogger(__name__)
+
+
+class PoolTimeoutError(Exception):
+    pass
+
+
+class ConnectionPool(object):
+
+    pools = {}
+    pools_lock = threading.Lock()
+
+
+    @classmethod
+    def get(cls, alias):
+        with cls.pools_lock:
+            if alias not in cls.pools:
+                cls.pools[alias] = cls(alias)
+            return cls.pools[alias]
+
+    @classmethod
+    def metrics(cls):
+        with cls.pools_lock:
+            pools = dict(cls.pools)
+        return { alias: pool.stats for alias, pool in pools.items() }
+
+
+    def __init__(self, alias):
+        self.alias = alias
+        self.max_size = settings.DB_POOL_MAX_SIZE
+        self.max_overflow = settings.DB_POOL_MAX_OVERFLOW
+        self.max_idle = settings.DB_POOL_MAX_IDLE
+        self.timeout = settings.DB_POOL_TIMEOUT
+
+        self.condition = threading.Condition()
+        self.idle = deque()
+        self.size = 0
+        self.counters = {
+            'created': 0,
+            'overflow': 0,
+            'reused': 0,
+            'discarded': 0,
+            'waits': 0,
+            'timeouts': 0
+        }
+
+    @property
+    def stats(self):
+        with self.condition:
+            return {
+                'max_size': self.max_size,
+                'max_overflow': self.max_overflow,
+                'size': self.size,
+                'idle': len(self.idle),
+                'in_use': self.size - len(self.idle),
+                **self.counters
+            }
+
+
+    def acquire(self, connect, check):
+        deadline = time.time() + self.timeout
+        connection = None
+
+        with self.condition:
+            while True:
+                self._prune()
+                if self.idle:
+                    # Most recently released connections are the least likely to be stale
+                    connection, released = self.idle.pop()
+                    break
+
+                if self.size < self.max_size or self.check_overflow():
+                    self.size += 1
+                    if self.size > self.max_size:
+                        self.counters['overflow'] += 1
+                    break
+
+                remaining = deadline - time.time()
+                if remaining <= 0:
+                    self.counters['timeouts'] += 1
+                    raise PoolTimeoutError("Timed out waiting {} seconds for a {} database connection".format(self.timeout, self.alias))
+
+                self.counters['waits'] += 1
+                self.condition.wait(remaining)
+
+        if connection is not None:
+            if check(connection, released):
+                with self.condition:
+                    self.counters['reused'] += 1
+                return connection
+
+            self._close(connection)
+            with self.condition:
+                self.counters['discarded'] += 1
+        try:
+            connection = connect()
+            with self.condition:
+                self.counters['created'] += 1
+            return connection
+
+        except Exception:
+            with self.condition:
+                self.size -= 1
+                self.condition.notify()
+            raise
+
+    def release(self, connection):
+        with self.condition:
+            overflow = self.size > self.max_size
+            if overflow:
+                self.size -= 1
+                self.counters['discarded'] += 1
+            else:
+                self.idle.append((connection, time.time()))
+            self.condition.notify()
+
+        if overflow:
+            # Connections beyond the pool size are closed instead of kept idle
+            self._close(connection)
+
+    def discard(self, connection):
+        self._close(connection)
+        with self.condition:
+            self.size -= 1
+            self.counters['discarded'] += 1
+            self.condition.notify()
+
+
+    def check_overflow(self):
+        return self.max_overflow < 0 or self.size < (self.max_size + self.max_overflow)
+
+
+    def _prune(self):
+        expired_time = time.time() - self.max_idle
+        while self.idle and self.idle[0][1] < expired_time:
+            connection, released = self.idle.popleft()
+            self._close(connection)
+            self.size -= 1
+            self.counters['discarded'] += 1
+
+    def _close(self, connection):
+        try:
+            connection.close()
+        except Exception as e:
+            logger.debug("Pooled {} connection close failed: {}".format(self.alias, e))
+
+
+def release_connections():
+    # Threads about to wait on workers return their connections for the workers to use
+    if settings.DB_POOL_ENABLED:
+        for connection in connections.all():
+            if isinstance(connection, PooledDatabaseMixin) and connection.connection is not None and not connection.in_atomic_block:
+                connection.close()
+
+
+class PooledDatabaseMixin(object):
+
+    def get_new_connection(self, conn_params):
+        if not settings.DB_POOL_ENABLED:
+            return super().get_new_connection(conn_params)
+
+        connect = super().get_new_connection
+        return ConnectionPool.get(self.alias).acquire(
+            lambda: connect(conn_params),
+            self.check_pooled_connection
+        )
+
+    def _close(self):
+        if not settings.DB_POOL_ENABLED or self.connection is None:
+            return super()._close()
+
+        pool = ConnectionPool.get(self.alias)
+        if self.in_atomic_block:
+            # Django keeps the handle of connections closed mid transaction
+            pool.discard(self.connection)
+            return
+
+        try:
+            if not self.autocommit:
+                self.connection.rollback()
+        except Exception:
+            pool.discard(self.connection)
+        else:
+            pool.release(self.connection)
+
+
+    def check_pooled_connection(self, connection, released):
+        if getattr(connection, 'closed', False):
+            return False
+        if (time.time() - released) < settings.DB_POOL_CHECK_INTERVAL:
+            return True
+        try:
+            cursor = connection.cursor()
+            cursor.execute('SELECT 1')
+            cursor.close()
+            return True
+        except Exception:
+            return False
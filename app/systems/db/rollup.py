@@ -0,0 +1,269 @@
+from functools import lru_cache
+
+from django.apps import apps
+from django.conf import settings
+from django.db import connections, router, transaction
+from django.db.backends.utils import truncate_name
+from django.db.models.signals import pre_migrate, post_migrate
+from django.dispatch import receiver
+
+from systems.cache.version import get_cache, get_cache_version, get_facade_version_names, model_version_updated
+from utility.data import ensure_list
+
+import hashlib
+import json
+import logging
+
+
+logger = logging.getLogger(__name__)
+
+
+class Rollup(object):
+
+    def __init__(self, model, name, spec):
+        self.model = model
+        self.name = name
+        self.group_by = ensure_list(spec.get('group_by', []))
+        self.aggregates = ensure_list(spec.get('aggregates', []))
+
+
+    @property
+    def facade(self):
+        return self.model.facade
+
+    @property
+    def table(self):
+        definition = json.dumps([ self.group_by, self.aggregates ])
+        return "{}_rollup_{}_{}".format(
+            self.model._meta.db_table,
+            self.name,
+            hashlib.sha256(definition.encode()).hexdigest()[:8]
+        )
+
+    @property
+    def columns(self):
+        columns = {}
+        for field_name in self.group_by:
+            columns[field_name] = self.model._meta.get_field(field_name).column
+        for field_name in self.aggregates:
+            columns[field_name] = field_name
+        return columns
+
+    @property
+    def state_key(self):
+        return "{}rollup:{}".format(settings.CACHE_MIDDLEWARE_KEY_PREFIX, self.table)
+
+
+    def check_fields(self, request_fields):
+        group_fields = [ field for field in request_fields if field not in self.aggregates ]
+        aggregate_fields = [ field for field in request_fields if field in self.aggregates ]
+        return len(aggregate_fields) > 0 and set(group_fields) == set(self.group_by)
+
+    def get_annotations(self, request_fields = None):
+        aggregator_map = self.facade.aggregator_map
+        annotations = {}
+
+        for field_name in self.aggregates:
+            if request_fields is None or field_name in request_fields:
+                field, type = field_name.rsplit('_', 1)
+                if type == 'COUNT':
+                    annotations[field_name] = aggregator_map[type](field, distinct = True)
+                else:
+                    annotations[field_name] = aggregator_map[type](field)
+        return annotations
+
+    def get_queryset(self):
+        # Matches the unfiltered data API aggregation query, which groups per instance
+        return self.model.objects.all().distinct().order_by().annotate(
+            **self.get_annotations()
+        ).values(*self.group_by, *self.aggregates)
+
+
+    def get_connection(self):
+        return connections[router.db_for_write(self.model)]
+
+    def get_table_name(self, connection):
+        return truncate_name(self.table, connection.ops.max_name_length())
+
+    def get_table_prefix(self):
+        return "{}_rollup_".format(self.model._meta.db_table)
+
+    def check_exists(self, connection):
+        table = self.get_table_name(connection)
+        with connection.cursor() as cursor:
+            if connection.vendor == 'postgresql':
+                cursor.execute("SELECT 1 FROM pg_matviews WHERE matviewname = %s", [ table ])
+                return cursor.fetchone() is not None
+            return table in connection.introspection.table_names(cursor)
+
+    def create(self, connection = None):
+        connection = connection or self.get_connection()
+        table = connection.ops.quote_name(self.get_table_name(connection))
+        sql, params = self.get_queryset().query.sql_with_params()
+
+        with connection.cursor() as cursor:
+            if connection.vendor == 'postgresql':
+                cursor.execute("CREATE MATERIALIZED VIEW IF NOT EXISTS {} AS {}".format(table, sql), params)
+            else:
+                cursor.execute("CREATE TABLE {} AS {}".format(table, sql), params)
+
+    def refresh(self):
+        connection = self.get_connection()
+        # Version is captured first so writes during the refresh leave the rollup stale
+        version = get_cache_version(self.facade)
+
+        if not self.check_exists(connection):
+            self.create(connection)
+        else:
+            table = connection.ops.quote_name(self.get_table_name(connection))
+
+            if connection.vendor == 'postgresql':
+                with connection.cursor() as cursor:
+                    cursor.execute("REFRESH MATERIALIZED VIEW {}".format(table))
+            else:
+                sql, params = self.get_queryset().query.sql_with_params()
+                with transaction.atomic(using = connection.alias):
+                    with connection.cursor() as cursor:
+                        cursor.execute("DELETE FROM {}".format(table))
+                        cursor.execute("INSERT INTO {} {}".format(table, sql), params)
+
+        cache = get_cache()
+        if cache is not None and version:
+            cache.set(self.state_key, version, None)
+
+
+    def check_fresh(self):
+        cache = get_cache()
+        if cache is None:
+            return False
+
+        version = get_cache_version(self.facade)
+        return version is not None and cache.get(self.state_key, None) == version
+
+    def get_ordering(self, query):
+        if query.order_by:
+            return list(query.order_by)
+        if query.default_ordering:
+            return list(self.model._meta.ordering)
+        return []
+
+    def read(self, queryset, request_fields):
+        if queryset.query.where or not self.check_fresh():
+            return None
+
+        connection = connections[queryset.db]
+        quote = connection.ops.quote_name
+        columns = self.columns
+        fields = [ field for field in request_fields if field in columns ]
+        order = []
+
+        for field in self.get_ordering(queryset.query):
+            # Distinct rows are ordered by selected columns only, so other orderings are run live
+            if not isinstance(field, str) or field.lstrip('-') not in fields:
+                return None
+            order.append("{} {}".format(quote(columns[field.lstrip('-')]), 'DESC' if field.startswith('-') else 'ASC'))
+
+        sql = "SELECT DISTINCT {} FROM {}".format(
+            ", ".join([ quote(columns[field]) for field in fields ]),
+            quote(self.get_table_name(connection))
+        )
+        if order:
+            sql = "{} ORDER BY {}".format(sql, ", ".join(order))
+
+        with connection.cursor() as cursor:
+            cursor.execute(sql)
+            return [ dict(zip(fields, row)) for row in cursor.fetchall() ]
+
+
+def get_rollups(model):
+    rollups = getattr(model._meta, 'rollups', None)
+    if not rollups or model._meta.abstract:
+        return []
+    return [ Rollup(model, name, spec) for name, spec in rollups.items() ]
+
+@lru_cache(maxsize = None)
+def get_rollup_version_names():
+    names = set()
+    for model in apps.get_models():
+        if get_rollups(model):
+            names.update(get_facade_version_names(model.facade))
+    return names
+
+def find_rollup(facade, request_fields):
+    for rollup in get_rollups(facade.model):
+        if rollup.check_fields(request_fields):
+            return rollup
+    return None
+
+
+def queue_refresh(delay):
+    from settings.tasks import refresh_rollups
+    try:
+        refresh_rollups.apply_async(countdown = delay)
+    except Exception as e:
+        logger.warning("Rollup refresh could not be queued: {}".format(e))
+
+
+def refresh_rollups(force = False):
+    for model in apps.get_models():
+        for rollup in get_rollups(model):
+            if force or not rollup.check_fresh():
+                try:
+                    rollup.refresh()
+                    logger.info("Refreshed rollup: {}".format(rollup.table))
+
+                except Exception as e:
+                    logger.error("Rollup refresh failed for {}: {}".format(rollup.table, e))
+
+
+def drop_rollups(connection):
+    prefixes = tuple([
+        rollup.get_table_prefix() for model in apps.get_models() for rollup in get_rollups(model)
+    ])
+    if not prefixes:
+        return
+
+    with connection.cursor() as cursor:
+        tables = connection.introspection.table_names(cursor, include_views = True)
+        materialized = []
+        if connection.vendor == 'postgresql':
+            cursor.execute("SELECT matviewname FROM pg_matviews")
+            materialized = [ row[0] for row in cursor.fetchall() ]
+
+        for table in set(tables + materialized):
+            if table.startswith(prefixes):
+                cursor.execute("DROP {} IF EXISTS {}".format(
+                    'MATERIALIZED VIEW' if table in materialized else 'TABLE',
+                    connection.ops.quote_name(table)
+                ))
+
+
+@receiver(model_version_updated)
+def schedule_rollup_refresh(sender, names, **kwargs):
+    if settings.DB_ROLLUP_DELAY > 0 and get_rollup_version_names().intersection(names):
+        cache = get_cache()
+        # Writes within the delay window share a single refresh of the stale rollups
+        if cache is not None and cache.add("{}rollup-refresh-scheduled".format(settings.CACHE_MIDDLEWARE_KEY_PREFIX), 1, settings.DB_ROLLUP_DELAY):
+            queue_refresh(settings.DB_ROLLUP_DELAY)
+
+
+@receiver(pre_migrate)
+def remove_rollups(sender, using, plan = None, **kwargs):
+    # Materialized views block column changes, and schema changes invalidate rollup definitions
+    if plan:
+        try:
+            drop_rollups(connections[using])
+        except Exception as e:
+            logger.warning("Rollup removal failed: {}".format(e))
+
+@receiver(post_migrate)
+def ensure_rollups(sender, using, **kwargs):
+    connection = connections[using]
+    for model in sender.get_models():
+        for rollup in get_rollups(model):
+            try:
+                if not rollup.check_exists(connection):
+                    rollup.create(connection)
+
+            except Exception as e:
+                logger.warning("Rollup creation failed for {}: {}".format(rollup.table, e))
@@ -1,18 +1,145 @@
 from django.conf import settings
+from django.core.signals import request_started
+from django.db import connections
+from django.dispatch import receiver
+
+from utility.parallel import WorkerThread
+
+import threading
+import random
+import time
+import logging
+
+
+logger = logging.getLogger(__name__)
+
+
+class ReplicaMonitor(object):
+
+    _instance = None
+
+    def __new__(cls, *args, **kwargs):
+        if not cls._instance:
+            cls._instance = object.__new__(cls)
+        return cls._instance
+
+    def __init__(self):
+        if not getattr(self, '_initialized', False):
+            self.lock = threading.Lock()
+            self.thread = None
+            self.lag = {}
+            self.checked = 0
+            self._initialized = True
+
+
+    @property
+    def healthy_replicas(self):
+        self.start()
+        if (time.time() - self.checked) > (settings.DB_REPLICA_CHECK_INTERVAL * 3):
+            # Lag measurements are too old to trust
+            return []
+        return [
+            alias for alias, lag in self.lag.items()
+            if lag is not None and lag <= settings.DB_REPLICA_MAX_LAG
+        ]
+
+    def start(self):
+        if self.thread is None or not self.thread.is_alive():
+            with self.lock:
+                if self.thread is None or not self.thread.is_alive():
+                    self.thread = WorkerThread(target = self.monitor)
+
+    def monitor(self, thread):
+        while not thread.terminated:
+            lag = {}
+            for alias in settings.DB_REPLICA_ALIASES:
+                lag[alias] = self.check_lag(alias)
+
+            self.lag = lag
+            self.checked = time.time()
+            thread.stop_signal.wait(settings.DB_REPLICA_CHECK_INTERVAL)
+
+    def check_lag(self, alias):
+        connection = connections[alias]
+        try:
+            with connection.cursor() as cursor:
+                if connection.vendor == 'postgresql':
+                    cursor.execute(
+                        "SELECT CASE WHEN pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0 " \
+                        "ELSE COALESCE(EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp()), 0) END"
+                    )
+                    return float(cursor.fetchone()[0])
+
+                elif connection.vendor == 'mysql':
+                    cursor.execute("SHOW SLAVE STATUS")
+                    row = cursor.fetchone()
+                    if not row:
+                        return 0.0
+
+                    columns = [ column[0] for column in cursor.description ]
+                    lag = dict(zip(columns, row)).get('Seconds_Behind_Master', None)
+                    return float(lag) if lag is not None else None
+
+        except Exception as e:
+            logger.warning("Replica {} lag check failed: {}".format(alias, e))
+            return None
+        finally:
+            connection.close()
+        return None
 
 
 class DatabaseRouter:
 
-    def db_for_read(self, model, **hints):
-        return 'default'
+    state = threading.local()
 
-    def db_for_write(self, model, **hints):
+
+    @classmethod
+    def reset(cls):
+        cls.state.pinned = False
+
+    @classmethod
+    def pin(cls):
+        cls.state.pinned = True
+
+    @classmethod
+    def pinned(cls):
+        return getattr(cls.state, 'pinned', False)
+
+
+    @property
+    def primary(self):
         if 'write' in settings.DATABASES:
             return 'write'
         return 'default'
 
+    def check_pinned(self):
+        if self.pinned():
+            return True
+        return connections[self.primary].in_atomic_block
+
+
+    def db_for_read(self, model, **hints):
+        if settings.DB_REPLICA_ALIASES and not self.check_pinned():
+            replicas = ReplicaMonitor().healthy_replicas
+            if replicas:
+                return random.choice(replicas)
+        elif settings.DB_REPLICA_ALIASES:
+            return self.primary
+        return 'default'
+
+    def db_for_write(self, model, **hints):
+        # Statistics writes happen on every request and never need to be read back
+        if settings.DB_REPLICA_ALIASES and not getattr(model._meta, 'statistics', False):
+            self.pin()
+        return self.primary
+
     def allow_relation(self, obj1, obj2, **hints):
         return True
 
     def allow_migrate(self, db, app_label, model_name=None, **hints):
-        return True
+        return db not in settings.DB_REPLICA_ALIASES
+
+
+@receiver(request_started)
+def reset_database_router(sender, **kwargs):
+    DatabaseRouter.reset()
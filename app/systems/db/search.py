@@ -0,0 +1,243 @@
+from django.conf import settings
+from django.db import connections
+from django.db.models import BooleanField
+from django.db.models.expressions import RawSQL
+from django.db.models.signals import post_migrate
+from django.dispatch import receiver
+
+import threading
+import hashlib
+import re
+import logging
+
+
+logger = logging.getLogger(__name__)
+
+
+SEARCH_INDEX_PREFIX = 'zimagi_search_'
+
+
+class SearchIndexCache(object):
+
+    lock = threading.Lock()
+    tables = {}
+
+
+    @classmethod
+    def check(cls, connection, table, callback):
+        key = (connection.alias, table)
+        with cls.lock:
+            if key not in cls.tables:
+                cls.tables[key] = callback(connection, table)
+            return cls.tables[key]
+
+    @classmethod
+    def clear(cls):
+        with cls.lock:
+            cls.tables = {}
+
+
+def get_search_columns(model):
+    search_fields = getattr(model._meta, 'search_fields', None)
+    if not search_fields or model._meta.abstract:
+        return None
+
+    columns = []
+    for field_name in search_fields:
+        try:
+            field = model._meta.get_field(field_name)
+        except Exception:
+            return None
+
+        if not field.concrete or field.is_relation:
+            return None
+        columns.append(field.column)
+    return columns
+
+def get_search_index_name(table, columns):
+    return "{}{}".format(SEARCH_INDEX_PREFIX, hashlib.sha256("{}:{}".format(table, ",".join(columns)).encode()).hexdigest()[:16])
+
+def check_search_index_name(name):
+    return re.match(r'^{}[0-9a-f]{{16}}$'.format(SEARCH_INDEX_PREFIX), name) is not None
+
+def get_search_table(table):
+    return "{}_search".format(table)
+
+def get_search_key_table(table):
+    return "{}_search_keys".format(table)
+
+
+def get_search_tokens(search_terms):
+    tokens = []
+    for term in search_terms:
+        tokens.extend(re.findall(r'\w+', term))
+    return tokens
+
+
+def get_postgres_document(connection, columns, table = None):
+    quote = connection.ops.quote_name
+    return "to_tsvector('{}'::regconfig, {})".format(
+        settings.DB_SEARCH_CONFIG,
+        " || ' ' || ".join([
+            "coalesce({}{}::text, '')".format("{}.".format(quote(table)) if table else '', quote(column))
+            for column in columns
+        ])
+    )
+
+def ensure_postgres_index(connection, model, columns):
+    table = model._meta.db_table
+    index_name = get_search_index_name(table, columns)
+
+    with connection.cursor() as cursor:
+        cursor.execute("SELECT indexname FROM pg_indexes WHERE tablename = %s", [ table ])
+        for (existing_name,) in cursor.fetchall():
+            if existing_name != index_name and check_search_index_name(existing_name):
+                cursor.execute("DROP INDEX IF EXISTS {}".format(connection.ops.quote_name(existing_name)))
+
+        cursor.execute("CREATE INDEX IF NOT EXISTS {} ON {} USING GIN (({}))".format(
+            connection.ops.quote_name(index_name),
+            connection.ops.quote_name(table),
+            get_postgres_document(connection, columns)
+        ))
+
+def filter_postgres_queryset(queryset, connection, columns, tokens):
+    table = queryset.model._meta.db_table
+    return queryset.filter(RawSQL(
+        "{} @@ to_tsquery('{}'::regconfig, %s)".format(
+            get_postgres_document(connection, columns, table),
+            settings.DB_SEARCH_CONFIG
+        ),
+        [ " & ".join([ "{}:*".format(token) for token in tokens ]) ],
+        output_field = BooleanField()
+    ))
+
+
+def check_sqlite_index(connection, table):
+    with connection.cursor() as cursor:
+        cursor.execute("SELECT name FROM sqlite_master WHERE type = 'table' AND name = %s", [ get_search_key_table(table) ])
+        return cursor.fetchone() is not None
+
+def ensure_sqlite_index(connection, model, columns):
+    # Implicit rowids of tables with character keys change on VACUUM, so a contentless
+    # index is keyed through a table with an explicit integer key per primary key
+    table = model._meta.db_table
+    search_table = get_search_table(table)
+    key_table = get_search_key_table(table)
+    quote = connection.ops.quote_name
+    pk = quote(model._meta.pk.column)
+    column_list = ", ".join([ quote(column) for column in columns ])
+
+    def values(prefix):
+        return ", ".join([ "{}.{}".format(prefix, quote(column)) for column in columns ])
+
+    statements = {
+        'insert': "AFTER INSERT ON {table} BEGIN " \
+            "INSERT OR REPLACE INTO {keys}(pk) VALUES (new.{pk}); " \
+            "INSERT INTO {search}(rowid, {columns}) SELECT id, {new} FROM {keys} WHERE pk = new.{pk}; END",
+        'delete': "AFTER DELETE ON {table} BEGIN " \
+            "INSERT INTO {search}({search}, rowid, {columns}) SELECT 'delete', id, {old} FROM {keys} WHERE pk = old.{pk}; " \
+            "DELETE FROM {keys} WHERE pk = old.{pk}; END",
+        'update': "AFTER UPDATE OF {pk}, {columns} ON {table} BEGIN " \
+            "INSERT INTO {search}({search}, rowid, {columns}) SELECT 'delete', id, {old} FROM {keys} WHERE pk = old.{pk}; " \
+            "UPDATE {keys} SET pk = new.{pk} WHERE pk = old.{pk}; " \
+            "INSERT INTO {search}(rowid, {columns}) SELECT id, {new} FROM {keys} WHERE pk = new.{pk}; END"
+    }
+    triggers = { "{}_{}".format(search_table, name): statement for name, statement in statements.items() }
+
+    with connection.cursor() as cursor:
+        cursor.execute("SELECT name FROM sqlite_master WHERE (type = 'table' OR type = 'trigger') AND tbl_name IN (%s, %s, %s)", [
+            table, search_table, key_table
+        ])
+        existing = set(row[0] for row in cursor.fetchall())
+
+        if search_table in existing:
+            cursor.execute("PRAGMA table_info({})".format(quote(search_table)))
+            if [ row[1] for row in cursor.fetchall() ] == columns \
+                and key_table in existing \
+                and all(trigger in existing for trigger in triggers.keys()):
+                return
+
+        for trigger in triggers.keys():
+            cursor.execute("DROP TRIGGER IF EXISTS {}".format(quote(trigger)))
+        cursor.execute("DROP TABLE IF EXISTS {}".format(quote(search_table)))
+        cursor.execute("DROP TABLE IF EXISTS {}".format(quote(key_table)))
+
+        cursor.execute("CREATE TABLE {} (id INTEGER PRIMARY KEY, pk UNIQUE NOT NULL)".format(quote(key_table)))
+        cursor.execute("CREATE VIRTUAL TABLE {} USING fts5({}, content='')".format(quote(search_table), column_list))
+
+        cursor.execute("INSERT INTO {} (pk) SELECT {} FROM {}".format(quote(key_table), pk, quote(table)))
+        cursor.execute("INSERT INTO {search}(rowid, {columns}) SELECT {keys}.id, {values} FROM {table} INNER JOIN {keys} ON {keys}.pk = {table}.{pk}".format(
+            search = quote(search_table),
+            keys = quote(key_table),
+            table = quote(table),
+            columns = column_list,
+            values = values(quote(table)),
+            pk = pk
+        ))
+        for trigger, statement in triggers.items():
+            cursor.execute("CREATE TRIGGER {} {}".format(quote(trigger), statement.format(
+                table = quote(table),
+                search = quote(search_table),
+                keys = quote(key_table),
+                pk = pk,
+                columns = column_list,
+                new = values('new'),
+                old = values('old')
+            )))
+
+def filter_sqlite_queryset(queryset, connection, columns, tokens):
+    table = queryset.model._meta.db_table
+    if not SearchIndexCache.check(connection, table, check_sqlite_index):
+        return None
+
+    search_table = connection.ops.quote_name(get_search_table(table))
+    key_table = connection.ops.quote_name(get_search_key_table(table))
+    return queryset.filter(pk__in = RawSQL(
+        "SELECT pk FROM {} WHERE id IN (SELECT rowid FROM {} WHERE {} MATCH %s)".format(
+            key_table,
+            search_table,
+            search_table
+        ),
+        [ " AND ".join([ '"{}"*'.format(token) for token in tokens ]) ]
+    ))
+
+
+def filter_queryset(queryset, search_fields, search_terms):
+    if not settings.DB_SEARCH_INDEX:
+        return None
+
+    columns = get_search_columns(queryset.model)
+    if not columns or set(search_fields) != set(queryset.model._meta.search_fields):
+        return None
+
+    tokens = get_search_tokens(search_terms)
+    if not tokens:
+        return None
+
+    connection = connections[queryset.db]
+    if connection.vendor == 'postgresql':
+        return filter_postgres_queryset(queryset, connection, columns, tokens)
+    elif connection.vendor == 'sqlite':
+        return filter_sqlite_queryset(queryset, connection, columns, tokens)
+    return None
+
+
+@receiver(post_migrate)
+def ensure_search_indexes(sender, using, **kwargs):
+    if not settings.DB_SEARCH_INDEX:
+        return
+
+    connection = connections[using]
+    for model in sender.get_models():
+        columns = get_search_columns(model)
+        if columns:
+            try:
+                if connection.vendor == 'postgresql':
+                    ensure_postgres_index(connection, model, columns)
+                elif connection.vendor == 'sqlite':
+                    ensure_sqlite_index(connection, model, columns)
+
+            except Exception as e:
+                logger.warning("Search index creation failed for {}: {}".format(model._meta.db_table, e))
+
+    SearchIndexCache.clear()
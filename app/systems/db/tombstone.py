@@ -0,0 +1,89 @@
+from django.conf import settings
+from django.db import connections, router, transaction
+from django.db.models import CharField, FloatField, Value
+from django.db.models.functions import Cast
+from django.db.models.signals import post_migrate
+from django.dispatch import receiver
+
+import time
+import logging
+
+
+logger = logging.getLogger(__name__)
+
+
+TOMBSTONE_TABLE = 'zimagi_tombstone'
+
+
+def ensure_table(connection):
+    quote = connection.ops.quote_name
+    table = quote(TOMBSTONE_TABLE)
+
+    with connection.cursor() as cursor:
+        cursor.execute("CREATE TABLE IF NOT EXISTS {} ({} VARCHAR(255) NOT NULL, {} VARCHAR(255) NOT NULL, {} DOUBLE PRECISION NOT NULL)".format(
+            table, quote('model'), quote('pk'), quote('deleted')
+        ))
+        index = quote("{}_deleted".format(TOMBSTONE_TABLE))
+        if connection.vendor == 'mysql':
+            cursor.execute("SHOW INDEX FROM {} WHERE Key_name = %s".format(table), [ "{}_deleted".format(TOMBSTONE_TABLE) ])
+            if cursor.fetchone():
+                return
+            cursor.execute("CREATE INDEX {} ON {} ({})".format(index, table, quote('deleted')))
+        else:
+            cursor.execute("CREATE INDEX IF NOT EXISTS {} ON {} ({})".format(index, table, quote('deleted')))
+
+def get_tombstones(alias, model, since):
+    connection = connections[alias]
+    quote = connection.ops.quote_name
+
+    with connection.cursor() as cursor:
+        cursor.execute("SELECT DISTINCT {} FROM {} WHERE {} = %s AND {} >= %s".format(
+            quote('pk'), quote(TOMBSTONE_TABLE), quote('model'), quote('deleted')
+        ), [ model._meta.label_lower, since ])
+        return [ row[0] for row in cursor.fetchall() ]
+
+def prune_tombstones(alias):
+    connection = connections[alias]
+    quote = connection.ops.quote_name
+
+    with connection.cursor() as cursor:
+        cursor.execute("DELETE FROM {} WHERE {} < %s".format(
+            quote(TOMBSTONE_TABLE), quote('deleted')
+        ), [ get_retention_time() ])
+
+def get_retention_time():
+    return time.time() - (settings.DB_SYNC_TOMBSTONE_DAYS * 86400)
+
+
+def add_tombstones(queryset):
+    model = queryset.model
+    if settings.DB_SYNC_TOMBSTONE_DAYS <= 0 or not getattr(model, 'facade', None):
+        return
+
+    # Deleted keys are copied in one statement so queryset deletes stay fast
+    query = queryset.order_by().annotate(
+        tombstone_model = Value(model._meta.label_lower, output_field = CharField()),
+        tombstone_pk = Cast('pk', CharField(max_length = 255)),
+        tombstone_deleted = Value(time.time(), output_field = FloatField())
+    ).values_list('tombstone_model', 'tombstone_pk', 'tombstone_deleted').query
+    select, params = query.sql_with_params()
+
+    connection = connections[queryset._db or router.db_for_write(model)]
+    quote = connection.ops.quote_name
+    try:
+        with transaction.atomic(using = connection.alias), connection.cursor() as cursor:
+            cursor.execute("INSERT INTO {} ({}, {}, {}) {}".format(
+                quote(TOMBSTONE_TABLE), quote('model'), quote('pk'), quote('deleted'), select
+            ), params)
+
+    except Exception as e:
+        logger.warning("Tombstones for {} failed: {}".format(model._meta.label_lower, e))
+
+
+@receiver(post_migrate)
+def ensure_tombstones(sender, using, **kwargs):
+    if router.allow_migrate(using, sender.label):
+        try:
+            ensure_table(connections[using])
+        except Exception as e:
+            logger.warning("Tombstone table creation failed: {}".format(e))
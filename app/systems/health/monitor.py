@@ -0,0 +1,134 @@
+from django.conf import settings
+from django.core.management import call_command
+from django.db import connections
+from django_redis import get_redis_connection
+
+from systems.db.pool import ConnectionPool
+from utility.parallel import WorkerThread
+
+import threading
+import time
+import logging
+
+
+logger = logging.getLogger(__name__)
+
+
+HEALTH_PATHS = ('/status', '/health/live', '/health/ready')
+
+
+def check_health_path(path):
+    return path.rstrip('/') in HEALTH_PATHS
+
+
+class HealthMonitor(object):
+
+    _instance = None
+
+    def __new__(cls, *args, **kwargs):
+        if not cls._instance:
+            cls._instance = object.__new__(cls)
+        return cls._instance
+
+    def __init__(self):
+        if not getattr(self, '_initialized', False):
+            self.lock = threading.Lock()
+            self.thread = None
+            self.report = None
+            self.started = time.time()
+            self._initialized = True
+
+
+    @property
+    def live(self):
+        return {
+            'status': 'alive',
+            'uptime': round(time.time() - self.started, 3)
+        }
+
+    @property
+    def ready(self):
+        report = self.get_report()
+        if not report['healthy']:
+            return False
+        # A stalled monitor can not vouch for the service
+        return (time.time() - report['checked']) <= (settings.HEALTH_CHECK_INTERVAL * 3)
+
+
+    def get_report(self):
+        self.start()
+        if self.report is None:
+            with self.lock:
+                if self.report is None:
+                    self.report = self.check()
+        return self.report
+
+    def start(self):
+        if self.thread is None or not self.thread.is_alive():
+            with self.lock:
+                if self.thread is None or not self.thread.is_alive():
+                    self.thread = WorkerThread(target = self.monitor)
+
+    def monitor(self, thread):
+        while not thread.terminated:
+            try:
+                self.report = self.check()
+            except Exception as e:
+                logger.error("Health monitor error: {}".format(e))
+
+            thread.stop_signal.wait(settings.HEALTH_CHECK_INTERVAL)
+
+
+    def check(self):
+        checks = {
+            'system': self.run_check(self.check_system)
+        }
+        for alias in settings.DATABASES.keys():
+            # Replicas are routed around when they fail so they are reported without blocking readiness
+            checks["database:{}".format(alias)] = self.run_check(self.check_database, alias,
+                required = alias not in settings.DB_REPLICA_ALIASES
+            )
+
+        if settings.CACHE_MIDDLEWARE_ALIAS in settings.CACHES:
+            checks['redis'] = self.run_check(self.check_redis)
+
+        return {
+            'healthy': all(check['healthy'] for check in checks.values() if check['required']),
+            'checked': time.time(),
+            'checks': checks,
+            'pools': ConnectionPool.metrics()
+        }
+
+    def run_check(self, method, *args, required = True):
+        start_time = time.time()
+        try:
+            method(*args)
+            healthy = True
+            error = None
+        except Exception as e:
+            logger.warning("Health check {} failed: {}".format(method.__name__, e))
+            healthy = False
+            error = str(e)
+
+        return {
+            'healthy': healthy,
+            'required': required,
+            'latency': round((time.time() - start_time) * 1000, 3),
+            'error': error
+        }
+
+
+    def check_system(self):
+        call_command('check')
+
+    def check_database(self, alias):
+        connection = connections[alias]
+        try:
+            with connection.cursor() as cursor:
+                cursor.execute('SELECT 1')
+                cursor.fetchone()
+        finally:
+            connection.close()
+
+    def check_redis(self):
+        get_redis_connection(settings.CACHE_MIDDLEWARE_ALIAS).ping()
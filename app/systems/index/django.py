@@ -3,6 +3,8 @@ from functools import lru_cache
 from django.apps import apps
 from django.conf import settings
 
+from systems.models.graph import DependencyGraph
+
 import os
 import sys
 import importlib
@@ -78,3 +80,7 @@ class IndexerDjangoMixin(object):
             if getattr(model, 'facade', None):
                 models.append(model)
         return models
+
+    @lru_cache(maxsize = None)
+    def get_dependency_graph(self):
+        return DependencyGraph(self.get_models())
@@ -1,9 +1,18 @@
+from functools import lru_cache
+
+from django.apps import apps as django_apps
 from django.conf import settings
-from django.db import models as django
+from django.db import models as django, router, transaction
 from django.db.models.base import ModelBase
 from django.db.models.manager import Manager
+from django.db.models.signals import m2m_changed
+from django.dispatch import receiver
 from django.utils.timezone import now
 
+from systems.cache.version import update_model_version, get_version_names
+from systems.db.tombstone import add_tombstones
+from systems.models.identity import IdentityMap
+from systems.models.fields import EncryptedValue, decrypt_value
 from .index import get_spec_key, get_stored_class_name, check_dynamic, get_dynamic_class_name, get_facade_class_name
 from .facade import ModelFacade
 
@@ -26,6 +35,8 @@ django.options.DEFAULT_NAMES += (
     'relation',
     'dynamic_fields',
     'search_fields',
+    'rollups',
+    'statistics',
     'ordering_fields',
     'provider_name',
     'provider_relation',
@@ -98,11 +109,105 @@ class FacadeNotExistsError(Exception):
     pass
 
 
+@lru_cache(maxsize = None)
+def get_decrypted_iterable(iterable_class):
+
+    class DecryptedIterable(iterable_class):
+
+        def __iter__(self):
+            for row in super().__iter__():
+                if isinstance(row, dict):
+                    if any(isinstance(value, EncryptedValue) for value in row.values()):
+                        row = { key: decrypt_value(value) for key, value in row.items() }
+
+                elif isinstance(row, tuple):
+                    if any(isinstance(value, EncryptedValue) for value in row):
+                        values = [ decrypt_value(value) for value in row ]
+                        row = row._make(values) if hasattr(row, '_make') else tuple(values)
+                else:
+                    row = decrypt_value(row)
+                yield row
+
+    return DecryptedIterable
+
+
+class BaseQuerySet(django.QuerySet):
+
+    # Model instances decrypt lazily, while value rows are returned as plain text
+    def values(self, *fields, **expressions):
+        queryset = super().values(*fields, **expressions)
+        queryset._iterable_class = get_decrypted_iterable(queryset._iterable_class)
+        return queryset
+
+    def values_list(self, *fields, flat = False, named = False):
+        queryset = super().values_list(*fields, flat = flat, named = named)
+        queryset._iterable_class = get_decrypted_iterable(queryset._iterable_class)
+        return queryset
+
+
+    # Bulk writes bypass model saves, so timestamps, retrieved instances and cached versions are updated here
+    def update(self, **kwargs):
+        kwargs.setdefault('updated', now())
+        rows = super().update(**kwargs)
+        if rows:
+            IdentityMap.discard_models(self.model)
+            update_model_version(*get_version_names(self.model))
+        return rows
+    update.alters_data = True
+
+    def bulk_update(self, objs, fields, batch_size = None):
+        updated = now()
+        for obj in objs:
+            obj.updated = updated
+
+        fields = list(fields)
+        if 'updated' not in fields:
+            fields.append('updated')
+
+        result = super().bulk_update(objs, fields, batch_size = batch_size)
+        IdentityMap.discard_models(self.model)
+        update_model_version(*get_version_names(self.model))
+        return result
+    bulk_update.alters_data = True
+
+    def delete(self):
+        with transaction.atomic(using = self._db or router.db_for_write(self.model)):
+            add_tombstones(self)
+            deleted, del_per_type = super().delete()
+        IdentityMap.discard_models(*[ django_apps.get_model(label) for label in del_per_type.keys() ])
+        return (deleted, del_per_type)
+    delete.alters_data = True
+    delete.queryset_only = True
+
+
+@receiver(m2m_changed)
+def update_relation_timestamp(sender, instance, action, reverse, model, pk_set, **kwargs):
+    # Relation changes are stamped on the row that owns the field so delta packages include them
+    if action not in ('post_add', 'post_remove', 'pre_clear'):
+        return
+
+    if not reverse:
+        owner = instance.__class__
+        queryset = owner._base_manager.filter(pk = instance.pk)
+    else:
+        owner = model
+        if pk_set is not None:
+            queryset = owner._base_manager.filter(pk__in = pk_set)
+        else:
+            field = [ field for field in owner._meta.many_to_many if field.remote_field.through is sender ][0]
+            queryset = owner._base_manager.filter(**{ field.name: instance })
+
+    if issubclass(owner, BaseModelMixin):
+        queryset.using(instance._state.db).update(updated = now())
+
+
 class BaseModelMixin(django.Model):
 
     created = django.DateTimeField(null = True, editable = False)
     updated = django.DateTimeField(null = True, editable = False)
 
+    objects = Manager.from_queryset(BaseQuerySet)()
+
     class Meta:
         abstract = True
 
@@ -118,6 +223,19 @@ class BaseModelMixin(django.Model):
         with self.facade.thread_lock:
             super().save(*args, **kwargs)
 
+        IdentityMap.discard(self)
+        update_model_version(*get_version_names(self.__class__))
+
+    def delete(self, using = None, keep_parents = False):
+        using = using or router.db_for_write(self.__class__, instance = self)
+        with transaction.atomic(using = using):
+            add_tombstones(self.__class__._base_manager.using(using).filter(pk = self.pk))
+            deleted, del_per_type = super().delete(using = using, keep_parents = keep_parents)
+        models = [ django_apps.get_model(label) for label in del_per_type.keys() ]
+        IdentityMap.discard_models(*models)
+        update_model_version(*get_version_names(self.__class__, *models))
+        return (deleted, del_per_type)
+
     def save_related(self, provider, relation_values = None):
         if not relation_values:
             relation_values = {}
@@ -140,7 +258,7 @@ class BaseModelMixin(django.Model):
 
     @property
     def facade(self):
-        return copy.deepcopy(self.__class__.facade)
+        return self.__class__.facade.view()
 
 
 class BaseMetaModel(ModelBase):
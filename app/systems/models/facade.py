@@ -1,6 +1,7 @@
 from collections import OrderedDict
 from functools import lru_cache
 
+from django.apps import apps
 from django.conf import settings
 from django.db.models import fields, Count, Avg, Min, Max, Sum
 from django.db.models.manager import Manager
@@ -10,9 +11,12 @@ from django.db.models.fields.reverse_related import ForeignObjectRel, ManyToOneR
 from django.db.models.fields.related_descriptors import ForwardManyToOneDescriptor
 from django.utils.timezone import now, localtime
 
+from systems.cache.version import update_model_version, get_version_names
+from systems.models.identity import IdentityMap
 from utility import runtime, query, data, display, terminal
 
 import datetime
+import copy
 import binascii
 import os
 import re
@@ -33,6 +37,7 @@ class RestrictedError(Exception):
 class ModelFacade(terminal.TerminalMixin):
 
     thread_lock = settings.DB_LOCK
+    read_lock = settings.DB_READ_LOCK
     _viewset = {}
 
     def __init__(self, cls):
@@ -48,7 +53,7 @@ class ModelFacade(terminal.TerminalMixin):
         self.optional = []
         self.fields = []
         self.field_map = {}
-        self._field_type_map = None
+        self._field_type_map = {}
 
         self._scope = {}
         self.order = None
@@ -67,6 +72,21 @@ class ModelFacade(terminal.TerminalMixin):
                 self.fields.append(field.name)
                 self.field_map[field.name] = field
 
+    def __eq__(self, other):
+        return isinstance(other, ModelFacade) and self.model is other.model
+
+    def __hash__(self):
+        # Views share cached field and relation lookups with their base facade
+        return hash(self.model)
+
+
+    def view(self):
+        view = copy.copy(self)
+        view._scope = dict(self._scope)
+        view.order = list(self.order) if self.order else self.order
+        return view
+
+
     @property
     def manager(self):
         return settings.MANAGER
@@ -194,7 +214,7 @@ class ModelFacade(terminal.TerminalMixin):
         field_name_type_index = self.get_field_name_type_index()
 
         if not self._field_type_map:
-            self._field_type_map = {
+            field_type_map = {
                 'meta': [],
                 'bool': [],
                 'text': [],
@@ -208,22 +228,25 @@ class ModelFacade(terminal.TerminalMixin):
                     field_type = field_name_type_index.get(field_name, None)
 
                     if field_name in self.dynamic_fields:
-                        self._field_type_map['meta'].append(field_name)
+                        field_type_map['meta'].append(field_name)
                     else:
                         if field_name in (self.pk, self.key(), 'created', 'updated'):
-                            self._field_type_map['meta'].append(field_name)
+                            field_type_map['meta'].append(field_name)
 
                         if not field_type and field_class_name in field_type_index:
                             field_type = field_type_index[field_class_name]
 
-                        if field_type and field_type in self._field_type_map:
-                            self._field_type_map[field_type].append(field_name)
+                        if field_type and field_type in field_type_map:
+                            field_type_map[field_type].append(field_name)
+
+                    field_type_map['atomic'][field_name] = True
 
-                    self._field_type_map['atomic'][field_name] = True
+            # Filled in place so views of this facade share the result
+            self._field_type_map.update(field_type_map)
 
         if type == 'atomic':
             return list(self._field_type_map[type].keys())
-        return self._field_type_map[type]
+        return list(self._field_type_map[type])
 
 
     def get_packages(self):
@@ -339,27 +362,8 @@ class ModelFacade(terminal.TerminalMixin):
                 filters[filter] = value
 
 
-    @lru_cache(maxsize = None)
     def get_children(self, recursive = False, process = 'all'):
-        children = []
-        for model in self.manager.index.get_models():
-            model_fields = { f.name: f for f in model._meta.fields }
-            fields = list(model.facade.get_base_scope().keys())
-            fields.extend(model.facade.scope_fields)
-
-            for field in fields:
-                field = model_fields[field.replace('_id', '')]
-
-                if isinstance(field, ForeignKey):
-                    if self.model == field.related_model:
-                        scope_process = model.facade.meta.scope_process
-
-                        if process == 'all' or process == scope_process:
-                            children.append(model.facade.name)
-                            if recursive:
-                                children.extend(model.facade.get_children(True, process))
-                            break
-        return children
+        return self.manager.index.get_dependency_graph().get_children(self.name, recursive, process)
 
     @lru_cache(maxsize = None)
     def get_relations(self):
@@ -460,22 +464,21 @@ class ModelFacade(terminal.TerminalMixin):
 
 
     def query(self, **filters):
-        with self.thread_lock:
-            self._check_scope(filters)
+        self._check_scope(filters)
 
-            manager = self.model.objects
-            if not filters:
-                queryset = manager.all()
-            else:
-                queryset = manager.filter(**filters)
+        manager = self.model.objects
+        if not filters:
+            queryset = manager.all()
+        else:
+            queryset = manager.filter(**filters)
 
-            if self.order:
-                queryset = queryset.order_by(*self.order)
+        if self.order:
+            queryset = queryset.order_by(*self.order)
 
-            if self.limit:
-                queryset = queryset[:self.limit]
+        if self.limit:
+            queryset = queryset[:self.limit]
 
-            return queryset
+        return queryset
 
     def all(self):
         return self.query()
@@ -484,45 +487,38 @@ class ModelFacade(terminal.TerminalMixin):
         return self.query(**filters)
 
     def exclude(self, **filters):
-        with self.thread_lock:
-            self._check_scope(filters)
+        self._check_scope(filters)
 
-            manager = self.model.objects
-            if not filters:
-                queryset = manager.all()
-            else:
-                queryset = manager.exclude(**filters)
+        manager = self.model.objects
+        if not filters:
+            queryset = manager.all()
+        else:
+            queryset = manager.exclude(**filters)
 
-            if self.order:
-                queryset = queryset.order_by(*self.order)
+        if self.order:
+            queryset = queryset.order_by(*self.order)
 
-            if self.limit:
-                queryset = queryset[:self.limit]
+        if self.limit:
+            queryset = queryset[:self.limit]
 
-            return queryset
+        return queryset
 
 
     def keys(self, **filters):
-        queryset = self.query(**filters)
-        with self.thread_lock:
-            return queryset.values_list(self.key(), flat = True)
+        return self.query(**filters).values_list(self.key(), flat = True)
 
     def field_values(self, name, **filters):
-        queryset = self.query(**filters)
-        with self.thread_lock:
-            return queryset.values_list(name, flat = True)
+        return self.query(**filters).values_list(name, flat = True)
 
     def values(self, *fields, **filters):
         if not fields:
             fields = self.fields
 
-        queryset = self.query(**filters)
-        with self.thread_lock:
-            return queryset.values(*fields)
+        return self.query(**filters).values(*fields)
 
     def count(self, **filters):
         queryset = self.query(**filters)
-        with self.thread_lock:
+        with self.read_lock:
             return queryset.count()
 
     def related(self, key, relation, **filters):
@@ -530,47 +526,48 @@ class ModelFacade(terminal.TerminalMixin):
         queryset = None
 
         if instance:
-            with self.thread_lock:
-                queryset = query.get_queryset(instance, relation)
+            queryset = query.get_queryset(instance, relation)
 
-                if queryset:
-                    if filters:
-                        queryset = queryset.filter(**filters).distinct()
-                    else:
-                        queryset = queryset.all()
+            if queryset:
+                if filters:
+                    queryset = queryset.filter(**filters).distinct()
+                else:
+                    queryset = queryset.all()
 
         return queryset
 
 
     def retrieve_by_id(self, id):
-        with self.thread_lock:
-            filters = {}
-            self._check_scope(filters)
+        filters = {}
+        self._check_scope(filters)
+        filters[self.pk] = id
 
-            try:
-                filters[self.pk] = id
-                data = self.model.objects.get(**filters)
+        def retrieve_instance():
+            with self.read_lock:
+                try:
+                    return self.model.objects.get(**filters)
 
-            except self.model.DoesNotExist:
-                return None
+                except self.model.DoesNotExist:
+                    return None
 
-            return data
+        return IdentityMap.retrieve(self.model, filters, retrieve_instance)
 
     def retrieve(self, key, **filters):
-        with self.thread_lock:
-            self._check_scope(filters)
+        self._check_scope(filters)
+        filters[self.key()] = key
 
-            try:
-                filters[self.key()] = key
-                data = self.model.objects.get(**filters)
+        def retrieve_instance():
+            with self.read_lock:
+                try:
+                    return self.model.objects.get(**filters)
 
-            except self.model.DoesNotExist:
-                return None
+                except self.model.DoesNotExist:
+                    return None
 
-            except self.model.MultipleObjectsReturned:
-                raise ScopeError("Scope missing from {} {} retrieval".format(self.name, key))
+                except self.model.MultipleObjectsReturned:
+                    raise ScopeError("Scope missing from {} {} retrieval".format(self.name, key))
 
-            return data
+        return IdentityMap.retrieve(self.model, filters, retrieve_instance)
 
 
     def _ensure(self, command, reinit = False):
@@ -593,9 +590,7 @@ class ModelFacade(terminal.TerminalMixin):
     def create(self, key, **values):
         values[self.key()] = key
         self._check_scope(values)
-        with self.thread_lock:
-            instance = self.model(**values)
-        return instance
+        return self.model(**values)
 
     def get_or_create(self, key):
         instance = self.retrieve(key)
@@ -638,9 +633,12 @@ class ModelFacade(terminal.TerminalMixin):
                 })
             deleted, del_per_type = queryset.delete()
 
-            if deleted:
-                return True
-            return False
+        if deleted:
+            models = [ apps.get_model(label) for label in del_per_type.keys() ]
+            IdentityMap.discard_models(*models)
+            update_model_version(*get_version_names(*models))
+            return True
+        return False
 
 
     def get_field_created_display(self, instance, value, short):
@@ -1,4 +1,5 @@
 from django.db import models
+from django.db.models.query_utils import DeferredAttribute
 
 from utility.encryption import Cipher
 from utility.data import serialize, unserialize
@@ -6,8 +7,46 @@ from utility.data import serialize, unserialize
 import re
 
 
+class EncryptedValue(object):
+
+    def __init__(self, field, ciphertext):
+        self.field = field
+        self.ciphertext = ciphertext
+        self.plaintext = None
+
+
+def decrypt_value(value):
+    if isinstance(value, EncryptedValue):
+        return value.field.load_value(value)
+    return value
+
+
+class EncryptedAttribute(DeferredAttribute):
+
+    def __get__(self, instance, cls = None):
+        value = super().__get__(instance, cls)
+
+        if instance is not None and isinstance(value, EncryptedValue):
+            # Decrypted once on first access and kept with the loaded cipher text
+            instance.__dict__[self.field.original_attname] = value
+            value = self.field.load_value(value)
+            instance.__dict__[self.field.attname] = value
+        return value
+
+    def __set__(self, instance, value):
+        # Data descriptors take precedence over the instance dictionary
+        instance.__dict__[self.field.attname] = value
+
+
 class EncryptionMixin(object):
 
+    descriptor_class = EncryptedAttribute
+
+    @property
+    def original_attname(self):
+        return "_encrypted_{}".format(self.attname)
+
+
     def encrypt(self, value):
         # Python data type
         return Cipher.get('field').encrypt(value).decode()
@@ -17,6 +56,39 @@ class EncryptionMixin(object):
         return Cipher.get('field').decrypt(str.encode(value))
 
 
+    def load_value(self, value):
+        value.plaintext = self.decrypt(value.ciphertext)
+        return value.plaintext
+
+    def dump_value(self, value):
+        return value
+
+    def get_encrypted_value(self, instance):
+        value = instance.__dict__.get(self.attname, None)
+        if isinstance(value, EncryptedValue):
+            return value.ciphertext
+
+        original = instance.__dict__.get(self.original_attname, None)
+        if original is not None and original.plaintext == self.dump_value(value):
+            return original.ciphertext
+        return self.get_prep_value(value)
+
+
+    def from_db_value(self, value, expression, connection):
+        if value is None:
+            return value
+        return EncryptedValue(self, value)
+
+    def pre_save(self, model_instance, add):
+        return EncryptedValue(self, self.get_encrypted_value(model_instance))
+
+    def value_from_object(self, obj):
+        return self.get_encrypted_value(obj)
+
+    def value_to_string(self, obj):
+        return self.value_from_object(obj)
+
+
 class EncryptedCharField(EncryptionMixin, models.CharField):
 
     def to_python(self, value):
@@ -25,39 +97,34 @@ class EncryptedCharField(EncryptionMixin, models.CharField):
         return self.decrypt(value)
 
     def from_db_value(self, value, expression, connection):
-        return self.to_python(value)
+        if not value:
+            return value
+        return super().from_db_value(value, expression, connection)
 
     def get_prep_value(self, value):
+        if isinstance(value, EncryptedValue):
+            return value.ciphertext
         if not value:
             return value
         return self.encrypt(value)
 
-    def value_from_object(self, obj):
-        value = super().value_from_object(obj)
-        return self.get_prep_value(value)
-
-    def value_to_string(self, obj):
-        return self.value_from_object(obj)
-
 
 class EncryptedDataField(EncryptionMixin, models.TextField):
 
     def to_python(self, value):
         return unserialize(self.decrypt(value))
 
-    def from_db_value(self, value, expression, connection):
-        return self.to_python(value)
+    def load_value(self, value):
+        return unserialize(super().load_value(value))
+
+    def dump_value(self, value):
+        return serialize(value)
 
     def get_prep_value(self, value):
+        if isinstance(value, EncryptedValue):
+            return value.ciphertext
         return self.encrypt(serialize(value))
 
-    def value_from_object(self, obj):
-        value = super().value_from_object(obj)
-        return self.get_prep_value(value)
-
-    def value_to_string(self, obj):
-        return self.value_from_object(obj)
-
 
 class CSVField(models.TextField):
 
@@ -0,0 +1,82 @@
+from django.apps import apps
+from django.core import serializers
+from django.db.models.fields.related import ForeignKey
+
+import threading
+
+
+class DependencyGraph(object):
+
+    def __init__(self, models):
+        self.lock = threading.Lock()
+        self.models = list(models)
+        self.children = {}
+        self.packages = {}
+
+        for model in self.models:
+            self.children.setdefault(model.facade.name, [])
+
+        for model in self.models:
+            facade = model.facade
+            model_fields = { field.name: field for field in model._meta.fields }
+            fields = list(facade.get_base_scope().keys())
+            fields.extend(facade.scope_fields)
+
+            parents = []
+            for field in fields:
+                field = model_fields[field.replace('_id', '')]
+                if isinstance(field, ForeignKey):
+                    parent = field.related_model.facade.name
+                    if parent not in parents:
+                        parents.append(parent)
+                        self.children.setdefault(parent, []).append((
+                            facade.name,
+                            getattr(facade.meta, 'scope_process', None),
+                            field.name
+                        ))
+
+        app_list = [
+            (app_config, None) for app_config in apps.get_app_configs()
+            if app_config.models_module is not None
+        ]
+        self.export_models = [
+            model for model in serializers.sort_dependencies(app_list)
+            if getattr(model, 'facade', None)
+        ]
+
+
+    def get_children(self, name, recursive = False, process = 'all'):
+        children = []
+        visited = set([ name ])
+
+        def add_children(parent):
+            for child, scope_process, field in self.children.get(parent, []):
+                if (process == 'all' or process == scope_process) and child not in visited:
+                    visited.add(child)
+                    children.append(child)
+                    if recursive:
+                        add_children(child)
+
+        add_children(name)
+        return children
+
+
+    def get_child_relations(self, name, process = 'all'):
+        return [
+            (child, field) for child, scope_process, field in self.children.get(name, [])
+            if process == 'all' or process == scope_process
+        ]
+
+
+    def get_packages(self, model):
+        with self.lock:
+            if model not in self.packages:
+                self.packages[model] = frozenset(model.facade.get_packages())
+            return self.packages[model]
+
+    def get_package_models(self, packages):
+        packages = set(packages)
+        return [
+            model for model in self.export_models
+            if packages & self.get_packages(model)
+        ]
@@ -0,0 +1,149 @@
+from collections import OrderedDict
+from contextlib import contextmanager
+
+from django.conf import settings
+from django.db.models import Model
+
+import threading
+import copy
+
+
+class IdentityMap(object):
+
+    state = threading.local()
+
+
+    @classmethod
+    def active(cls):
+        return getattr(cls.state, 'identity_map', None)
+
+    @classmethod
+    @contextmanager
+    def scope(cls, identity_map = None, fresh = False):
+        previous = cls.active()
+        if fresh and not (previous is not None and previous.fresh):
+            # Rows read outside of a critical section are not trusted within it,
+            # while nested critical sections share the outermost fresh map
+            identity_map = cls(parent = previous, fresh = True)
+        elif identity_map is None:
+            # Nested command executions share the outer unit of work
+            identity_map = previous or cls()
+
+        cls.state.identity_map = identity_map
+        try:
+            yield identity_map
+        finally:
+            cls.state.identity_map = previous
+
+
+    @classmethod
+    def get_identity(cls, model, filters):
+        values = []
+        for name, value in sorted(filters.items()):
+            if isinstance(value, Model):
+                value = (value._meta.label, value.pk)
+            elif value is not None and not isinstance(value, (str, int, float, bool)):
+                return None
+            values.append((name, value))
+        return (model._meta.label, tuple(values))
+
+    @classmethod
+    def retrieve(cls, model, filters, callback):
+        identity_map = cls.active()
+        identity = cls.get_identity(model, filters) if identity_map else None
+        if identity is None:
+            return callback()
+
+        instance = identity_map.get(identity)
+        if instance is None:
+            instance = callback()
+            if instance is not None:
+                identity_map.add(identity, instance)
+        return instance
+
+    @classmethod
+    def discard(cls, instance):
+        identity_map = cls.active()
+        while identity_map is not None:
+            identity_map.remove(instance._meta.label, instance.pk)
+            identity_map = identity_map.parent
+
+    @classmethod
+    def discard_models(cls, *models):
+        identity_map = cls.active()
+        while identity_map is not None:
+            for model in models:
+                identity_map.remove(model._meta.label)
+            identity_map = identity_map.parent
+
+
+    @classmethod
+    def copy_instance(cls, instance):
+        # Callers get private copies so unsaved changes never leak to later retrievals
+        clone = instance.__class__.__new__(instance.__class__)
+        clone.__dict__.update(instance.__dict__)
+        clone._state = copy.copy(instance._state)
+        clone._state.fields_cache = dict(instance._state.fields_cache)
+        if hasattr(instance, '_prefetched_objects_cache'):
+            clone._prefetched_objects_cache = dict(instance._prefetched_objects_cache)
+        return clone
+
+
+    def __init__(self, max_entries = None, parent = None, fresh = False):
+        self.lock = threading.Lock()
+        self.max_entries = settings.DB_IDENTITY_MAP_ENTRIES if max_entries is None else max_entries
+        self.parent = parent
+        self.fresh = fresh
+        self.data = OrderedDict()
+        self.references = {}
+
+    def __bool__(self):
+        return self.max_entries > 0
+
+    def __len__(self):
+        return len(self.data)
+
+
+    def get(self, identity):
+        with self.lock:
+            instance = self.data.get(identity, None)
+            if instance is not None:
+                self.data.move_to_end(identity)
+        return self.copy_instance(instance) if instance is not None else None
+
+    def add(self, identity, instance):
+        reference = (instance._meta.label, instance.pk)
+        instance = self.copy_instance(instance)
+        with self.lock:
+            self.data[identity] = instance
+            self.data.move_to_end(identity)
+            self.references.setdefault(reference, set()).add(identity)
+
+            while len(self.data) > self.max_entries:
+                evicted_identity, evicted = self.data.popitem(last = False)
+                self._unreference(evicted_identity, evicted)
+
+    def remove(self, label, pk = None):
+        with self.lock:
+            if pk is not None:
+                references = [ (label, pk) ]
+            else:
+                references = [ reference for reference in self.references.keys() if reference[0] == label ]
+
+            for reference in references:
+                for identity in self.references.pop(reference, []):
+                    self.data.pop(identity, None)
+
+    def clear(self):
+        with self.lock:
+            self.data = OrderedDict()
+            self.references = {}
+
+
+    def _unreference(self, identity, instance):
+        reference = (instance._meta.label, instance.pk)
+        identities = self.references.get(reference, None)
+        if identities is not None:
+            identities.discard(identity)
+            if not identities:
+                self.references.pop(reference)
@@ -0,0 +1,83 @@
+from types import SimpleNamespace
+
+from django.conf import settings
+from django.test import SimpleTestCase, TestCase, override_settings
+
+from systems.api.auth import TokenCache, APITokenAuthentication
+from systems.cache.version import model_version_updated
+
+
+@override_settings(API_TOKEN_CACHE_SECONDS = 60, API_TOKEN_CACHE_ENTRIES = 2)
+class TokenCacheTest(SimpleTestCase):
+
+    def setUp(self):
+        TokenCache.clear()
+        self.user = SimpleNamespace(name = 'admin', password = 'hash1')
+
+    def tearDown(self):
+        TokenCache.clear()
+
+
+    def test_verified_tokens_are_cached(self):
+        self.assertFalse(TokenCache.check(self.user, 'token'))
+        TokenCache.add(self.user, 'token')
+
+        self.assertTrue(TokenCache.check(self.user, 'token'))
+        self.assertFalse(TokenCache.check(self.user, 'other'))
+
+    def test_rotated_password_misses(self):
+        TokenCache.add(self.user, 'token')
+        self.user.password = 'hash2'
+        self.assertFalse(TokenCache.check(self.user, 'token'))
+
+    def test_clear_user(self):
+        other = SimpleNamespace(name = 'other', password = 'hash1')
+        TokenCache.add(self.user, 'token')
+        TokenCache.add(other, 'token')
+        TokenCache.clear(self.user)
+
+        self.assertFalse(TokenCache.check(self.user, 'token'))
+        self.assertTrue(TokenCache.check(other, 'token'))
+
+    def test_entries_are_bounded(self):
+        for index in range(5):
+            TokenCache.add(self.user, "token{}".format(index))
+        self.assertLessEqual(len(TokenCache.tokens), 2)
+        self.assertTrue(TokenCache.check(self.user, 'token4'))
+
+    @override_settings(API_TOKEN_CACHE_SECONDS = 0)
+    def test_disabled(self):
+        TokenCache.add(self.user, 'token')
+        self.assertFalse(TokenCache.check(self.user, 'token'))
+
+
+@override_settings(
+    CACHES = { 'default': { 'BACKEND': 'django.core.cache.backends.locmem.LocMemCache', 'LOCATION': 'login' } },
+    CACHE_MIDDLEWARE_ALIAS = 'default',
+    API_LAST_LOGIN_INTERVAL = 60
+)
+class LastLoginTest(TestCase):
+
+    def setUp(self):
+        facade_index = settings.MANAGER.index.get_facade_index()
+        facade_index['environment'].model.objects.create(name = 'default')
+        self.user_model = facade_index['user'].model
+        self.user = self.user_model.objects.create(name = 'login-test')
+
+        self.updates = []
+        model_version_updated.connect(self.record_update)
+        self.addCleanup(model_version_updated.disconnect, self.record_update)
+
+    def record_update(self, names, **kwargs):
+        self.updates.append(names)
+
+
+    def test_last_login_keeps_model_versions(self):
+        APITokenAuthentication().update_last_login(self.user)
+        last_login = self.user_model.objects.get(pk = self.user.pk).last_login
+
+        self.assertIsNotNone(last_login)
+        self.assertEqual(self.updates, [])
+
+        APITokenAuthentication().update_last_login(self.user)
+        self.assertEqual(self.user_model.objects.get(pk = self.user.pk).last_login, last_login)
@@ -0,0 +1,100 @@
+from collections import OrderedDict
+from types import SimpleNamespace
+from unittest import mock
+
+from django.contrib.contenttypes.models import ContentType
+from django.db.models import Count
+from django.db.models.query import QuerySet
+from django.test import SimpleTestCase, TestCase, override_settings
+
+from rest_framework_filters.complex_ops import ComplexOp
+
+from systems.api.filters import BaseComplexFilterBackend, FilterSetCache, DataFilterSet
+
+
+def get_facade(name):
+    return SimpleNamespace(
+        name = name,
+        model = ContentType,
+        boolean_fields = [],
+        text_fields = [ 'app_label', 'model' ],
+        number_fields = [ 'id' ],
+        time_fields = [],
+        get_all_relations = lambda: {}
+    )
+
+
+@override_settings(FILTERSET_CACHE_ENTRIES = 2)
+class FilterSetCacheTest(SimpleTestCase):
+
+    def setUp(self):
+        patcher = mock.patch.object(FilterSetCache, 'filtersets', OrderedDict())
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+
+    def test_least_recently_used_entries_are_evicted(self):
+        FilterSetCache.set('first', 1)
+        FilterSetCache.set('second', 2)
+        self.assertEqual(FilterSetCache.get('first'), 1)
+
+        FilterSetCache.set('third', 3)
+        self.assertIsNone(FilterSetCache.get('second'))
+        self.assertEqual(FilterSetCache.get('first'), 1)
+        self.assertEqual(FilterSetCache.get('third'), 3)
+
+    def test_aggregate_filtersets_are_shared(self):
+        facade = get_facade('filtercachetest')
+        filterset = DataFilterSet(facade)
+        aggregate = DataFilterSet(facade, [ 'count', 'total' ])
+
+        self.assertIs(DataFilterSet(facade), filterset)
+        self.assertIs(DataFilterSet(facade, [ 'total', 'count' ]), aggregate)
+        self.assertTrue(issubclass(aggregate, filterset))
+        self.assertIn('total__gte', aggregate.base_filters)
+        self.assertNotIn('total__gte', filterset.base_filters)
+
+
+class ComplexFilterTest(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        ContentType.objects.bulk_create([
+            ContentType(app_label = 'filtertest', model = "m{}".format(index))
+            for index in range(6)
+        ])
+
+
+    def setUp(self):
+        self.backend = BaseComplexFilterBackend()
+        self.queryset = ContentType.objects.filter(app_label = 'filtertest')
+
+    def get_models(self, queryset):
+        return sorted(queryset.values_list('model', flat = True))
+
+
+    def test_check_composable(self):
+        self.assertTrue(self.backend.check_composable(self.queryset.filter(model = 'm1')))
+        self.assertFalse(self.backend.check_composable(self.queryset.union(self.queryset)))
+        self.assertFalse(self.backend.check_composable(self.queryset[:2]))
+        self.assertFalse(self.backend.check_composable(self.queryset.annotate(total = Count('id'))))
+
+    def test_composed_queries_match_combined_results(self):
+        querysets = [
+            self.queryset.filter(model__in = [ 'm0', 'm1', 'm2', 'm3' ]),
+            self.queryset.filter(model__in = [ 'm2', 'm3', 'm4' ]),
+            self.queryset.filter(model = 'm3')
+        ]
+        for operators, negate, expected in (
+            ((QuerySet.intersection, QuerySet.union), False, [ 'm2', 'm3' ]),
+            ((QuerySet.union, QuerySet.difference), False, [ 'm0', 'm1', 'm2', 'm4' ]),
+            ((QuerySet.intersection, QuerySet.intersection), True, [ 'm2' ]),
+            ((QuerySet.difference, QuerySet.union), True, [ 'm0', 'm1', 'm2', 'm4', 'm5' ])
+        ):
+            complex_ops = [
+                ComplexOp('', False, operators[0]),
+                ComplexOp('', False, operators[1]),
+                ComplexOp('', negate, None)
+            ]
+            composed = self.backend.compose_queryset(self.queryset, querysets, complex_ops)
+            self.assertEqual(self.get_models(composed), expected)
@@ -0,0 +1,162 @@
+from unittest import mock
+
+from django.contrib.contenttypes.models import ContentType
+from django.db.models import Case, When, Value, IntegerField, DateTimeField
+from django.test import TestCase
+from django.utils import timezone
+
+from rest_framework.exceptions import NotFound
+from rest_framework.request import Request
+from rest_framework.test import APIRequestFactory
+
+from systems.api.pagination import ResultCursorPagination, TestResultSetPagination
+
+from urllib.parse import urlparse, parse_qs
+
+import datetime
+
+
+class CursorPaginationTest(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        ContentType.objects.bulk_create([
+            ContentType(app_label = 'pagetest', model = "m{:02d}".format(index))
+            for index in range(12)
+        ])
+
+
+    def get_queryset(self):
+        # Every third row has no bucket so null ordering is crossed by the keyset filter
+        return ContentType.objects.filter(app_label = 'pagetest').annotate(
+            bucket = Case(
+                *[ When(model = "m{:02d}".format(index), then = Value(None)) for index in range(0, 12, 3) ],
+                *[ When(model = "m{:02d}".format(index), then = Value(index % 2)) for index in range(12) if index % 3 ],
+                output_field = IntegerField()
+            )
+        ).order_by('bucket', '-model')
+
+    def get_expected(self):
+        rows = list(self.get_queryset())
+        rows.sort(key = lambda row: row.pk)
+        rows.sort(key = lambda row: row.model, reverse = True)
+        rows.sort(key = lambda row: (row.bucket is None, row.bucket or 0))
+        return [ row.model for row in rows ]
+
+    def get_created_queryset(self):
+        # Neighbouring rows differ only below the millisecond
+        created = timezone.now().replace(microsecond = 0)
+        return ContentType.objects.filter(app_label = 'pagetest').annotate(
+            created = Case(
+                *[ When(model = "m{:02d}".format(index), then = Value(created + datetime.timedelta(microseconds = 1000 + (index * 100)), output_field = DateTimeField()))
+                    for index in range(12) ],
+                output_field = DateTimeField()
+            )
+        ).order_by('-created')
+
+    def paginate(self, params = None, queryset = None):
+        paginator = ResultCursorPagination()
+        request = Request(APIRequestFactory().get('/content/', { 'count': 5, **(params or {}) }))
+        results = paginator.paginate_queryset(queryset if queryset is not None else self.get_queryset(), request)
+        return paginator, [ row.model for row in results ]
+
+    def get_cursor(self, link):
+        return parse_qs(urlparse(link).query)['cursor'][0] if link else None
+
+
+    def test_ordering_ends_with_primary_key(self):
+        paginator = ResultCursorPagination()
+        self.assertEqual(paginator.get_ordering(self.get_queryset()), [ 'bucket', '-model', 'id' ])
+
+    def test_pages_follow_queryset_order(self):
+        pages = []
+        paginator, results = self.paginate()
+        pages.append(results)
+
+        while paginator.get_next_link():
+            paginator, results = self.paginate({ 'cursor': self.get_cursor(paginator.get_next_link()) })
+            pages.append(results)
+
+        self.assertEqual([ len(page) for page in pages ], [ 5, 5, 2 ])
+        self.assertEqual(sum(pages, []), self.get_expected())
+        self.assertEqual(paginator.get_paginated_response([]).data['count'], 12)
+
+        previous = []
+        while paginator.get_previous_link():
+            paginator, results = self.paginate({ 'cursor': self.get_cursor(paginator.get_previous_link()) })
+            previous.append(results)
+
+        self.assertEqual(previous, [ pages[1], pages[0] ])
+
+    def test_datetime_cursors_keep_microseconds(self):
+        queryset = self.get_created_queryset()
+        paginator, results = self.paginate(queryset = queryset)
+        pages = [ results ]
+
+        while paginator.get_next_link():
+            paginator, results = self.paginate({ 'cursor': self.get_cursor(paginator.get_next_link()) }, queryset)
+            pages.append(results)
+
+        self.assertEqual(sum(pages, []), [ "m{:02d}".format(index) for index in reversed(range(12)) ])
+
+        paginator, results = self.paginate({ 'cursor': self.get_cursor(paginator.get_previous_link()) }, queryset)
+        self.assertEqual(results, pages[1])
+
+    def test_invalid_cursor(self):
+        with self.assertRaises(NotFound):
+            self.paginate({ 'cursor': 'invalid' })
+
+        paginator = ResultCursorPagination()
+        paginator.ordering = [ 'model', 'id' ]
+        with self.assertRaises(NotFound):
+            self.paginate({ 'cursor': paginator.encode_cursor([ 'm01', 1 ], False) })
+
+        paginator.ordering = [ 'bucket', '-model', 'id' ]
+        with self.assertRaises(NotFound):
+            self.paginate({ 'cursor': paginator.encode_cursor([ { 'datetime': 'invalid' }, 'm01', 1 ], False) })
+
+
+class PageNumberPaginationTest(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        ContentType.objects.bulk_create([
+            ContentType(app_label = 'pagetest', model = "m{:02d}".format(index))
+            for index in range(12)
+        ])
+
+
+    def paginate(self, page, estimate):
+        paginator = TestResultSetPagination()
+        request = Request(APIRequestFactory().get('/content/', { 'page': page }))
+        queryset = ContentType.objects.filter(app_label = 'pagetest').order_by('model')
+
+        with mock.patch('systems.api.pagination.get_count', return_value = estimate):
+            results = paginator.paginate_queryset(queryset, request)
+            return [ row.model for row in results ], paginator.get_paginated_response([]).data
+
+
+    def test_low_estimates_keep_deep_pages(self):
+        results, data = self.paginate(3, 4)
+        self.assertEqual(results, [ 'm10', 'm11' ])
+        self.assertEqual(data['count'], 4)
+        self.assertIsNone(data['next'])
+        self.assertIsNotNone(data['previous'])
+
+        results, data = self.paginate(2, 4)
+        self.assertEqual(len(results), 5)
+        self.assertIsNotNone(data['next'])
+
+    def test_high_estimates_do_not_offer_empty_pages(self):
+        results, data = self.paginate(1, 1000)
+        self.assertIsNotNone(data['next'])
+
+        results, data = self.paginate(3, 1000)
+        self.assertIsNone(data['next'])
+
+        with self.assertRaises(NotFound):
+            self.paginate(4, 1000)
+
+    def test_last_page_uses_exact_count(self):
+        results, data = self.paginate('last', 1000)
+        self.assertEqual(results, [ 'm10', 'm11' ])
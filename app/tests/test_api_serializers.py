@@ -0,0 +1,42 @@
+from types import SimpleNamespace
+
+from django.test import SimpleTestCase
+
+from rest_framework import fields, serializers as rest_serializers
+
+from systems.api.serializers import get_related_lookups
+
+
+def get_relation(concrete = True, many_to_many = False, accessor = None):
+    return { 'field': SimpleNamespace(
+        concrete = concrete,
+        many_to_many = many_to_many,
+        get_accessor_name = lambda: accessor
+    ) }
+
+
+class RelatedSerializer(rest_serializers.Serializer):
+    name = fields.CharField()
+
+
+class RelatedLookupTest(SimpleTestCase):
+
+    def test_lookups_follow_nested_serializers(self):
+        facade = SimpleNamespace(get_all_relations = lambda: {
+            'environment': get_relation(),
+            'groups': get_relation(many_to_many = True),
+            'children': get_relation(concrete = False, accessor = 'child_set'),
+            'owner': get_relation()
+        })
+
+        class TestSerializer(rest_serializers.Serializer):
+            environment = RelatedSerializer()
+            groups = RelatedSerializer(many = True)
+            children = RelatedSerializer(many = True)
+            owner = fields.CharField()
+            name = fields.CharField()
+
+        self.assertEqual(get_related_lookups(facade, TestSerializer), (
+            [ 'environment' ],
+            [ 'groups', 'child_set' ]
+        ))
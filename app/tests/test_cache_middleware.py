@@ -0,0 +1,100 @@
+from types import SimpleNamespace
+
+from django.conf import settings
+from django.core.cache import caches
+from django.test import TestCase, override_settings
+
+from rest_framework.test import APIClient
+
+from systems.cache.tiered import TieredCache
+
+from urllib.parse import urlparse, parse_qs
+
+
+@override_settings(
+    ROOT_URLCONF = 'services.data.urls',
+    CACHES = {
+        'default': { 'BACKEND': 'django.core.cache.backends.dummy.DummyCache' },
+        'page': { 'BACKEND': 'django.core.cache.backends.locmem.LocMemCache', 'LOCATION': 'middleware' }
+    },
+    CACHE_MIDDLEWARE_ALIAS = 'page',
+    CACHE_MIDDLEWARE_KEY_PREFIX = 'test:',
+    CACHE_WARM_DELAY = 0,
+    DB_APPROXIMATE_COUNT = False
+)
+class DataRequestTest(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        index = settings.MANAGER.index.get_facade_index()
+        index['environment'].model.objects.create(name = 'default')
+        cls.group_model = index['group'].model
+        for index in range(12):
+            cls.group_model.objects.create(name = "request-{:02d}".format(index))
+
+
+    def setUp(self):
+        TieredCache.instances.pop('page', None)
+        self.addCleanup(TieredCache.instances.pop, 'page', None)
+        caches['page'].clear()
+
+        self.client = APIClient()
+        self.client.force_authenticate(user = SimpleNamespace(
+            is_authenticated = True,
+            check_env_groups = lambda groups: True
+        ))
+
+    def get(self, path, params = None, **headers):
+        return self.client.get(path, params or {}, HTTP_ACCEPT = 'application/json', **headers)
+
+    def get_names(self, response):
+        return [ item['name'] for item in response.json()['results'] ]
+
+    def get_cursor(self, link):
+        return parse_qs(urlparse(link).query)['cursor'][0]
+
+
+    def test_conditional_requests_use_data_etags(self):
+        response = self.get('/group/')
+        etag = response['ETag']
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response['Object-Cache'], 'MISS')
+
+        response = self.get('/group/')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response['Object-Cache'], 'HIT')
+        self.assertEqual(response['ETag'], etag)
+
+        response = self.get('/group/', HTTP_IF_NONE_MATCH = etag)
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response['ETag'], etag)
+        self.assertEqual(response.content, b'')
+
+        self.group_model.objects.create(name = 'request-new')
+        response = self.get('/group/', HTTP_IF_NONE_MATCH = etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response['ETag'], etag)
+        self.assertIn('request-new', self.get_names(response))
+
+    def test_cursor_pages_cover_queryset(self):
+        names = []
+        response = self.get('/group/', { 'cursor': '', 'count': 5, 'ordering': '-name' })
+
+        while True:
+            self.assertEqual(response.status_code, 200)
+            self.assertEqual(response.json()['count'], 12)
+            names.extend(self.get_names(response))
+
+            if not response.json()['next']:
+                break
+            response = self.get('/group/', { 'cursor': self.get_cursor(response.json()['next']), 'count': 5, 'ordering': '-name' })
+
+        self.assertEqual(names, sorted(self.group_model.objects.values_list('name', flat = True), reverse = True))
+
+    def test_page_numbers_follow_results(self):
+        response = self.get('/group/', { 'page': 3, 'count': 5, 'ordering': 'name' })
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(self.get_names(response), [ 'request-10', 'request-11' ])
+        self.assertIsNone(response.json()['next'])
+
+        self.assertEqual(self.get('/group/', { 'page': 4, 'count': 5 }).status_code, 404)
@@ -0,0 +1,72 @@
+from unittest import mock
+
+from django.core.cache.backends.locmem import LocMemCache
+from django.http import HttpResponse
+from django.test import SimpleTestCase
+
+from systems.cache.tiered import LocalCache, TieredCache
+
+
+class LocalCacheTest(SimpleTestCase):
+
+    def test_least_recent_entries_are_evicted(self):
+        cache = LocalCache(2, 1000, 60)
+        cache.set('a', 1, 10)
+        cache.set('b', 2, 10)
+        cache.get('a')
+        cache.set('c', 3, 10)
+
+        self.assertEqual(cache.get('a'), 1)
+        self.assertIsNone(cache.get('b'))
+        self.assertEqual(cache.get('c'), 3)
+
+    def test_byte_limit_is_enforced(self):
+        cache = LocalCache(10, 100, 60)
+        cache.set('a', 1, 60)
+        cache.set('b', 2, 60)
+        cache.set('large', 3, 101)
+
+        self.assertEqual(cache.bytes, 60)
+        self.assertIsNone(cache.get('a'))
+        self.assertEqual(cache.get('b'), 2)
+        self.assertIsNone(cache.get('large'))
+
+    def test_entries_expire(self):
+        cache = LocalCache(10, 1000, 60)
+        with mock.patch('systems.cache.tiered.time.time', return_value = 1000):
+            cache.set('a', 1, 10, timeout = 5)
+        with mock.patch('systems.cache.tiered.time.time', return_value = 1006):
+            self.assertIsNone(cache.get('a'))
+        self.assertEqual(cache.bytes, 0)
+
+
+class TieredCacheTest(SimpleTestCase):
+
+    def setUp(self):
+        self.shared = LocMemCache('tiered-test', {})
+        self.shared.clear()
+        self.cache = TieredCache(self.shared, LocalCache(10, 100000, 60))
+
+
+    def test_shared_values_fill_local_tier(self):
+        self.shared.set('key', 'value')
+        self.assertEqual(self.cache.get('key'), 'value')
+
+        self.shared.delete('key')
+        self.assertEqual(self.cache.get('key'), 'value')
+
+        self.cache.delete('key')
+        self.assertEqual(self.cache.get('key', 'missing'), 'missing')
+
+    def test_responses_are_stored_compressed(self):
+        response = HttpResponse('x' * 1000, content_type = 'text/plain')
+        response['ETag'] = '"test"'
+        self.cache.set('response', response)
+
+        self.assertLess(len(self.shared.get('response').content), 1000)
+
+        cached = self.cache.get('response')
+        self.assertIsNot(cached, response)
+        self.assertEqual(cached.content, response.content)
+        self.assertEqual(cached['ETag'], '"test"')
+        self.assertEqual(cached['Content-Type'], 'text/plain')
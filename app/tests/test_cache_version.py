@@ -0,0 +1,79 @@
+from types import SimpleNamespace
+
+from django.test import RequestFactory, SimpleTestCase, override_settings
+
+from systems.cache.middleware import get_data_etag, check_etag_match
+from systems.cache.version import model_version_updated, get_model_versions, update_model_version, check_versioned, get_version_names
+
+
+def get_model(name, statistics = False):
+    return SimpleNamespace(_meta = SimpleNamespace(db_table = name, statistics = statistics))
+
+
+@override_settings(
+    CACHES = { 'default': { 'BACKEND': 'django.core.cache.backends.locmem.LocMemCache', 'LOCATION': 'version' } },
+    CACHE_MIDDLEWARE_ALIAS = 'default',
+    CACHE_MIDDLEWARE_KEY_PREFIX = 'test:',
+    CACHE_WARM_DELAY = 0
+)
+class CacheVersionTest(SimpleTestCase):
+
+    def setUp(self):
+        self.updates = []
+        model_version_updated.connect(self.record_update)
+
+    def tearDown(self):
+        model_version_updated.disconnect(self.record_update)
+
+    def record_update(self, names, **kwargs):
+        self.updates.append(names)
+
+
+    def test_statistics_models_are_not_versioned(self):
+        self.assertTrue(check_versioned(get_model('core_user')))
+        self.assertFalse(check_versioned(get_model('core_cache', True)))
+        self.assertEqual(get_version_names(get_model('core_user'), get_model('core_cache', True)), [ 'core_user' ])
+
+    def test_update_changes_version(self):
+        version = get_model_versions('core_user')['core_user']
+        update_model_version('core_user')
+
+        self.assertNotEqual(get_model_versions('core_user')['core_user'], version)
+        self.assertEqual(self.updates, [ ('core_user',) ])
+
+    def test_empty_update_is_skipped(self):
+        update_model_version(*get_version_names(get_model('core_cache', True)))
+        self.assertEqual(self.updates, [])
+
+
+class DataETagTest(SimpleTestCase):
+
+    def setUp(self):
+        self.factory = RequestFactory()
+        self.facade = SimpleNamespace(name = 'user')
+
+    def get_etag(self, path, version = 'v1', action = 'list', **headers):
+        return get_data_etag(self.factory.get(path, **headers), self.facade, action, version)
+
+
+    def test_etags_follow_query_and_version(self):
+        etag = self.get_etag('/user/?b=2&a=1&refresh=true')
+
+        self.assertEqual(etag, self.get_etag('/user/?a=1&b=2'))
+        self.assertNotEqual(etag, self.get_etag('/user/?a=1&b=3'))
+        self.assertNotEqual(etag, self.get_etag('/user/?a=1&b=2', version = 'v2'))
+        self.assertNotEqual(etag, self.get_etag('/user/?a=1&b=2', HTTP_AUTHORIZATION = 'Token other'))
+
+    def test_unversioned_requests_have_no_etag(self):
+        self.assertIsNone(self.get_etag('/user/', version = None))
+        self.assertIsNone(self.get_etag('/user/', action = 'create'))
+        self.assertIsNone(get_data_etag(self.factory.get('/user/'), None, 'list', 'v1'))
+
+    def test_etag_matching(self):
+        etag = self.get_etag('/user/')
+
+        self.assertTrue(check_etag_match(self.factory.get('/user/', HTTP_IF_NONE_MATCH = etag), etag))
+        self.assertTrue(check_etag_match(self.factory.get('/user/', HTTP_IF_NONE_MATCH = 'W/' + etag), etag))
+        self.assertTrue(check_etag_match(self.factory.get('/user/', HTTP_IF_NONE_MATCH = '*'), etag))
+        self.assertFalse(check_etag_match(self.factory.get('/user/', HTTP_IF_NONE_MATCH = '"other"'), etag))
+        self.assertFalse(check_etag_match(self.factory.get('/user/'), etag))
@@ -0,0 +1,73 @@
+from types import SimpleNamespace
+from unittest import mock
+
+from django.http import HttpResponse
+from django.test import SimpleTestCase, override_settings
+from django.urls import path
+
+from services.data.settings import REST_FRAMEWORK
+from systems.api.filters import DataSearchFilter
+from systems.api.views import BaseDataViewSet
+from systems.cache import warmer
+from systems.cache.middleware import get_request_facade
+from systems.cache.version import update_model_version
+
+
+def probe(request):
+    return HttpResponse("{}:{}".format(request.urlconf, getattr(request, '_cache_warm', False)))
+
+probe.cls = SimpleNamespace(facade = 'probe')
+probe.actions = { 'get': 'list' }
+
+
+urlpatterns = [
+    path('probe/', probe)
+]
+
+
+@override_settings(ROOT_URLCONF = 'django.contrib.auth.urls', MIDDLEWARE = [])
+class DataClientTest(SimpleTestCase):
+
+    databases = { 'default' }
+
+
+    def test_requests_use_data_urlconf(self):
+        with mock.patch.object(warmer, 'DATA_URLCONF', __name__):
+            client = warmer.DataClient()
+            client.force_authenticate(user = SimpleNamespace(is_authenticated = True))
+            response = client.get('/probe/')
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.content.decode(), "{}:True".format(__name__))
+
+    def test_data_views_use_data_service_settings(self):
+        def get_paths(classes):
+            return [ "{}.{}".format(cls.__module__, cls.__name__) for cls in classes ]
+
+        self.assertEqual(get_paths(BaseDataViewSet.authentication_classes), REST_FRAMEWORK['DEFAULT_AUTHENTICATION_CLASSES'])
+        self.assertEqual(get_paths(BaseDataViewSet.permission_classes), REST_FRAMEWORK['DEFAULT_PERMISSION_CLASSES'])
+        self.assertEqual(get_paths(BaseDataViewSet.renderer_classes), REST_FRAMEWORK['DEFAULT_RENDERER_CLASSES'])
+        self.assertEqual(DataSearchFilter.search_param, REST_FRAMEWORK['SEARCH_PARAM'])
+
+    def test_request_facade_uses_request_urlconf(self):
+        request = SimpleNamespace(path_info = '/probe/', urlconf = __name__)
+        self.assertEqual(get_request_facade(request), ('probe', 'list'))
+
+        request = SimpleNamespace(path_info = '/probe/')
+        self.assertEqual(get_request_facade(request), (None, None))
+
+
+@override_settings(
+    CACHES = { 'default': { 'BACKEND': 'django.core.cache.backends.locmem.LocMemCache', 'LOCATION': 'warmer' } },
+    CACHE_MIDDLEWARE_ALIAS = 'default',
+    CACHE_MIDDLEWARE_KEY_PREFIX = 'test:',
+    CACHE_WARM_DELAY = 300
+)
+class WarmScheduleTest(SimpleTestCase):
+
+    def test_changes_share_one_warm_pass(self):
+        with mock.patch.object(warmer, 'queue_warm') as queue_warm:
+            update_model_version('core_user')
+            update_model_version('core_group')
+
+        queue_warm.assert_called_once_with(300)
@@ -0,0 +1,87 @@
+from types import SimpleNamespace
+from unittest import mock
+
+from django.conf import settings
+from django.test import TestCase
+
+from plugins.data import BasePlugin as DataPlugin
+from systems.commands.clear import BulkClear
+
+
+class RestrictedError(Exception):
+    pass
+
+
+class ClearCommand(object):
+
+    manager = settings.MANAGER
+
+
+    def __init__(self):
+        self.executed = []
+
+    def error(self, message):
+        raise RestrictedError(message)
+
+    def exec_local(self, name, options):
+        self.executed.append((name, options))
+
+    def get_scope_filters(self, instance):
+        return instance.facade.get_scope_filters(instance)
+
+    def run_list(self, items, callback):
+        for item in items:
+            callback(item)
+
+
+class LockProvider(DataPlugin):
+
+    def delete_lock_id(self):
+        return 'lock'
+
+
+class BulkClearTest(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.facade_index = settings.MANAGER.index.get_facade_index()
+        cls.facade_index['environment'].model.objects.create(name = 'default')
+        cls.environment = cls.facade_index['environment'].model.objects.create(name = 'bulkclear')
+        cls.group = cls.facade_index['group'].model.objects.create(name = 'bulkclear')
+
+
+    def setUp(self):
+        self.command = ClearCommand()
+        self.bulk_clear = BulkClear(self.command)
+
+
+    def test_keep_checks_membership(self):
+        facade = self.facade_index['group'].view()
+
+        with mock.patch.object(type(facade), 'keep', return_value = 'bulkclear-parent'):
+            self.bulk_clear.check_restricted(facade, [ self.group.pk ])
+
+        with mock.patch.object(type(facade), 'keep', return_value = [ 'bulkclear' ]):
+            with self.assertRaises(RestrictedError):
+                self.bulk_clear.check_restricted(facade, [ self.group.pk ])
+
+    def test_delete_locks_and_remove_hooks_disable_bulk(self):
+        self.assertTrue(self.bulk_clear.check_bulk('group'))
+
+        with mock.patch.object(settings.MANAGER.index, 'get_plugin_providers', return_value = { 'lock': LockProvider }):
+            self.assertFalse(BulkClear(self.command).check_bulk('group'))
+
+        with mock.patch.object(BulkClear, 'get_clear_command', return_value = SimpleNamespace(bulk_clear = False)):
+            self.assertFalse(BulkClear(self.command).check_bulk('group'))
+
+    def test_children_without_bulk_are_cleared_by_command(self):
+        facade = self.facade_index['environment'].view()
+
+        with mock.patch.object(BulkClear, 'check_bulk', side_effect = lambda name: name != 'host'):
+            counts = self.bulk_clear.clear(facade, [ self.environment ])
+
+        self.assertEqual(counts, { 'environment': 1 })
+        self.assertEqual(self.command.executed, [
+            ("{} clear".format(self.bulk_clear.get_command_base('host')), { 'force': False, 'environment_name': 'bulkclear' })
+        ])
+        self.assertFalse(facade.model.objects.filter(name = 'bulkclear').exists())
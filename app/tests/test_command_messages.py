@@ -0,0 +1,69 @@
+from django.test import SimpleTestCase, override_settings
+
+from Crypto.Cipher import AES
+from Crypto.Util import Counter
+
+from systems.commands.messages import AppMessage, InfoMessage, DataMessage, STREAM_COMPRESSED, check_stream_accept, pack_messages, unpack_messages
+
+import base64
+import json
+import struct
+
+
+def legacy_decrypt(cipher, ciphertext):
+    ciphertext = base64.b64decode(ciphertext)
+    counter = Counter.new(AES.block_size * 8, initial_value = int(ciphertext[:AES.block_size].hex(), 16))
+    return AES.new(cipher.key, AES.MODE_CTR, counter = counter).decrypt(ciphertext[AES.block_size:]).decode('utf-8')
+
+
+class CommandStreamTest(SimpleTestCase):
+
+    def get_messages(self):
+        return [
+            InfoMessage('first', name = 'test'),
+            DataMessage('data', [ 'x' * 200, 3, None ]),
+            InfoMessage('ünïcode', prefix = '[test]')
+        ]
+
+
+    def test_stream_accept(self):
+        self.assertTrue(check_stream_accept('application/json, application/vnd.zimagi.stream+msgpack; q=0.9'))
+        self.assertFalse(check_stream_accept('application/json'))
+
+    @override_settings(COMMAND_STREAM_COMPRESS_SIZE = 100000)
+    def test_frames_round_trip(self):
+        messages = self.get_messages()
+        data = pack_messages(messages[:2]) + pack_messages(messages[2:])
+
+        # Frames are reassembled regardless of transport chunking
+        chunks = [ data[index:index + 5] for index in range(0, len(data), 5) ]
+        unpacked = list(unpack_messages(chunks))
+
+        self.assertEqual(unpacked, [ message.render() for message in messages ])
+        self.assertEqual([ AppMessage.get(item, False).render() for item in unpacked ], unpacked)
+
+    def test_large_frames_are_compressed(self):
+        messages = self.get_messages()
+
+        with self.settings(COMMAND_STREAM_COMPRESS_SIZE = 100000):
+            plain = pack_messages(messages)
+        with self.settings(COMMAND_STREAM_COMPRESS_SIZE = 10):
+            compressed = pack_messages(messages)
+
+        self.assertFalse(plain[4] & STREAM_COMPRESSED)
+        self.assertTrue(compressed[4] & STREAM_COMPRESSED)
+        self.assertLess(len(compressed), len(plain))
+        self.assertEqual(struct.unpack('>I', compressed[:4])[0], len(compressed) - 4)
+        self.assertEqual(list(unpack_messages([ compressed ])), [ message.render() for message in messages ])
+
+    def test_partial_frames_fail(self):
+        data = pack_messages(self.get_messages())
+        with self.assertRaises(ValueError):
+            list(unpack_messages([ data[:-1] ]))
+
+    def test_json_packages_use_legacy_cipher_text(self):
+        for message in self.get_messages():
+            package = json.loads(message.to_package())['package']
+
+            self.assertEqual(json.loads(legacy_decrypt(AppMessage.cipher, package)), message.render())
+            self.assertEqual(AppMessage.get(json.loads(message.to_package()), True).render(), message.render())
@@ -0,0 +1,50 @@
+from types import SimpleNamespace
+from unittest import mock
+
+from django.contrib.contenttypes.models import ContentType
+from django.db.models import Count
+from django.test import TestCase, override_settings
+
+from systems.db import count
+
+
+@override_settings(
+    DB_APPROXIMATE_COUNT = True,
+    DB_APPROXIMATE_COUNT_THRESHOLD = 0,
+    DB_APPROXIMATE_COUNT_MAX_FILTERS = 2
+)
+class CountEstimateTest(TestCase):
+
+    def setUp(self):
+        self.queryset = ContentType.objects.all()
+
+        patcher = mock.patch.object(count, 'connections', { 'default': SimpleNamespace(vendor = 'postgresql') })
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+
+    def test_table_rows_only_describe_whole_tables(self):
+        self.assertTrue(count.check_table_rows(self.queryset.query))
+
+        for queryset in (
+            self.queryset.filter(app_label = 'count'),
+            self.queryset.distinct(),
+            self.queryset.values('app_label'),
+            self.queryset.annotate(total = Count('id')),
+            self.queryset[10:],
+            self.queryset.filter(app_label = 'count').exclude(model = 'count')
+        ):
+            self.assertFalse(count.check_table_rows(queryset.query))
+
+    def test_estimates_are_limited_by_filters(self):
+        self.assertTrue(count.check_estimate(self.queryset.filter(app_label = 'count', model = 'count').query))
+        self.assertFalse(count.check_estimate(self.queryset.filter(app_label = 'count', model = 'count', id__gt = 1).query))
+        self.assertFalse(count.check_estimate(self.queryset.filter(app_label = 'count').exclude(model__in = [ 'a' ], id__gt = 1).query))
+
+    @mock.patch.object(count, 'get_postgres_query_estimate', return_value = 1000)
+    @mock.patch.object(count, 'get_postgres_table_estimate', return_value = 2000)
+    def test_estimate_selection(self, table_estimate, query_estimate):
+        self.assertEqual(count.get_count(self.queryset), 2000)
+        self.assertEqual(count.get_count(self.queryset.filter(app_label = 'count')), 1000)
+        self.assertEqual(count.get_count(self.queryset.filter(app_label = 'count', model = 'count', id__gt = 1)), 0)
+        self.assertEqual(count.get_count(self.queryset, exact = True), self.queryset.count())
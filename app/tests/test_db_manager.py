@@ -0,0 +1,114 @@
+from django.conf import settings
+from django.test import TransactionTestCase, override_settings
+
+from systems.db.manager import DatabaseManager, PACKAGE_HEADER, encode_chunk, decode_chunk, get_package_lines
+from systems.db.tombstone import get_tombstones
+
+import os
+import tempfile
+import time
+
+
+class DatabaseManagerTest(TransactionTestCase):
+
+    def setUp(self):
+        self.facade_index = settings.MANAGER.index.get_facade_index()
+        self.facade_index['environment'].model.objects.create(name = 'default')
+        self.group_model = self.facade_index['group'].model
+        self.parent = self.group_model.objects.create(name = 'package-parent')
+        self.group_model.objects.create(name = 'package-child', parent = self.parent)
+        self.manager = DatabaseManager()
+
+    def get_groups(self):
+        return dict(self.group_model.objects.filter(name__startswith = 'package').values_list('name', 'parent__name'))
+
+
+    def test_chunks_round_trip(self):
+        objects = list(self.group_model.objects.filter(name__startswith = 'package'))
+        for encrypted in (True, False):
+            chunk = decode_chunk(encode_chunk(self.group_model, objects, encrypted), encrypted)
+
+            self.assertEqual(chunk['model'], self.group_model._meta.label_lower)
+            self.assertEqual(sorted(obj['pk'] for obj in chunk['objects']), sorted(obj.pk for obj in objects))
+            self.assertEqual(chunk['deleted'], [])
+
+    def test_packages_restore_data(self):
+        groups = self.get_groups()
+        for encrypted in (True, False):
+            data = self.manager.save('group', encrypted = encrypted)
+            self.assertEqual(data.split("\n")[0], PACKAGE_HEADER)
+
+            self.group_model.objects.filter(name__startswith = 'package').delete()
+            self.manager.load(data, encrypted = encrypted)
+            self.assertEqual(self.get_groups(), groups)
+
+    def test_package_files_restore_data(self):
+        groups = self.get_groups()
+        with tempfile.TemporaryDirectory() as directory:
+            file_path = os.path.join(directory, 'package.db')
+            self.manager.save_file(file_path, 'group')
+
+            self.group_model.objects.filter(name__startswith = 'package').delete()
+            self.manager.load_file(file_path)
+
+        self.assertEqual(self.get_groups(), groups)
+
+
+    @override_settings(DB_SYNC_TOMBSTONE_DAYS = 30)
+    def test_delta_packages_replay_changes(self):
+        since = time.time()
+        self.group_model.objects.filter(name = 'package-child').delete()
+        self.group_model.objects.create(name = 'package-new')
+
+        data = self.manager.save('group', encrypted = False, since = since)
+        chunks = [ decode_chunk(line, False) for line in list(get_package_lines(data))[1:] ]
+        self.assertEqual([ obj['fields']['name'] for chunk in chunks for obj in chunk['objects'] ], [ 'package-new' ])
+
+        self.group_model.objects.filter(name = 'package-new').delete()
+        self.group_model.objects.create(name = 'package-child', parent = self.parent)
+        self.manager.load(data, encrypted = False)
+        self.assertEqual(self.get_groups(), { 'package-parent': None, 'package-new': None })
+
+    def test_delta_packages_replay_memberships(self):
+        config = self.facade_index['config'].model.objects.create(name = 'package-config')
+        config.groups.add(self.parent)
+        child = self.group_model.objects.get(name = 'package-child')
+        since = time.time()
+
+        config.groups.remove(self.parent)
+        config.groups.add(child)
+
+        data = self.manager.save('config', encrypted = False, since = since)
+        chunks = [ decode_chunk(line, False) for line in list(get_package_lines(data))[1:] ]
+        self.assertEqual([ obj['fields']['name'] for chunk in chunks for obj in chunk['objects'] ], [ 'package-config' ])
+
+        config.groups.set([ self.parent ])
+        self.manager.load(data, encrypted = False)
+        self.assertEqual(list(config.groups.values_list('name', flat = True)), [ 'package-child' ])
+
+    def test_bulk_updates_are_included_in_deltas(self):
+        since = time.time()
+        self.group_model.objects.filter(name = 'package-child').update(parent = None)
+
+        parent = self.group_model.objects.get(name = 'package-parent')
+        self.group_model.objects.bulk_update([ parent ], [ 'name' ])
+
+        data = self.manager.save('group', encrypted = False, since = since)
+        chunks = [ decode_chunk(line, False) for line in list(get_package_lines(data))[1:] ]
+        self.assertEqual(sorted(obj['fields']['name'] for chunk in chunks for obj in chunk['objects']), [ 'package-child', 'package-parent' ])
+
+    @override_settings(DB_SYNC_TOMBSTONE_DAYS = 30)
+    def test_deletes_record_tombstones(self):
+        since = time.time()
+        child = self.group_model.objects.get(name = 'package-child')
+        pks = sorted([ child.pk, self.parent.pk ])
+
+        child.delete()
+        self.group_model.objects.filter(name = 'package-parent').delete()
+        self.assertEqual(sorted(get_tombstones('default', self.group_model, since)), pks)
+
+    @override_settings(DB_SYNC_TOMBSTONE_DAYS = 0)
+    def test_tombstones_can_be_disabled(self):
+        since = time.time()
+        self.group_model.objects.filter(name__startswith = 'package').delete()
+        self.assertEqual(get_tombstones('default', self.group_model, since), [])
@@ -0,0 +1,80 @@
+from unittest import mock
+
+from django.test import SimpleTestCase, override_settings
+
+from systems.db.pool import ConnectionPool, PoolTimeoutError
+
+import threading
+
+
+@override_settings(DB_POOL_MAX_SIZE = 2, DB_POOL_MAX_IDLE = 300, DB_POOL_TIMEOUT = 0.05)
+class ConnectionPoolTest(SimpleTestCase):
+
+    def get_pool(self, overflow):
+        with self.settings(DB_POOL_MAX_OVERFLOW = overflow):
+            return ConnectionPool('test')
+
+    def acquire(self, pool):
+        return pool.acquire(mock.Mock, lambda connection, released: True)
+
+
+    def test_released_connections_are_reused(self):
+        pool = self.get_pool(0)
+        connection = self.acquire(pool)
+        pool.release(connection)
+
+        self.assertIs(self.acquire(pool), connection)
+        self.assertEqual(pool.stats['created'], 1)
+        self.assertEqual(pool.stats['reused'], 1)
+
+    def test_overflow_connections_are_closed_on_release(self):
+        pool = self.get_pool(-1)
+        connections = [ self.acquire(pool) for index in range(4) ]
+        self.assertEqual(pool.stats['size'], 4)
+        self.assertEqual(pool.stats['overflow'], 2)
+
+        for connection in connections:
+            pool.release(connection)
+
+        self.assertEqual(pool.stats['size'], 2)
+        self.assertEqual(pool.stats['idle'], 2)
+        connections[0].close.assert_called_once_with()
+        connections[1].close.assert_called_once_with()
+        connections[3].close.assert_not_called()
+
+    def test_bounded_overflow_waits(self):
+        pool = self.get_pool(1)
+        for index in range(3):
+            self.acquire(pool)
+
+        with self.assertRaises(PoolTimeoutError):
+            self.acquire(pool)
+        self.assertEqual(pool.stats['timeouts'], 1)
+
+    def test_default_overflow_blocks_at_limit(self):
+        pool = ConnectionPool('test')
+        self.assertGreaterEqual(pool.max_overflow, 0)
+
+        connections = [ self.acquire(pool) for index in range(pool.max_size + pool.max_overflow) ]
+        with self.assertRaises(PoolTimeoutError):
+            self.acquire(pool)
+
+        # A waiting checkout is handed the next released connection
+        pool.timeout = 5
+        timer = threading.Timer(0.05, pool.release, [ connections[0] ])
+        timer.start()
+        self.acquire(pool)
+        timer.join()
+
+        self.assertEqual(pool.stats['size'], pool.max_size + pool.max_overflow)
+        self.assertGreaterEqual(pool.stats['waits'], 2)
+
+    def test_failed_connections_are_not_counted(self):
+        pool = self.get_pool(0)
+
+        def connect():
+            raise Exception('refused')
+
+        with self.assertRaises(Exception):
+            pool.acquire(connect, lambda connection, released: True)
+        self.assertEqual(pool.stats['size'], 0)
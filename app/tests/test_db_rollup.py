@@ -0,0 +1,85 @@
+from types import SimpleNamespace
+from unittest import mock
+
+from django.contrib.contenttypes.models import ContentType
+from django.db.models import Count
+from django.test import TestCase, override_settings
+
+from systems.cache.version import update_model_version
+from systems.db import rollup
+
+
+class ContentTypeRollup(rollup.Rollup):
+
+    @property
+    def facade(self):
+        return SimpleNamespace(
+            model = ContentType,
+            aggregator_map = { 'COUNT': Count },
+            get_all_relations = lambda: {}
+        )
+
+
+@override_settings(
+    CACHES = { 'default': { 'BACKEND': 'django.core.cache.backends.locmem.LocMemCache', 'LOCATION': 'rollup' } },
+    CACHE_MIDDLEWARE_ALIAS = 'default',
+    CACHE_MIDDLEWARE_KEY_PREFIX = 'test:',
+    CACHE_WARM_DELAY = 0,
+    DB_ROLLUP_DELAY = 30
+)
+class RollupTest(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        ContentType.objects.bulk_create([
+            ContentType(app_label = "rollup{}".format(index % 3), model = "m{}".format(index))
+            for index in range(7)
+        ])
+
+
+    def setUp(self):
+        self.rollup = ContentTypeRollup(ContentType, 'label', {
+            'group_by': 'app_label',
+            'aggregates': 'id_COUNT'
+        })
+        self.rollup.refresh()
+
+    def get_live(self):
+        return sorted(self.rollup.get_queryset(), key = lambda row: row['app_label'])
+
+
+    def test_read_matches_live_aggregation(self):
+        self.assertTrue(self.rollup.check_fresh())
+        self.assertEqual(
+            sorted(self.rollup.read(ContentType.objects.all(), [ 'app_label', 'id_COUNT' ]), key = lambda row: row['app_label']),
+            self.get_live()
+        )
+        self.assertEqual(
+            [ row['app_label'] for row in self.rollup.read(ContentType.objects.order_by('-app_label'), [ 'app_label', 'id_COUNT' ]) ],
+            sorted([ row['app_label'] for row in self.get_live() ], reverse = True)
+        )
+
+    def test_unsupported_reads_run_live(self):
+        self.assertIsNone(self.rollup.read(ContentType.objects.filter(app_label = 'rollup1'), [ 'app_label', 'id_COUNT' ]))
+        self.assertIsNone(self.rollup.read(ContentType.objects.order_by('model'), [ 'app_label', 'id_COUNT' ]))
+
+    def test_writes_mark_rollups_stale(self):
+        update_model_version(ContentType._meta.db_table)
+        self.assertFalse(self.rollup.check_fresh())
+        self.assertIsNone(self.rollup.read(ContentType.objects.all(), [ 'app_label', 'id_COUNT' ]))
+
+        ContentType.objects.create(app_label = 'rollup0', model = 'new')
+        self.rollup.refresh()
+        self.assertEqual(
+            sorted(self.rollup.read(ContentType.objects.all(), [ 'app_label', 'id_COUNT' ]), key = lambda row: row['app_label']),
+            self.get_live()
+        )
+
+    def test_writes_share_one_refresh(self):
+        with mock.patch.object(rollup, 'get_rollup_version_names', return_value = { ContentType._meta.db_table }), \
+            mock.patch.object(rollup, 'queue_refresh') as queue_refresh:
+            update_model_version(ContentType._meta.db_table)
+            update_model_version(ContentType._meta.db_table)
+            update_model_version('core_user')
+
+        queue_refresh.assert_called_once_with(30)
@@ -0,0 +1,55 @@
+from types import SimpleNamespace
+from unittest import mock
+
+from django.test import SimpleTestCase, override_settings
+
+from systems.db.router import DatabaseRouter, ReplicaMonitor
+
+import threading
+
+
+def get_model(statistics = False):
+    return SimpleNamespace(_meta = SimpleNamespace(statistics = statistics))
+
+
+@override_settings(DB_REPLICA_ALIASES = [ 'replica' ])
+class DatabaseRouterTest(SimpleTestCase):
+
+    def setUp(self):
+        self.router = DatabaseRouter()
+        DatabaseRouter.reset()
+        self.addCleanup(DatabaseRouter.reset)
+
+        patcher = mock.patch.object(ReplicaMonitor, 'healthy_replicas', new_callable = mock.PropertyMock, return_value = [ 'replica' ])
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+
+    def test_reads_stick_to_primary_after_write(self):
+        self.assertEqual(self.router.db_for_read(get_model()), 'replica')
+        self.assertEqual(self.router.db_for_write(get_model()), 'default')
+        self.assertEqual(self.router.db_for_read(get_model()), 'default')
+
+        DatabaseRouter.reset()
+        self.assertEqual(self.router.db_for_read(get_model()), 'replica')
+
+    def test_statistics_writes_do_not_pin(self):
+        self.router.db_for_write(get_model(True))
+        self.assertEqual(self.router.db_for_read(get_model()), 'replica')
+
+    def test_pins_are_per_thread(self):
+        self.router.db_for_write(get_model())
+        aliases = []
+
+        thread = threading.Thread(target = lambda: aliases.append(self.router.db_for_read(get_model())))
+        thread.start()
+        thread.join()
+
+        self.assertEqual(aliases, [ 'replica' ])
+        self.assertEqual(self.router.db_for_read(get_model()), 'default')
+
+    @override_settings(DB_REPLICA_ALIASES = [])
+    def test_without_replicas(self):
+        self.router.db_for_write(get_model())
+        self.assertFalse(DatabaseRouter.pinned())
+        self.assertEqual(self.router.db_for_read(get_model()), 'default')
@@ -0,0 +1,79 @@
+from types import SimpleNamespace
+from unittest import mock, skipUnless
+
+from django.contrib.contenttypes.models import ContentType
+from django.db import connection
+from django.test import SimpleTestCase, TestCase, override_settings
+
+from rest_framework.request import Request
+from rest_framework.test import APIRequestFactory
+
+from systems.api.filters import DataSearchFilter
+from systems.db import search
+
+
+class SearchNameTest(SimpleTestCase):
+
+    def test_search_tokens(self):
+        self.assertEqual(search.get_search_tokens([ 'web-server', 'us_east 1' ]), [ 'web', 'server', 'us_east', '1' ])
+
+    def test_owned_index_names(self):
+        name = search.get_search_index_name('core_server', [ 'name' ])
+        self.assertTrue(search.check_search_index_name(name))
+        self.assertNotEqual(name, search.get_search_index_name('core_server', [ 'name', 'type' ]))
+        self.assertFalse(search.check_search_index_name('core_server_name_idx'))
+        self.assertFalse(search.check_search_index_name("{}custom".format(search.SEARCH_INDEX_PREFIX)))
+
+
+@skipUnless(connection.vendor == 'sqlite', 'SQLite full text index')
+@override_settings(DB_SEARCH_INDEX = True)
+class SQLiteSearchTest(TestCase):
+
+    def setUp(self):
+        patcher = mock.patch.object(ContentType._meta, 'search_fields', [ 'app_label', 'model' ], create = True)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.addCleanup(search.SearchIndexCache.clear)
+
+        ContentType.objects.create(app_label = 'searchtest', model = 'webserver')
+        ContentType.objects.create(app_label = 'searchtest', model = 'database')
+        search.ensure_sqlite_index(connection, ContentType, search.get_search_columns(ContentType))
+        search.SearchIndexCache.clear()
+
+    def search(self, *terms):
+        queryset = search.filter_queryset(ContentType.objects.all(), [ 'app_label', 'model' ], terms)
+        return sorted(queryset.values_list('model', flat = True))
+
+
+    def test_search_matches_token_prefixes(self):
+        self.assertEqual(self.search('searchtest web'), [ 'webserver' ])
+        self.assertEqual(self.search('searchtest'), [ 'database', 'webserver' ])
+        self.assertEqual(self.search('server'), [])
+
+    def test_default_search_matches_substrings(self):
+        view = SimpleNamespace(search_fields = [ 'app_label', 'model' ])
+        request = Request(APIRequestFactory().get('/', { 'q': 'server' }))
+
+        def search_filter():
+            queryset = DataSearchFilter().filter_queryset(request, ContentType.objects.filter(app_label = 'searchtest'), view)
+            return sorted(queryset.values_list('model', flat = True))
+
+        with override_settings(DB_SEARCH_INDEX = False):
+            self.assertEqual(search_filter(), [ 'webserver' ])
+        self.assertEqual(search_filter(), [])
+
+    def test_index_follows_writes(self):
+        ContentType.objects.create(app_label = 'searchtest', model = 'webcache')
+        ContentType.objects.filter(model = 'database').update(model = 'webdatabase')
+        ContentType.objects.filter(model = 'webserver').delete()
+
+        self.assertEqual(self.search('searchtest web'), [ 'webcache', 'webdatabase' ])
+
+    def test_existing_index_is_kept(self):
+        with connection.cursor() as cursor:
+            cursor.execute("SELECT id, pk FROM {}".format(search.get_search_key_table(ContentType._meta.db_table)))
+            keys = cursor.fetchall()
+
+            search.ensure_sqlite_index(connection, ContentType, search.get_search_columns(ContentType))
+            cursor.execute("SELECT id, pk FROM {}".format(search.get_search_key_table(ContentType._meta.db_table)))
+            self.assertEqual(cursor.fetchall(), keys)
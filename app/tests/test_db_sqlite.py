@@ -0,0 +1,40 @@
+from unittest import mock
+
+from django.test import SimpleTestCase, override_settings
+
+from systems.db.backends.sqlite3.base import DatabaseWrapper
+from utility.runtime import Runtime
+
+import os
+import tempfile
+
+
+@override_settings(DB_SQLITE_BUSY_TIMEOUT = 1234, DB_SQLITE_SYNCHRONOUS = 'NORMAL', DB_SQLITE_WAL_CHECKPOINT = 500)
+class SQLiteConnectionTest(SimpleTestCase):
+
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+
+        with mock.patch.object(Runtime, 'get_db_path', return_value = os.path.join(directory.name, 'test.db')):
+            self.connection = DatabaseWrapper({
+                'ENGINE': 'systems.db.backends.sqlite3',
+                'NAME': '',
+                'OPTIONS': {},
+                'TIME_ZONE': None,
+                'CONN_MAX_AGE': 0,
+                'AUTOCOMMIT': True
+            }, 'sqlite_test')
+        self.addCleanup(self.connection.close)
+
+    def get_pragma(self, name):
+        with self.connection.cursor() as cursor:
+            cursor.execute("PRAGMA {}".format(name))
+            return cursor.fetchone()[0]
+
+
+    def test_connections_use_wal(self):
+        self.assertEqual(self.get_pragma('journal_mode'), 'wal')
+        self.assertEqual(self.get_pragma('busy_timeout'), 1234)
+        self.assertEqual(self.get_pragma('synchronous'), 1)
+        self.assertEqual(self.get_pragma('wal_autocheckpoint'), 500)
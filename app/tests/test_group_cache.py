@@ -0,0 +1,57 @@
+from types import SimpleNamespace
+
+from django.test import SimpleTestCase, override_settings
+
+from data.group.cache import MembershipCache
+from systems.cache.version import update_model_version
+
+
+class GroupQuery(object):
+
+    def __init__(self, groups):
+        self.groups = groups
+        self.model = SimpleNamespace(_meta = SimpleNamespace(db_table = 'core_group'))
+        self.queries = 0
+
+    def filter(self, environment_id):
+        self.queries += 1
+        return SimpleNamespace(values_list = lambda *fields, **options: self.groups.get(environment_id, []))
+
+
+@override_settings(
+    CACHES = { 'default': { 'BACKEND': 'django.core.cache.backends.locmem.LocMemCache', 'LOCATION': 'membership' } },
+    CACHE_MIDDLEWARE_ALIAS = 'default',
+    CACHE_MIDDLEWARE_KEY_PREFIX = 'test:',
+    CACHE_WARM_DELAY = 0
+)
+class MembershipCacheTest(SimpleTestCase):
+
+    def setUp(self):
+        self.cache = MembershipCache()
+        self.cache.clear()
+        self.user = SimpleNamespace(
+            pk = 1,
+            _meta = SimpleNamespace(db_table = 'core_user'),
+            groups = GroupQuery({ 'default': [ 'admin', 'user' ] })
+        )
+
+
+    def test_membership_is_cached_per_environment(self):
+        self.assertEqual(self.cache.get(self.user, 'default'), frozenset([ 'admin', 'user' ]))
+        self.assertEqual(self.cache.get(self.user, 'default'), frozenset([ 'admin', 'user' ]))
+        self.assertEqual(self.cache.get(self.user, 'other'), frozenset())
+        self.assertEqual(self.user.groups.queries, 2)
+
+    def test_clear_reloads_membership(self):
+        self.cache.get(self.user, 'default')
+        self.user.groups.groups['default'] = [ 'user' ]
+        self.cache.clear()
+
+        self.assertEqual(self.cache.get(self.user, 'default'), frozenset([ 'user' ]))
+
+    def test_version_update_reloads_membership(self):
+        self.cache.get(self.user, 'default')
+        update_model_version('core_group')
+        self.cache.get(self.user, 'default')
+
+        self.assertEqual(self.user.groups.queries, 2)
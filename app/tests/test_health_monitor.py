@@ -0,0 +1,75 @@
+from unittest import mock
+
+from django.conf import settings
+from django.test import SimpleTestCase, override_settings
+
+from systems.health.monitor import HealthMonitor, check_health_path
+
+import time
+
+
+@override_settings(HEALTH_CHECK_INTERVAL = 10)
+class HealthMonitorTest(SimpleTestCase):
+
+    def setUp(self):
+        self.monitor = HealthMonitor()
+        self.report = self.monitor.report
+
+        patcher = mock.patch.object(HealthMonitor, 'start')
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def tearDown(self):
+        self.monitor.report = self.report
+
+
+    def test_health_paths(self):
+        self.assertTrue(check_health_path('/status'))
+        self.assertTrue(check_health_path('/health/ready/'))
+        self.assertFalse(check_health_path('/health'))
+
+    def test_run_check_reports_errors(self):
+        def fail():
+            raise Exception('down')
+
+        self.assertTrue(self.monitor.run_check(lambda: None)['healthy'])
+        with self.assertLogs('systems.health.monitor', 'WARNING'):
+            report = self.monitor.run_check(fail)
+
+        self.assertEqual(report, {
+            'healthy': False,
+            'required': True,
+            'latency': mock.ANY,
+            'error': 'down'
+        })
+
+    def test_ready_requires_recent_healthy_report(self):
+        self.monitor.report = { 'healthy': True, 'checked': time.time() }
+        self.assertTrue(self.monitor.ready)
+
+        self.monitor.report = { 'healthy': False, 'checked': time.time() }
+        self.assertFalse(self.monitor.ready)
+
+        self.monitor.report = { 'healthy': True, 'checked': time.time() - 31 }
+        self.assertFalse(self.monitor.ready)
+
+    @override_settings(DB_REPLICA_ALIASES = [ 'replica_0' ])
+    def test_replicas_do_not_block_readiness(self):
+        def check_database(monitor, alias):
+            if alias in failed:
+                raise Exception('down')
+
+        with mock.patch.object(settings, 'DATABASES', { 'default': {}, 'replica_0': {} }), \
+            mock.patch.object(HealthMonitor, 'check_system', lambda monitor: None), \
+            mock.patch.object(HealthMonitor, 'check_redis', lambda monitor: None), \
+            mock.patch.object(HealthMonitor, 'check_database', check_database), \
+            self.assertLogs('systems.health.monitor', 'WARNING'):
+
+            failed = [ 'replica_0' ]
+            report = self.monitor.check()
+            self.assertTrue(report['healthy'])
+            self.assertEqual(report['checks']['database:replica_0']['healthy'], False)
+            self.assertEqual(report['checks']['database:replica_0']['required'], False)
+
+            failed = [ 'default' ]
+            self.assertFalse(self.monitor.check()['healthy'])
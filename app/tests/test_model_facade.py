@@ -0,0 +1,35 @@
+from django.conf import settings
+from django.test import SimpleTestCase
+
+
+class FacadeViewTest(SimpleTestCase):
+
+    def setUp(self):
+        self.facade = settings.MANAGER.index.get_facade_index()['group']
+
+
+    def test_views_own_scope_order_and_limit(self):
+        scope = self.facade.get_scope()
+        order = self.facade.order
+        limit = self.facade.limit
+
+        view = self.facade.view()
+        view.set_scope({ 'environment': 'test' })
+        view.set_order([ '~name' ])
+        view.set_limit(5)
+
+        self.assertEqual(view.get_scope(), { 'environment': 'test' })
+        self.assertEqual(view.order, [ '-name' ])
+        self.assertEqual(self.facade.get_scope(), scope)
+        self.assertEqual(self.facade.order, order)
+        self.assertEqual(self.facade.limit, limit)
+
+    def test_views_share_facade_lookups(self):
+        view = self.facade.view()
+
+        self.assertEqual(view, self.facade)
+        self.assertEqual(hash(view), hash(self.facade))
+        self.assertEqual(view.text_fields, self.facade.text_fields)
+
+        view.text_fields.append('invalid')
+        self.assertNotIn('invalid', self.facade.text_fields)
@@ -0,0 +1,51 @@
+from unittest import mock
+
+from django.conf import settings
+from django.test import TestCase
+
+from systems.models.fields import EncryptedDataField
+
+
+class EncryptedFieldTest(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        index = settings.MANAGER.index.get_facade_index()
+        index['environment'].model.objects.create(name = 'default')
+        cls.config_model = index['config'].model
+        cls.config_model.objects.create(name = 'encrypted', value = { 'secret': [ 1, 2 ] })
+
+
+    def test_values_decrypt_on_first_access(self):
+        with mock.patch.object(EncryptedDataField, 'decrypt', autospec = True, side_effect = EncryptedDataField.decrypt) as decrypt:
+            config = self.config_model.objects.get(name = 'encrypted')
+            self.assertEqual(decrypt.call_count, 0)
+
+            self.assertEqual(config.value, { 'secret': [ 1, 2 ] })
+            self.assertEqual(config.value, { 'secret': [ 1, 2 ] })
+            self.assertEqual(decrypt.call_count, 1)
+
+    def test_unchanged_values_keep_ciphertext(self):
+        config = self.config_model.objects.get(name = 'encrypted')
+        ciphertext = config.__dict__['value'].ciphertext
+        config.value
+
+        with mock.patch.object(EncryptedDataField, 'encrypt', autospec = True, side_effect = EncryptedDataField.encrypt) as encrypt:
+            config.save()
+            self.assertEqual(encrypt.call_count, 0)
+
+            config = self.config_model.objects.get(name = 'encrypted')
+            self.assertEqual(config.__dict__['value'].ciphertext, ciphertext)
+
+            config.value = { 'secret': 'changed' }
+            config.save()
+            self.assertEqual(encrypt.call_count, 1)
+
+        self.assertEqual(self.config_model.objects.get(name = 'encrypted').value, { 'secret': 'changed' })
+
+    def test_value_rows_are_plain_text(self):
+        queryset = self.config_model.objects.filter(name = 'encrypted')
+
+        self.assertEqual(list(queryset.values_list('value', flat = True)), [ { 'secret': [ 1, 2 ] } ])
+        self.assertEqual(list(queryset.values('name', 'value')), [ { 'name': 'encrypted', 'value': { 'secret': [ 1, 2 ] } } ])
+        self.assertEqual(queryset.values_list('name', 'value', named = True)[0].value, { 'secret': [ 1, 2 ] })
@@ -0,0 +1,53 @@
+from django.apps import apps
+from django.conf import settings
+from django.core import serializers
+from django.db.models.fields.related import ForeignKey
+from django.test import SimpleTestCase
+
+
+class DependencyGraphTest(SimpleTestCase):
+
+    def setUp(self):
+        self.index = settings.MANAGER.index
+        self.graph = self.index.get_dependency_graph()
+        self.models = self.index.get_models()
+
+    def get_scope_children(self, name, process = 'all'):
+        children = set()
+        for model in self.models:
+            model_fields = { field.name: field for field in model._meta.fields }
+            for field in list(model.facade.get_base_scope().keys()) + list(model.facade.scope_fields):
+                field = model_fields[field.replace('_id', '')]
+                if isinstance(field, ForeignKey) and field.related_model.facade.name == name:
+                    if process == 'all' or process == getattr(model.facade.meta, 'scope_process', None):
+                        children.add(model.facade.name)
+        return children
+
+
+    def test_children_match_scope_relations(self):
+        for model in self.models:
+            name = model.facade.name
+            for process in ('all', 'pre', 'post'):
+                self.assertEqual(set(self.graph.get_children(name, False, process)), self.get_scope_children(name, process))
+                self.assertEqual(
+                    set(child for child, field in self.graph.get_child_relations(name, process)),
+                    self.get_scope_children(name, process)
+                )
+
+    def test_recursive_children(self):
+        children = self.graph.get_children('environment', True)
+        self.assertEqual(len(children), len(set(children)))
+        self.assertNotIn('environment', children)
+
+        for child in list(children):
+            self.assertTrue(set(self.graph.get_children(child, True)).issubset(children))
+
+    def test_package_models_follow_export_order(self):
+        app_list = [ (app_config, None) for app_config in apps.get_app_configs() if app_config.models_module is not None ]
+        export_models = [ model for model in serializers.sort_dependencies(app_list) if getattr(model, 'facade', None) ]
+
+        for packages in ([ settings.DB_PACKAGE_ALL_NAME ], [ 'group' ], [ 'group', 'config' ]):
+            self.assertEqual(self.graph.get_package_models(packages), [
+                model for model in export_models
+                if set(packages) & set(model.facade.get_packages())
+            ])
@@ -0,0 +1,70 @@
+from django.conf import settings
+from django.test import TestCase, override_settings
+
+from systems.models.identity import IdentityMap
+
+
+@override_settings(DB_IDENTITY_MAP_ENTRIES = 100)
+class IdentityMapTest(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        index = settings.MANAGER.index.get_facade_index()
+        index['environment'].model.objects.create(name = 'default')
+        cls.facade = index['group'].view()
+        cls.facade.model.objects.create(name = 'identity')
+        cls.facade.model.objects.create(name = 'identity-parent')
+
+
+    def test_retrievals_are_shared_within_scope(self):
+        with IdentityMap.scope():
+            self.facade.retrieve('identity')
+            with self.assertNumQueries(0):
+                instance = self.facade.retrieve('identity')
+
+        self.assertEqual(instance.name, 'identity')
+        with self.assertNumQueries(1):
+            self.facade.retrieve('identity')
+
+    def test_retrievals_are_private_copies(self):
+        with IdentityMap.scope():
+            instance = self.facade.retrieve('identity')
+            instance.name = 'changed'
+            instance.parent = self.facade.retrieve('identity-parent')
+
+            instance = self.facade.retrieve('identity')
+            self.assertEqual(instance.name, 'identity')
+            self.assertIsNone(instance.parent)
+
+    def test_bulk_writes_invalidate(self):
+        with IdentityMap.scope():
+            self.facade.retrieve('identity')
+            self.facade.model.objects.filter(name = 'identity').update(parent = self.facade.retrieve('identity-parent'))
+            self.assertEqual(self.facade.retrieve('identity').parent.name, 'identity-parent')
+
+            self.facade.model.objects.filter(name = 'identity').delete()
+            self.assertIsNone(self.facade.retrieve('identity'))
+
+    def test_fresh_scopes_reload_and_invalidate_parents(self):
+        with IdentityMap.scope() as identity_map:
+            instance = self.facade.retrieve('identity')
+
+            with IdentityMap.scope(fresh = True):
+                with self.assertNumQueries(1):
+                    self.facade.retrieve('identity')
+                IdentityMap.discard(instance)
+
+            self.assertEqual(len(identity_map), 0)
+
+    def test_nested_fresh_scopes_share_entries(self):
+        with IdentityMap.scope():
+            self.facade.retrieve('identity')
+
+            with IdentityMap.scope(fresh = True) as identity_map:
+                with self.assertNumQueries(1):
+                    self.facade.retrieve('identity')
+
+                with IdentityMap.scope(fresh = True) as nested_map:
+                    self.assertIs(nested_map, identity_map)
+                    with self.assertNumQueries(0):
+                        self.facade.retrieve('identity')
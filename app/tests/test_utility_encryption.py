@@ -0,0 +1,85 @@
+from django.test import SimpleTestCase
+
+from Crypto.Cipher import AES
+from Crypto.Util import Counter
+
+from utility.encryption import AESCipher
+
+import base64
+import os
+
+
+def legacy_encrypt(cipher, message):
+    iv = os.urandom(AES.block_size)
+    counter = Counter.new(AES.block_size * 8, initial_value = int(iv.hex(), 16))
+
+    if isinstance(message, bytes):
+        message = cipher.binary_marker + message.hex()
+    return base64.b64encode(iv + AES.new(cipher.key, AES.MODE_CTR, counter = counter).encrypt(message.encode()))
+
+def legacy_decrypt(cipher, ciphertext):
+    ciphertext = base64.b64decode(ciphertext)
+    counter = Counter.new(AES.block_size * 8, initial_value = int(ciphertext[:AES.block_size].hex(), 16))
+    message = AES.new(cipher.key, AES.MODE_CTR, counter = counter).decrypt(ciphertext[AES.block_size:]).decode('utf-8')
+
+    if message.startswith(cipher.binary_marker):
+        message = bytes.fromhex(message[len(cipher.binary_marker):])
+    return message
+
+
+class AESCipherTest(SimpleTestCase):
+
+    def setUp(self):
+        self.cipher = AESCipher([ 'test-key' ])
+
+
+    def test_text_and_binary_round_trip(self):
+        for message in ('', 'secret value', 'ünïcode'):
+            self.assertEqual(self.cipher.decrypt(self.cipher.encrypt(message)), message)
+            self.assertEqual(self.cipher.decrypt(self.cipher.encrypt(message).decode()), message)
+
+        binary = os.urandom(64)
+        self.assertEqual(self.cipher.decrypt(self.cipher.encrypt(binary)), binary)
+        self.assertEqual(self.cipher.decrypt(self.cipher.encrypt('text'), False), b'text')
+
+    def test_frames_use_unique_ivs(self):
+        self.assertNotEqual(self.cipher.encrypt('value'), self.cipher.encrypt('value'))
+
+        messages = [ 'one', b'two', 'three' ]
+        ciphertexts = self.cipher.encrypt_many(messages)
+        self.assertEqual(len(set(ciphertexts)), 3)
+        self.assertEqual(self.cipher.decrypt_many(ciphertexts), messages)
+
+    def test_legacy_ciphertexts_decrypt(self):
+        self.assertEqual(self.cipher.decrypt(legacy_encrypt(self.cipher, 'legacy value')), 'legacy value')
+        self.assertEqual(self.cipher.decrypt(legacy_encrypt(self.cipher, b'\x00\x01binary')), b'\x00\x01binary')
+
+    def test_default_ciphertexts_are_legacy_compatible(self):
+        for message in ('legacy value', 'ünïcode', b'\x00\x01binary'):
+            self.assertEqual(legacy_decrypt(self.cipher, self.cipher.encrypt(message)), message)
+
+        for ciphertext in self.cipher.encrypt_many([ 'one', b'two' ], framed = False):
+            self.assertFalse(ciphertext.startswith(self.cipher.frame_marker))
+        self.assertEqual([ legacy_decrypt(self.cipher, value) for value in self.cipher.encrypt_many([ 'one', b'two' ], framed = False) ], [ 'one', b'two' ])
+
+        framed = self.cipher.encrypt('value', framed = True)
+        self.assertTrue(framed.startswith(self.cipher.frame_marker))
+        self.assertEqual(self.cipher.decrypt(framed), 'value')
+
+    def test_other_keys_can_not_decrypt(self):
+        other = AESCipher([ 'other-key' ])
+        self.assertNotEqual(other.decrypt(self.cipher.encrypt('secret'), False), b'secret')
+
+    def test_unsupported_frames_fail(self):
+        frame = bytearray(self.cipher.encrypt_frame('value'))
+        frame[0] = 99
+        with self.assertRaises(ValueError):
+            self.cipher.decrypt(self.cipher.frame_marker + base64.b64encode(bytes(frame)))
+
+    def test_stream_round_trip(self):
+        data = os.urandom(1000)
+        encrypted = b''.join(self.cipher.encrypt_stream([ data[:300], data[300:] ]))
+
+        # Chunk boundaries on decryption are independent of those used to encrypt
+        chunks = [ encrypted[index:index + 7] for index in range(0, len(encrypted), 7) ]
+        self.assertEqual(b''.join(self.cipher.decrypt_stream(chunks)), data)
@@ -2,14 +2,12 @@ from os import path
 from datetime import datetime
 
 from Crypto.Cipher import AES
-from Crypto.Util import Counter
 from Crypto import Random
 
 import base64
 import hashlib
 import string
 import random
-import binascii
 
 
 class Cipher(object):
@@ -28,6 +26,12 @@ class Cipher(object):
 
 class AESCipher:
 
+    frame_marker = b'$'
+    frame_version = 2
+    frame_text = 0
+    frame_binary = 1
+
+
     @classmethod
     def generate_key(cls):
         chars = string.ascii_uppercase + string.digits
@@ -40,6 +44,7 @@ class AESCipher:
 
         self.binary_marker = '<<<<-->BINARY<-->>>>'
         self.batch_size = AES.block_size
+        self.header_size = 2 + self.batch_size
 
         if keys:
             combined_key = ''
@@ -52,30 +57,70 @@ class AESCipher:
 
             self.key = hashlib.sha256(combined_key.encode()).digest()
         else:
-            self.key = self.__class__.generate_key()
+            self.key = self.__class__.generate_key().encode()
 
 
-    def encrypt(self, message):
-        iv = Random.new().read(self.batch_size)
-        iv_int = int(binascii.hexlify(iv), self.batch_size)
-        ctr = Counter.new(self.batch_size * 8, initial_value = iv_int)
+    def _get_cipher(self, iv):
+        return AES.new(self.key, AES.MODE_CTR,
+            nonce = b'',
+            initial_value = int.from_bytes(iv, 'big')
+        )
+
+    def _get_header(self, message, iv):
+        frame_type = self.frame_binary if isinstance(message, bytes) else self.frame_text
+        return bytes([ self.frame_version, frame_type ]) + iv
+
+    def _parse_header(self, frame):
+        if len(frame) < self.header_size or frame[0] != self.frame_version:
+            raise ValueError("Unsupported cipher frame version")
+        return frame[1], frame[2:self.header_size]
+
+
+    def encrypt_frame(self, message, iv = None):
+        if iv is None:
+            iv = Random.new().read(self.batch_size)
+
+        header = self._get_header(message, iv)
+        if not isinstance(message, bytes):
+            message = message.encode()
+        return header + self._get_cipher(iv).encrypt(message)
+
+    def decrypt_frame(self, frame, decode = True):
+        frame_type, iv = self._parse_header(frame)
+        message = self._get_cipher(iv).decrypt(frame[self.header_size:])
+
+        if decode and frame_type == self.frame_text:
+            message = message.decode('utf-8')
+        return message
+
+
+    def encrypt(self, message, framed = False):
+        # Legacy cipher text stays the default so older clients and servers can read it
+        if framed:
+            return self.frame_marker + base64.b64encode(self.encrypt_frame(message))
+        return self._encrypt_legacy(message)
 
-        cipher = AES.new(self.key, AES.MODE_CTR, counter = ctr)
+    def decrypt(self, ciphertext, decode = True):
+        if isinstance(ciphertext, str):
+            ciphertext = ciphertext.encode()
+
+        if ciphertext.startswith(self.frame_marker):
+            return self.decrypt_frame(base64.b64decode(ciphertext[len(self.frame_marker):]), decode)
+        return self._decrypt_legacy(ciphertext, decode)
+
+    def _encrypt_legacy(self, message, iv = None):
+        # Base64 of IV and cipher text with hex encoded binary data
+        if iv is None:
+            iv = Random.new().read(self.batch_size)
 
         if isinstance(message, bytes):
             message = self.binary_marker + message.hex()
-        return base64.b64encode(iv + cipher.encrypt(message.encode()))
+        return base64.b64encode(iv + self._get_cipher(iv).encrypt(message.encode()))
 
-    def decrypt(self, ciphertext, decode = True):
+    def _decrypt_legacy(self, ciphertext, decode = True):
         ciphertext = base64.b64decode(ciphertext)
         iv = ciphertext[:self.batch_size]
-        ciphertext = ciphertext[self.batch_size:]
-
-        iv_int = int(iv.hex(), self.batch_size)
-        ctr = Counter.new(self.batch_size * 8, initial_value = iv_int)
-
-        cipher = AES.new(self.key, AES.MODE_CTR, counter = ctr)
-        message = cipher.decrypt(ciphertext)
+        message = self._get_cipher(iv).decrypt(ciphertext[self.batch_size:])
 
         if decode:
             message = message.decode("utf-8")
@@ -83,3 +128,48 @@ class AESCipher:
             message = bytes.fromhex(message[len(self.binary_marker):])
 
         return message
+
+
+    def encrypt_many(self, messages, framed = True):
+        messages = list(messages)
+        ivs = Random.new().read(self.batch_size * len(messages))
+        ciphertexts = []
+
+        for index, message in enumerate(messages):
+            iv = ivs[index * self.batch_size:(index + 1) * self.batch_size]
+            if framed:
+                ciphertexts.append(self.frame_marker + base64.b64encode(self.encrypt_frame(message, iv)))
+            else:
+                ciphertexts.append(self._encrypt_legacy(message, iv))
+        return ciphertexts
+
+    def decrypt_many(self, ciphertexts, decode = True):
+        return [ self.decrypt(ciphertext, decode) for ciphertext in ciphertexts ]
+
+
+    def encrypt_stream(self, chunks, binary = True):
+        iv = Random.new().read(self.batch_size)
+        cipher = self._get_cipher(iv)
+
+        yield self._get_header(b'' if binary else '', iv)
+        for chunk in chunks:
+            if not isinstance(chunk, bytes):
+                chunk = chunk.encode()
+            yield cipher.encrypt(chunk)
+
+    def decrypt_stream(self, chunks):
+        header = b''
+        cipher = None
+
+        for chunk in chunks:
+            if cipher is None:
+                header += chunk
+                if len(header) < self.header_size:
+                    continue
+
+                frame_type, iv = self._parse_header(header)
+                cipher = self._get_cipher(iv)
+                chunk = header[self.header_size:]
+
+            if chunk:
+                yield cipher.decrypt(chunk)
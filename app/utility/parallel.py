@@ -1,5 +1,5 @@
 from django.conf import settings
-from django.db import connection
+from django.db import connections
 from django.core.management.base import CommandError
 
 from .runtime import Runtime
@@ -44,7 +44,7 @@ class WorkerThread(threading.Thread):
                 if callable(self.target):
                     self.target(self, *self.args, **self.kwargs)
         finally:
-            connection.close()
+            connections.close_all()
 
 
     def terminate(self, timeout = None):